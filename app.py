@@ -10,7 +10,9 @@ from werkzeug.security import generate_password_hash, check_password_hash
 from datetime import datetime, timedelta
 import os
 import json
+import math
 import random
+import threading
 from functools import wraps
 
 # Initialize Flask app
@@ -23,6 +25,43 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db = SQLAlchemy(app)
 CORS(app)
 
+# Optional Rasch ability scoring: needs numpy/scipy and a calibrated item file
+# (written by IRTCalibrator.export_parameters). The scorer's tables are built
+# once here so each submission is scored in microseconds.
+IRT_ITEMS_PATH = os.environ.get('IRT_ITEMS_PATH', 'output/irt_items.csv')
+try:
+    from src.diagnostics import EAPScorer, IncrementalItemStatistics
+except ImportError:
+    EAPScorer = None
+    IncrementalItemStatistics = None
+
+ability_scorer = None
+if EAPScorer is not None and os.path.exists(IRT_ITEMS_PATH):
+    try:
+        ability_scorer = EAPScorer.from_csv(IRT_ITEMS_PATH)
+    except (OSError, ValueError, KeyError) as e:
+        # A bad item file disables ability scoring, not the whole app
+        app.logger.warning(f"Ability scoring disabled, could not load {IRT_ITEMS_PATH}: {e}")
+
+# Running item statistics over every submitted quiz, seeded from the database
+# on first use and then updated in O(questions) per submission. The dev server
+# is threaded, so seeding, every update and every read hold item_stats_lock
+# (reentrant, so a holder can still call get_item_stats_tracker).
+item_stats_tracker = None
+item_stats_lock = threading.RLock()
+
+def get_item_stats_tracker():
+    """Return the running item statistics, building them from stored assessments once."""
+    global item_stats_tracker
+    with item_stats_lock:
+        if item_stats_tracker is None and IncrementalItemStatistics is not None:
+            tracker = IncrementalItemStatistics()
+            for (answers,) in db.session.query(Assessment.quiz_answers).order_by(Assessment.id):
+                if answers:
+                    tracker.update({q_id: int(a == 'correct') for q_id, a in json.loads(answers).items()})
+            item_stats_tracker = tracker
+        return item_stats_tracker
+
 # Template filter for JSON parsing
 @app.template_filter('from_json')
 def from_json_filter(value):
@@ -793,6 +832,14 @@ def submit_comprehensive_assessment():
         # Generate AI analysis
         analysis = analyze_student_performance(assessment_data)
         
+        # Rasch ability estimate for the answered, calibrated questions
+        if ability_scorer is not None:
+            theta, theta_se = ability_scorer.score_student(
+                {q_id: int(answer == 'correct') for q_id, answer in quiz_answers.items()}
+            )
+            analysis['ability_theta'] = round(theta, 3)
+            analysis['ability_se'] = round(theta_se, 3)
+        
         # Create new assessment record
         assessment = Assessment(
             student_id=student_id,
@@ -810,13 +857,23 @@ def submit_comprehensive_assessment():
             weak_topics=json.dumps(analysis.get('weaknesses', []))
         )
         
-        db.session.add(assessment)
-        db.session.commit()
+        # Seed from the database before adding, so this submission is counted
+        # once; holding the lock until the update keeps another request from
+        # seeding between this commit and this update
+        with item_stats_lock:
+            tracker = get_item_stats_tracker()
+            
+            db.session.add(assessment)
+            db.session.commit()
+            
+            if tracker is not None:
+                tracker.update({q_id: int(answer == 'correct') for q_id, answer in quiz_answers.items()})
         
         # Return success with redirect to personalized report
         return jsonify({
             'success': True,
             'assessment_id': assessment.id,
+            'ability_theta': analysis.get('ability_theta'),
             'redirect_url': url_for('personalized_report', assessment_id=assessment.id)
         })
         
@@ -911,6 +968,28 @@ def quick_demo_data():
     
     return jsonify(demo_data)
 
+@app.route('/api/item_statistics')
+@login_required
+def get_item_statistics():
+    """Current difficulty and discrimination of every quiz question"""
+    with item_stats_lock:
+        tracker = get_item_stats_tracker()
+        if tracker is None:
+            return jsonify({'error': 'Item statistics unavailable'}), 503
+        num_assessments = tracker.num_students
+        item_stats = tracker.item_statistics()
+    return jsonify({
+        'num_assessments': num_assessments,
+        'items': [{
+            'question_id': stats.question_id,
+            'p_value': round(stats.p_value, 3),
+            'discrimination': None if math.isnan(stats.discrimination) else round(stats.discrimination, 3),
+            'difficulty': stats.difficulty_level,
+            'quality': stats.discrimination_quality,
+            'num_correct': stats.num_correct
+        } for stats in item_stats.values()]
+    })
+
 @app.route('/api/students')
 @login_required
 def get_students():
@@ -5,7 +5,7 @@ Run this to see everything working together!
 """
 
 from pathlib import Path
-from src.ingestion import DataIngestion
+from src.ingestion_cache import load_class_data
 from src.diagnostics import WeaknessAnalyzer
 from src.visualization import DiagnosticVisualizer
 
@@ -19,8 +19,7 @@ def main():
     # Step 1: Load data
     print("\n1️⃣ Loading data...")
     data_dir = Path("data")
-    ingestion = DataIngestion(data_dir)
-    class_data = ingestion.merge_all_data()
+    class_data = load_class_data(data_dir)
     print(f"   ✅ Loaded {class_data.num_students} students")
     
     # Step 2: Run diagnostics
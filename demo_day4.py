@@ -12,6 +12,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
 from src.mapping import TopicMapper
+from src.mapping_cache import CACHE_FILENAME, map_all_questions_cached
 from src.paper_generator import PaperGenerator, PaperConfig
 
 
@@ -39,7 +40,7 @@ def demo_paper_generation_setup():
             questions_path="data/past_questions_bank.json", 
             manual_mappings_path="data/manual_mappings.json"
         )
-        mapper.map_all_questions()
+        map_all_questions_cached(mapper, Path("data") / CACHE_FILENAME)
         
         print(f"✅ Loaded {len(mapper.topics)} topics")
         print(f"✅ Loaded {len(mapper.mappings)} question-topic mappings")
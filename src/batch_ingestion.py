@@ -0,0 +1,179 @@
+"""
+Batch ingestion for many classes at once.
+
+A school export is laid out as one directory per class, each holding the
+usual mcq_results.csv / assignments.csv / participation.csv triple. This
+module discovers those directories under a root, ingests them in a process
+pool and collects a per-class error report instead of aborting the batch
+when one class has bad data.
+"""
+
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.ingestion import ClassData, DataIngestion
+from src.ingestion_cache import load_class_data
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class BatchIngestionResult:
+    """Outcome of ingest_classes: loaded classes plus per-class errors."""
+    classes: Dict[str, ClassData] = field(default_factory=dict)
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def num_students(self) -> int:
+        return sum(cd.num_students for cd in self.classes.values())
+
+    def combined(self) -> ClassData:
+        """Merge every successfully loaded class into one school-level ClassData."""
+        return combine_class_data(self.classes)
+
+    def summary(self) -> str:
+        lines = [f"{len(self.classes)} classes loaded ({self.num_students} students), {len(self.errors)} failed"]
+        for name, error in self.errors.items():
+            lines.append(f"  - {name}: {error}")
+        return "\n".join(lines)
+
+
+def discover_class_dirs(root: Path, mcq_filename: str = "mcq_results.csv") -> List[Path]:
+    """Return every directory under root (including root) holding an MCQ file, sorted."""
+    root = Path(root)
+    if not root.is_dir():
+        raise FileNotFoundError(f"No such directory: {root}")
+    return sorted(path.parent for path in root.rglob(mcq_filename))
+
+
+def ingest_classes(
+    root: Path,
+    max_workers: Optional[int] = None,
+    chunksize: Optional[int] = None,
+    use_cache: bool = False,
+    max_in_flight: Optional[int] = None,
+) -> BatchIngestionResult:
+    """
+    Ingest every class directory under root in parallel.
+
+    Args:
+        root: Directory tree containing one directory per class
+        max_workers: Worker processes; 0 ingests sequentially in-process
+        chunksize: If set, workers use chunked streaming ingestion so their
+            peak memory is bounded by one chunk plus the class's matrix;
+            with use_cache this applies when a cache is (re)built
+        use_cache: Load through each class directory's binary cache
+        max_in_flight: Classes submitted at once (default 2 x workers),
+            which bounds results waiting in the pool's queues
+
+    Returns:
+        BatchIngestionResult keyed by class path relative to root
+    """
+    root = Path(root)
+    class_dirs = discover_class_dirs(root)
+    names = {d: (d.relative_to(root).as_posix() if d != root else d.name) for d in class_dirs}
+    loaded: Dict[str, ClassData] = {}
+    errors: Dict[str, str] = {}
+
+    if max_workers == 0:
+        for d in class_dirs:
+            try:
+                loaded[names[d]] = _ingest_class_dir(d, chunksize, use_cache)
+            except Exception as e:
+                errors[names[d]] = f"{type(e).__name__}: {e}"
+    else:
+        workers = max_workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            window = max_in_flight or 2 * workers
+            queue = iter(class_dirs)
+            pending = {}
+
+            def submit_next() -> None:
+                d = next(queue, None)
+                if d is not None:
+                    pending[pool.submit(_ingest_class_dir, d, chunksize, use_cache)] = d
+
+            for _ in range(window):
+                submit_next()
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    d = pending.pop(future)
+                    try:
+                        loaded[names[d]] = future.result()
+                    except Exception as e:
+                        errors[names[d]] = f"{type(e).__name__}: {e}"
+                    submit_next()
+
+    for name, error in errors.items():
+        logger.warning(f"Skipping class {name}: {error}")
+
+    # Report in discovery order regardless of completion order
+    order = [names[d] for d in class_dirs]
+    return BatchIngestionResult(
+        classes={n: loaded[n] for n in order if n in loaded},
+        errors={n: errors[n] for n in order if n in errors},
+    )
+
+
+def combine_class_data(classes: Dict[str, ClassData]) -> ClassData:
+    """
+    Stack several classes into one columnar ClassData.
+
+    Questions are the union of all classes in first-seen order; questions a
+    class did not sit are scored 0, as in ClassData.get_response_matrix.
+    Student ids must be unique across classes.
+    """
+    questions: List[str] = []
+    seen = set()
+    for cd in classes.values():
+        for q in cd.mcq_questions:
+            if q not in seen:
+                seen.add(q)
+                questions.append(q)
+    column = {q: j for j, q in enumerate(questions)}
+
+    student_ids: List[str] = []
+    blocks, totals, assign_tables, part_tables = [], [], [], []
+    for cd in classes.values():
+        if not cd.is_columnar:
+            raise ValueError("combine_class_data expects columnar ClassData")
+        block = np.zeros((cd.num_students, len(questions)), dtype=np.uint8)
+        block[:, [column[q] for q in cd.mcq_questions]] = cd.responses
+        blocks.append(block)
+        totals.append(cd.mcq_totals)
+        student_ids.extend(cd.student_ids)
+        assign_tables.append(cd.assignment_table)
+        part_tables.append(cd.participation_table)
+
+    duplicated = pd.Index(student_ids).duplicated()
+    if duplicated.any():
+        dupes = sorted({sid for sid, d in zip(student_ids, duplicated) if d})
+        raise ValueError(f"Student IDs appear in more than one class: {dupes[:5]}")
+
+    return ClassData.from_arrays(
+        student_ids=student_ids,
+        mcq_questions=questions,
+        responses=np.concatenate(blocks) if blocks else np.zeros((0, 0), dtype=np.uint8),
+        mcq_totals=np.concatenate(totals) if totals else np.zeros(0),
+        assignment_table=pd.concat(assign_tables, ignore_index=True) if assign_tables else pd.DataFrame(),
+        participation_table=pd.concat(part_tables, ignore_index=True) if part_tables else pd.DataFrame(),
+        validate=False,  # every block was validated when its class was built
+    )
+
+
+def _ingest_class_dir(class_dir: Path, chunksize: Optional[int], use_cache: bool) -> ClassData:
+    """Worker entry point: load one class directory as columnar ClassData."""
+    if use_cache:
+        return load_class_data(class_dir, chunksize=chunksize)
+    ingestion = DataIngestion(class_dir)
+    if chunksize:
+        return ingestion.stream_all_data(chunksize=chunksize)
+    return ingestion.merge_all_data(columnar=True)
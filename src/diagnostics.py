@@ -5,17 +5,20 @@ Analyzes MCQ responses to identify student weaknesses using:
 - Item difficulty (p-values)
 - Item discrimination (point-biserial correlation)
 - Topic-level performance aggregation
+- Rasch (1PL) IRT calibration of item difficulty and student ability
 """
 
 import pandas as pd
 import numpy as np
+from collections.abc import Mapping
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from pathlib import Path
 import logging
-from scipy import stats
+from scipy.special import expit, logsumexp
 
-from src.ingestion import ClassData, StudentRecord
+from src.ingestion import ClassData
+from src.reliability import bootstrap_alpha, cronbach_alpha, kr20
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -68,6 +71,184 @@ class StudentWeaknessProfile:
         return self.weak_questions[:n]
 
 
+def item_statistic_arrays(responses: np.ndarray, block_rows: int = 8192) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute correct counts, p-values and corrected point-biserials for all items.
+    
+    The discrimination of item j is the Pearson correlation between the item
+    and the rest score (total minus item j). It is derived for every item at
+    once from integer sufficient statistics gathered in a single pass over
+    the response matrix; see item_statistics_from_sums.
+    
+    Args:
+        responses: 0/1 matrix, rows=students, cols=items
+        block_rows: Rows converted to float per dot product, bounding memory
+    
+    Returns:
+        (num_correct, p_values, discrimination), each of length n_items
+    """
+    n_students, n_items = responses.shape
+    num_correct = responses.sum(axis=0, dtype=np.int64)
+    totals = responses.sum(axis=1, dtype=np.int64)
+    
+    # sum_i x_ij * t_i for every item j; float64 BLAS is exact for these integers
+    sum_xt = np.zeros(n_items)
+    for start in range(0, n_students, block_rows):
+        block = responses[start:start + block_rows]
+        sum_xt += totals[start:start + block_rows].astype(np.float64) @ block
+    
+    return item_statistics_from_sums(
+        n_students, num_correct, int(totals.sum()), int(totals @ totals), np.rint(sum_xt).astype(np.int64)
+    )
+
+
+def item_statistics_from_sums(
+    n_students: int,
+    num_correct: np.ndarray,
+    sum_t: int,
+    sum_tt: int,
+    sum_xt: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Item statistics from running sums: n, per-item correct counts, sum and
+    sum of squares of total scores, and per-item sum of x_ij * t_i.
+    
+    All moments are kept as integer numerators scaled by n^2, so the result
+    depends only on the sums and not on how they were accumulated:
+    
+        cov(x_j, rest_j) = cov(x_j, t) - var(x_j)
+        var(rest_j)      = var(t) - 2 cov(x_j, t) + var(x_j)
+    
+    Items with no variance get 0.0; items whose rest score is constant get
+    NaN, as scipy.stats.pointbiserialr would return.
+    """
+    n_items = len(num_correct)
+    if n_students == 0:
+        return num_correct, np.zeros(n_items), np.zeros(n_items)
+    
+    p_values = num_correct / n_students
+    var_x = num_correct * (n_students - num_correct)
+    cov_xt = n_students * sum_xt - num_correct * sum_t
+    var_t = n_students * sum_tt - sum_t * sum_t
+    cov_rest = cov_xt - var_x
+    var_rest = var_t - 2 * cov_xt + var_x
+    
+    discrimination = np.zeros(n_items)
+    varies = var_x > 0
+    constant_rest = varies & (var_rest <= 0)
+    ok = varies & ~constant_rest
+    discrimination[ok] = cov_rest[ok] / (np.sqrt(var_x[ok].astype(np.float64)) * np.sqrt(var_rest[ok].astype(np.float64)))
+    discrimination[constant_rest] = np.nan
+    np.clip(discrimination, -1.0, 1.0, out=discrimination)
+    
+    return num_correct, p_values, discrimination
+
+
+class IncrementalItemStatistics:
+    """
+    Item statistics maintained from running sufficient statistics.
+    
+    Each new response vector updates per-item correct counts, per-item
+    item x total cross-products and a histogram of total scores in
+    O(items), so p-values and discrimination are available after every
+    submission without rebuilding the response matrix. Results are
+    identical to item_statistic_arrays on the stacked responses.
+    
+    Questions first seen in a later submission are appended; earlier
+    students count as having answered them incorrectly, as in
+    ClassData.get_response_matrix.
+    """
+    
+    def __init__(self, question_ids: Optional[List[str]] = None):
+        self.question_ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self.num_students = 0
+        self._num_correct = np.zeros(0, dtype=np.int64)
+        self._sum_xt = np.zeros(0, dtype=np.int64)
+        self.score_histogram = np.zeros(1, dtype=np.int64)  # students per total score
+        for q in question_ids or []:
+            self._column(q)
+    
+    @classmethod
+    def from_class_data(cls, class_data: ClassData) -> "IncrementalItemStatistics":
+        """Seed the running sums from an existing class in one pass."""
+        tracker = cls(class_data.mcq_questions)
+        tracker.add_responses(class_data.get_response_matrix())
+        return tracker
+    
+    def update(self, answers: Mapping[str, int]) -> None:
+        """Add one student's answers (question_id -> 0/1)."""
+        columns = np.fromiter((self._column(q) for q in answers), dtype=np.intp, count=len(answers))
+        correct = np.fromiter(answers.values(), dtype=np.int64, count=len(answers))
+        if ((correct != 0) & (correct != 1)).any():
+            raise ValueError("Answers must be 0 or 1")
+        
+        total = int(correct.sum())
+        self._num_correct[columns] += correct
+        self._sum_xt[columns] += correct * total
+        self._count_scores(np.array([total]))
+    
+    def add_responses(self, responses: np.ndarray) -> None:
+        """Add a block of students whose columns follow question_ids."""
+        if responses.shape[1] != len(self.question_ids):
+            raise ValueError(f"Expected {len(self.question_ids)} columns, got {responses.shape[1]}")
+        totals = responses.sum(axis=1, dtype=np.int64)
+        self._num_correct += responses.sum(axis=0, dtype=np.int64)
+        self._sum_xt += np.rint(totals.astype(np.float64) @ responses).astype(np.int64)
+        self._count_scores(totals)
+    
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(num_correct, p_values, discrimination) in question_ids order."""
+        scores = np.arange(len(self.score_histogram), dtype=np.int64)
+        return item_statistics_from_sums(
+            self.num_students,
+            self._num_correct.copy(),
+            int(scores @ self.score_histogram),
+            int((scores * scores) @ self.score_histogram),
+            self._sum_xt,
+        )
+    
+    def item_statistics(self) -> Dict[str, ItemStatistics]:
+        """Current ItemStatistics for every question seen so far."""
+        num_correct, p_values, discrimination = self.arrays()
+        return {
+            q: ItemStatistics(
+                question_id=q,
+                p_value=float(p_values[j]),
+                discrimination=float(discrimination[j]),
+                num_correct=int(num_correct[j]),
+                num_attempts=self.num_students
+            )
+            for j, q in enumerate(self.question_ids)
+        }
+    
+    def _column(self, question_id: str) -> int:
+        j = self._index.get(question_id)
+        if j is None:
+            j = self._index[question_id] = len(self.question_ids)
+            self.question_ids.append(question_id)
+            self._num_correct = np.append(self._num_correct, 0)
+            self._sum_xt = np.append(self._sum_xt, 0)
+        return j
+    
+    def _count_scores(self, totals: np.ndarray) -> None:
+        counts = np.bincount(totals)
+        if len(counts) > len(self.score_histogram):
+            counts[:len(self.score_histogram)] += self.score_histogram
+            self.score_histogram = counts.astype(np.int64)
+        else:
+            self.score_histogram[:len(counts)] += counts
+        self.num_students += len(totals)
+
+
+@dataclass
+class AbilityEstimate:
+    """A student's Rasch ability on the logit scale."""
+    student_id: str
+    theta: float
+    standard_error: float
+
+
 class WeaknessAnalyzer:
     """Analyzes student performance to identify weaknesses."""
     
@@ -80,8 +261,9 @@ class WeaknessAnalyzer:
         """
         self.class_data = class_data
         self.item_stats: Dict[str, ItemStatistics] = {}
-        self.student_profiles: Dict[str, StudentWeaknessProfile] = {}
+        self.student_profiles: Mapping[str, StudentWeaknessProfile] = {}
         self._response_matrix: Optional[pd.DataFrame] = None
+        self._responses: Optional[np.ndarray] = None  # raw matrix behind _response_matrix
         
     def analyze(self) -> None:
         """Run full analysis pipeline."""
@@ -100,22 +282,19 @@ class WeaknessAnalyzer:
     
     def _build_response_matrix(self) -> pd.DataFrame:
         """Build matrix of student responses (rows=students, cols=questions)."""
-        data = []
-        student_ids = []
-        
-        for student_id, student in self.class_data.students.items():
-            student_ids.append(student_id)
-            row = [student.mcq_responses.get(q, 0) for q in self.class_data.mcq_questions]
-            data.append(row)
+        # Columnar class data hands over its uint8 matrix without a copy
+        responses = self.class_data.get_response_matrix()
+        self._responses = responses
         
         self._response_matrix = pd.DataFrame(
-            data, 
-            index=student_ids,
-            columns=self.class_data.mcq_questions
+            responses,
+            index=self.class_data.get_student_ids(),
+            columns=self.class_data.mcq_questions,
+            copy=False
         )
         
         # Add total score column
-        self._response_matrix['total_score'] = self._response_matrix.sum(axis=1)
+        self._response_matrix['total_score'] = responses.sum(axis=1, dtype=np.int64)
         
         return self._response_matrix
     
@@ -124,99 +303,69 @@ class WeaknessAnalyzer:
         if self._response_matrix is None:
             self._build_response_matrix()
         
-        for question in self.class_data.mcq_questions:
-            # Calculate p-value (difficulty)
-            responses = self._response_matrix[question]
-            num_correct = responses.sum()
-            num_attempts = len(responses)
-            p_value = num_correct / num_attempts if num_attempts > 0 else 0
-            
-            # Calculate point-biserial correlation (discrimination)
-            # Correlation between item score and total score
-            total_scores = self._response_matrix['total_score']
-            
-            # Remove the current item from total to avoid part-whole correlation
-            adjusted_total = total_scores - responses
-            
-            if len(set(responses)) > 1:  # Need variance in responses
-                correlation, _ = stats.pointbiserialr(responses, adjusted_total)
-            else:
-                correlation = 0.0
-            
+        num_correct, p_values, discrimination = item_statistic_arrays(self._responses)
+        num_attempts = self._responses.shape[0]
+        
+        for j, question in enumerate(self.class_data.mcq_questions):
             self.item_stats[question] = ItemStatistics(
                 question_id=question,
-                p_value=p_value,
-                discrimination=correlation,
-                num_correct=int(num_correct),
+                p_value=float(p_values[j]),
+                discrimination=float(discrimination[j]),
+                num_correct=int(num_correct[j]),
                 num_attempts=num_attempts
             )
         
         return self.item_stats
     
-    def create_student_profiles(self) -> Dict[str, StudentWeaknessProfile]:
-        """Create weakness profile for each student."""
+    def create_student_profiles(self) -> Mapping[str, StudentWeaknessProfile]:
+        """
+        Create weakness profile for each student.
+        
+        The per-student numbers are computed for the whole class as matrix
+        operations; the StudentWeaknessProfile objects themselves are only
+        built when a student's profile is first looked up.
+        """
         if not self.item_stats:
             self.calculate_item_statistics()
         
-        class_avg = self._response_matrix['total_score'].mean()
+        responses = self._responses
+        questions = self.class_data.mcq_questions
+        p_values = np.array([self.item_stats[q].p_value for q in questions])
         
-        for student_id, student in self.class_data.students.items():
-            # Find questions answered incorrectly
-            weak_questions = [
-                q for q, score in student.mcq_responses.items() 
-                if score == 0
-            ]
-            
-            # Sort by item difficulty (focus on easier questions first)
-            weak_questions.sort(
-                key=lambda q: self.item_stats[q].p_value, 
-                reverse=True
-            )
-            
-            # Calculate performance by difficulty level
-            perf_by_diff = self._calculate_performance_by_difficulty(student)
-            
-            # Calculate overall percentage
-            overall_pct = (student.mcq_total / len(self.class_data.mcq_questions)) * 100
-            
-            # Calculate relative performance
-            relative_perf = student.mcq_total / class_avg if class_avg > 0 else 1.0
-            
-            # Identify focus areas (questions with high p-value that student missed)
-            focus_areas = [
-                q for q in weak_questions 
-                if self.item_stats[q].p_value > 0.5  # Focus on easier questions first
-            ][:5]
-            
-            self.student_profiles[student_id] = StudentWeaknessProfile(
-                student_id=student_id,
-                weak_questions=weak_questions,
-                performance_by_difficulty=perf_by_diff,
-                overall_mcq_percentage=overall_pct,
-                relative_performance=relative_perf,
-                suggested_focus_areas=focus_areas
-            )
+        # Difficulty-bucket mask (items x levels) times responses gives
+        # each student's correct count per level in one product
+        levels = ["Easy", "Medium", "Hard"]
+        item_levels = [self.item_stats[q].difficulty_level for q in questions]
+        level_mask = np.array(
+            [[lvl == level for level in levels] for lvl in item_levels], dtype=np.float32
+        ).reshape(len(questions), len(levels))
+        level_counts = level_mask.sum(axis=0, dtype=np.float64)
+        correct_by_level = (responses @ level_mask).astype(np.float64)
+        perf_by_diff = np.divide(
+            correct_by_level, level_counts,
+            out=np.zeros_like(correct_by_level), where=level_counts > 0
+        ) * 100
         
-        return self.student_profiles
-    
-    def _calculate_performance_by_difficulty(self, student: StudentRecord) -> Dict[str, float]:
-        """Calculate student's performance on Easy/Medium/Hard questions."""
-        performance = {"Easy": [], "Medium": [], "Hard": []}
-        
-        for q, score in student.mcq_responses.items():
-            if q in self.item_stats:
-                difficulty = self.item_stats[q].difficulty_level
-                performance[difficulty].append(score)
+        # mcq_total comes from the source file, as before, not the matrix sum
+        mcq_totals = _mcq_totals(self.class_data)
+        class_avg = self._response_matrix['total_score'].mean()
+        overall_pct = mcq_totals / len(questions) * 100 if questions else np.zeros_like(mcq_totals)
+        relative_perf = mcq_totals / class_avg if class_avg > 0 else np.ones_like(mcq_totals)
         
-        # Calculate percentages
-        result = {}
-        for level, scores in performance.items():
-            if scores:
-                result[level] = (sum(scores) / len(scores)) * 100
-            else:
-                result[level] = 0.0
+        self.student_profiles = _LazyProfiles(
+            student_ids=self.class_data.get_student_ids(),
+            questions=questions,
+            responses=responses,
+            # easiest first; stable so ties keep question order
+            item_order=np.argsort(-p_values, kind="stable"),
+            p_values=p_values,
+            perf_by_diff=perf_by_diff,
+            levels=levels,
+            overall_pct=overall_pct,
+            relative_perf=relative_perf,
+        )
         
-        return result
+        return self.student_profiles
     
     def identify_weak_items(self, threshold: float = 0.5) -> List[str]:
         """Identify questions where class performance is below threshold."""
@@ -233,8 +382,14 @@ class WeaknessAnalyzer:
         
         return weak_items
     
-    def get_class_summary(self) -> Dict[str, any]:
-        """Get summary statistics for the entire class."""
+    def get_class_summary(self, n_bootstrap: int = 0, seed: Optional[int] = None) -> Dict[str, any]:
+        """
+        Get summary statistics for the entire class.
+        
+        Args:
+            n_bootstrap: If > 0, add a 95% bootstrap CI for Cronbach's alpha
+            seed: Seed for the bootstrap resampling
+        """
         if self._response_matrix is None:
             self._build_response_matrix()
         
@@ -250,8 +405,12 @@ class WeaknessAnalyzer:
                 self.item_stats.keys(),
                 key=lambda q: self.item_stats[q].p_value,
                 reverse=True
-            )[:5]
+            )[:5],
+            "cronbach_alpha": cronbach_alpha(self._responses),
+            "kr20": kr20(self._responses),
         }
+        if n_bootstrap > 0:
+            summary["alpha_ci"], _ = bootstrap_alpha(self._responses, n_bootstrap, seed=seed)
         
         return summary
     
@@ -277,9 +436,317 @@ class WeaknessAnalyzer:
         logger.info(f"Item analysis exported to {output_path}")
 
 
+class EAPScorer:
+    """
+    Scores response vectors by EAP under a calibrated Rasch item set.
+    
+    The item-by-node log-likelihood tables are computed once at
+    construction, so scoring a batch is a single matrix multiply against
+    them. Complete response vectors are scored from a raw-score lookup,
+    because the raw score is sufficient for θ under the Rasch model.
+    
+    Unanswered items (answered=0) are left out of the likelihood, so partial
+    quizzes can be scored against the full calibrated set.
+    """
+    
+    def __init__(self, difficulties: np.ndarray, question_ids: List[str], n_quadrature: int = 41):
+        self.difficulties = np.asarray(difficulties, dtype=np.float64)
+        self.question_ids = list(question_ids)
+        self.question_index = {q: j for j, q in enumerate(self.question_ids)}
+        if len(self.question_ids) != len(self.difficulties):
+            raise ValueError("Need one difficulty per question")
+        
+        nodes, weights = np.polynomial.hermite_e.hermegauss(n_quadrature)
+        self.nodes = nodes
+        self._log_prior = np.log(weights / weights.sum())
+        
+        # log P(correct) and log P(incorrect) per item (rows) and node (cols);
+        # a response x contributes x * log_odds + log_wrong
+        logits = nodes[None, :] - self.difficulties[:, None]
+        log_wrong = -np.logaddexp(0, logits)
+        # Stacked so [x, answered] @ table = Σ_j answered_j (x_j log_odds_j + log_wrong_j)
+        self._table = np.vstack([logits, log_wrong])
+        
+        # Complete-vector lookup by raw score 0..items
+        n_items = len(self.difficulties)
+        log_lik = np.outer(np.arange(n_items + 1), nodes) + log_wrong.sum(axis=0)
+        self._score_theta, self._score_se = self._posterior_moments(log_lik)
+    
+    @classmethod
+    def from_csv(cls, items_path: Path, n_quadrature: int = 41) -> "EAPScorer":
+        """Load the item file written by IRTCalibrator.export_parameters."""
+        items = pd.read_csv(items_path, dtype={"Question": str})
+        return cls(items["Difficulty"].to_numpy(), items["Question"].tolist(), n_quadrature)
+    
+    def score_raw(self, raw_scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """EAP θ and posterior SD for students who answered every item."""
+        raw_scores = np.asarray(raw_scores, dtype=np.int64)
+        return self._score_theta[raw_scores], self._score_se[raw_scores]
+    
+    def score_matrix(self, responses: np.ndarray,
+                     answered: Optional[np.ndarray] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        EAP θ and posterior SD for a batch of response vectors.
+        
+        Args:
+            responses: 0/1 matrix, rows=students, cols=question_ids
+            answered: Optional 0/1 matrix of the same shape; 0 marks items
+                the student did not see. Defaults to all answered.
+        """
+        responses = np.asarray(responses)
+        if answered is None:
+            return self.score_raw(responses.sum(axis=1))
+        design = np.hstack([responses * answered, answered]).astype(np.float64)
+        return self._posterior_moments(design @ self._table)
+    
+    def score_student(self, answers: Mapping[str, int]) -> Tuple[float, float]:
+        """
+        Fast path for one student: question_id -> 0/1 for the items answered.
+        
+        Questions outside the calibrated set are ignored. Only the answered
+        rows of the table are touched, so cost grows with quiz length, not
+        with the size of the item set.
+        """
+        n_items = len(self.question_ids)
+        rows, correct = [], []
+        for question_id, score in answers.items():
+            j = self.question_index.get(question_id)
+            if j is not None:
+                rows.append(n_items + j)
+                if score:
+                    correct.append(j)
+        if len(rows) == n_items:
+            return float(self._score_theta[len(correct)]), float(self._score_se[len(correct)])
+        # Plain NumPy on one row; scipy's logsumexp overhead dominates here
+        joint = self._table[correct].sum(axis=0) + self._table[rows].sum(axis=0) + self._log_prior
+        weights = np.exp(joint - joint.max())
+        weights /= weights.sum()
+        theta = weights @ self.nodes
+        return float(theta), float(np.sqrt(max(weights @ self.nodes**2 - theta**2, 0.0)))
+    
+    def _posterior_moments(self, log_lik: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Posterior mean and SD over the nodes for each row of log-likelihoods."""
+        joint = log_lik + self._log_prior
+        posterior = np.exp(joint - logsumexp(joint, axis=1, keepdims=True))
+        mean = posterior @ self.nodes
+        sd = np.sqrt(np.maximum(posterior @ self.nodes**2 - mean**2, 0.0))
+        return mean, sd
+
+
+class IRTCalibrator:
+    """
+    Calibrates a Rasch (1PL) model by marginal maximum likelihood.
+    
+    P(correct | θ_i, b_j) = 1 / (1 + exp(-(θ_i - b_j))), with abilities
+    drawn from the N(0, 1) prior described in docs/methodology.md. The
+    prior is integrated with fixed Gauss-Hermite quadrature and item
+    difficulties are fitted by EM with a vectorized Newton step per
+    iteration. Student abilities are the EAP estimates from the final
+    posterior, with the posterior SD as their standard error.
+    
+    Under the Rasch model the raw score is sufficient for θ, so the E-step
+    works on score groups: after one pass over the response matrix each
+    iteration costs O(items^2 x nodes), whatever the number of students.
+    """
+    
+    def __init__(self, class_data: ClassData, n_quadrature: int = 41,
+                 max_iter: int = 500, tol: float = 1e-6, max_abs_difficulty: float = 8.0):
+        """
+        Args:
+            class_data: ClassData object from ingestion module
+            n_quadrature: Gauss-Hermite nodes for the N(0, 1) ability prior
+            max_iter: EM iteration limit
+            tol: Stop once no difficulty moves by more than this (logits)
+            max_abs_difficulty: Bound for items everyone (or no one) got right
+        """
+        self.class_data = class_data
+        self.n_quadrature = n_quadrature
+        self.max_iter = max_iter
+        self.tol = tol
+        self.max_abs_difficulty = max_abs_difficulty
+        
+        self.difficulties: Optional[np.ndarray] = None  # b_j per mcq_questions
+        self.difficulty_se: Optional[np.ndarray] = None
+        self.theta: Optional[np.ndarray] = None  # per student, matrix row order
+        self.theta_se: Optional[np.ndarray] = None
+        self.scorer: Optional[EAPScorer] = None  # EAP scorer for the fitted item set
+        self.log_likelihood: Optional[float] = None
+        self.n_iter = 0
+        self.converged = False
+        self._student_index: Dict[str, int] = {}
+    
+    def fit(self) -> "IRTCalibrator":
+        """Fit item difficulties and student abilities."""
+        responses = self.class_data.get_response_matrix()
+        n_students, n_items = responses.shape
+        if n_students == 0 or n_items == 0:
+            raise ValueError("Cannot calibrate an empty response matrix")
+        
+        scores = responses.sum(axis=1, dtype=np.int64)
+        score_counts, score_item_correct = _score_group_counts(responses, scores)
+        score_values = np.arange(n_items + 1)
+        
+        nodes, weights = np.polynomial.hermite_e.hermegauss(self.n_quadrature)
+        log_prior = np.log(weights / weights.sum())
+        
+        # Start from the logit of each item's proportion incorrect
+        p = np.clip(responses.mean(axis=0), 0.5 / n_students, 1 - 0.5 / n_students)
+        b = np.log((1 - p) / p)
+        
+        self.converged = False
+        for iteration in range(1, self.max_iter + 1):
+            posterior, log_marginal = self._score_posterior(b, nodes, log_prior, score_values)
+            
+            # Expected students and expected correct answers at each node
+            n_at_node = score_counts @ posterior
+            correct_at_node = score_item_correct.T @ posterior
+            
+            prob = expit(nodes[None, :] - b[:, None])
+            gradient = (n_at_node * prob).sum(axis=1) - correct_at_node.sum(axis=1)
+            information = (n_at_node * prob * (1 - prob)).sum(axis=1)
+            step = gradient / information
+            b = np.clip(b + step, -self.max_abs_difficulty, self.max_abs_difficulty)
+            
+            if np.max(np.abs(step)) < self.tol:
+                self.converged = True
+                break
+        
+        posterior, log_marginal = self._score_posterior(b, nodes, log_prior, score_values)
+        n_at_node = score_counts @ posterior
+        prob = expit(nodes[None, :] - b[:, None])
+        
+        self.difficulties = b
+        self.difficulty_se = 1 / np.sqrt((n_at_node * prob * (1 - prob)).sum(axis=1))
+        self.scorer = EAPScorer(b, self.class_data.mcq_questions, self.n_quadrature)
+        self.theta, self.theta_se = self.scorer.score_raw(scores)
+        self.log_likelihood = float(score_counts @ log_marginal)
+        self.n_iter = iteration
+        self._student_index = {sid: i for i, sid in enumerate(self.class_data.get_student_ids())}
+        
+        if not self.converged:
+            logger.warning(f"Rasch calibration did not converge in {self.max_iter} iterations")
+        logger.info(f"Rasch calibration finished after {self.n_iter} iterations")
+        return self
+    
+    @staticmethod
+    def _score_posterior(b: np.ndarray, nodes: np.ndarray, log_prior: np.ndarray,
+                         score_values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Posterior over nodes for each raw score, and each score's log marginal."""
+        # log L(θ | score r) = r θ - Σ_j log(1 + exp(θ - b_j)) + terms free of θ
+        log_lik = np.outer(score_values, nodes) - np.logaddexp(0, nodes[None, :] - b[:, None]).sum(axis=0)
+        joint = log_lik + log_prior
+        log_marginal = logsumexp(joint, axis=1)
+        return np.exp(joint - log_marginal[:, None]), log_marginal
+    
+    def get_item_difficulty(self, question_id: str) -> float:
+        """Calibrated difficulty b_j (logits) for a question."""
+        self._check_fitted()
+        return float(self.difficulties[self.class_data.mcq_questions.index(question_id)])
+    
+    def get_ability(self, student_id: str) -> AbilityEstimate:
+        """EAP ability and its standard error for a student."""
+        self._check_fitted()
+        i = self._student_index[student_id]
+        return AbilityEstimate(student_id, float(self.theta[i]), float(self.theta_se[i]))
+    
+    def export_parameters(self, items_path: Path, abilities_path: Path) -> None:
+        """Export item difficulties and student abilities to CSV."""
+        self._check_fitted()
+        pd.DataFrame({
+            "Question": self.class_data.mcq_questions,
+            "Difficulty": self.difficulties.round(3),
+            "SE": self.difficulty_se.round(3),
+        }).to_csv(items_path, index=False)
+        pd.DataFrame({
+            "Student": self.class_data.get_student_ids(),
+            "Theta": self.theta.round(3),
+            "SE": self.theta_se.round(3),
+        }).to_csv(abilities_path, index=False)
+        logger.info(f"Rasch parameters exported to {items_path} and {abilities_path}")
+    
+    def _check_fitted(self) -> None:
+        if self.difficulties is None:
+            raise RuntimeError("Call fit() before reading calibrated parameters")
+
+
+def _score_group_counts(responses: np.ndarray, scores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Students per raw score and per-item correct counts within each score.
+    
+    Returns (counts, item_correct) with shapes (items+1,) and (items+1, items).
+    """
+    n_items = responses.shape[1]
+    counts = np.bincount(scores, minlength=n_items + 1).astype(np.float64)
+    item_correct = np.zeros((n_items + 1, n_items))
+    order = np.argsort(scores, kind="stable")
+    present, starts = np.unique(scores[order], return_index=True)
+    item_correct[present] = np.add.reduceat(responses[order], starts, axis=0, dtype=np.int64)
+    return counts, item_correct
+
+
+def _mcq_totals(class_data: ClassData) -> np.ndarray:
+    """Per-student mcq_total in response-matrix row order."""
+    if class_data.is_columnar:
+        return class_data.mcq_totals
+    return np.array([s.mcq_total for s in class_data.students.values()], dtype=float)
+
+
+class _LazyProfiles(Mapping):
+    """
+    Read-only student_id -> StudentWeaknessProfile mapping.
+    
+    Holds the class-wide arrays from create_student_profiles and builds
+    (then caches) a student's profile the first time it is requested.
+    """
+    
+    def __init__(self, student_ids: List[str], questions: List[str], responses: np.ndarray,
+                 item_order: np.ndarray, p_values: np.ndarray, perf_by_diff: np.ndarray,
+                 levels: List[str], overall_pct: np.ndarray, relative_perf: np.ndarray):
+        self._student_ids = student_ids
+        self._index = {sid: i for i, sid in enumerate(student_ids)}
+        self._questions = np.array(questions, dtype=object)
+        self._responses = responses
+        self._item_order = item_order
+        self._p_values = p_values
+        self._perf_by_diff = perf_by_diff
+        self._levels = levels
+        self._overall_pct = overall_pct
+        self._relative_perf = relative_perf
+        self._built: Dict[str, StudentWeaknessProfile] = {}
+    
+    def __getitem__(self, student_id: str) -> StudentWeaknessProfile:
+        profile = self._built.get(student_id)
+        if profile is None:
+            profile = self._build(self._index[student_id])
+            self._built[student_id] = profile
+        return profile
+    
+    def __iter__(self):
+        return iter(self._student_ids)
+    
+    def __len__(self) -> int:
+        return len(self._student_ids)
+    
+    def _build(self, i: int) -> StudentWeaknessProfile:
+        # Missed items, already in descending p-value order
+        missed = self._item_order[self._responses[i, self._item_order] == 0]
+        # Focus on easier questions first (p > 0.5), which lead the ordering
+        focus = missed[self._p_values[missed] > 0.5][:5]
+        return StudentWeaknessProfile(
+            student_id=self._student_ids[i],
+            weak_questions=self._questions[missed].tolist(),
+            performance_by_difficulty={
+                level: float(self._perf_by_diff[i, k]) for k, level in enumerate(self._levels)
+            },
+            overall_mcq_percentage=float(self._overall_pct[i]),
+            relative_performance=float(self._relative_perf[i]),
+            suggested_focus_areas=self._questions[focus].tolist()
+        )
+
+
 if __name__ == "__main__":
     # Test with sample data
-    from src.ingestion import DataIngestion
+    from src.ingestion_cache import load_class_data
     
     # Load sample data
     data_dir = Path("data")
@@ -298,8 +765,7 @@ if __name__ == "__main__":
                 old_path.rename(new_path)
         
         # Load and analyze
-        ingestion = DataIngestion(data_dir)
-        class_data = ingestion.merge_all_data()
+        class_data = load_class_data(data_dir)
         
         analyzer = WeaknessAnalyzer(class_data)
         analyzer.analyze()
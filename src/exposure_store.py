@@ -0,0 +1,107 @@
+"""
+Record of which questions each student has been given.
+
+PaperGenerator draws every paper from the whole bank, so a student can be
+given the same question again and again. This module keeps an SQLite file
+with:
+
+- papers     - one row per generated paper: paper id (primary key, so a
+               reused id is an error rather than a silent overwrite),
+               student and generation time
+- exposures  - one row per (student, question): the paper that first
+               served it, indexed by student and by question
+
+Selectors check membership against a per-student set that is loaded once
+and kept in step with every write, so each check is O(1) and generating a
+paper costs no query beyond the first for that student. Papers are
+recorded in bulk, one transaction per call.
+"""
+
+import logging
+import sqlite3
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    paper_id TEXT PRIMARY KEY,
+    student_id TEXT NOT NULL,
+    generated_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS exposures (
+    student_id TEXT NOT NULL,
+    question_id TEXT NOT NULL,
+    paper_id TEXT NOT NULL,
+    PRIMARY KEY (student_id, question_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS exposures_by_question ON exposures (question_id);
+"""
+
+
+class ExposureStore:
+    """Questions served to each student, backed by an SQLite file."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._seen: Dict[str, Set[str]] = {}
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def seen(self, student_id: str) -> Set[str]:
+        """Question ids the student has been given (do not modify)."""
+        if student_id not in self._seen:
+            rows = self._conn.execute(
+                "SELECT question_id FROM exposures WHERE student_id = ?", (student_id,)
+            )
+            self._seen[student_id] = {question_id for question_id, in rows}
+        return self._seen[student_id]
+
+    def students_exposed(self, question_id: str) -> List[str]:
+        """Students who have been given a question."""
+        rows = self._conn.execute(
+            "SELECT student_id FROM exposures WHERE question_id = ? ORDER BY student_id", (question_id,)
+        )
+        return [student_id for student_id, in rows]
+
+    def has_paper(self, paper_id: str) -> bool:
+        return self._conn.execute(
+            "SELECT 1 FROM papers WHERE paper_id = ?", (paper_id,)
+        ).fetchone() is not None
+
+    def record(self, student_id: str, paper_id: str, question_ids: Iterable[str]) -> None:
+        """Record one paper served to a student."""
+        self.record_many([(student_id, paper_id, question_ids)])
+
+    def record_many(self, papers: Iterable[Tuple[str, str, Iterable[str]]]) -> int:
+        """
+        Record (student_id, paper_id, question_ids) for many papers in one transaction.
+
+        A question a student has already seen keeps its first paper.
+        Raises sqlite3.IntegrityError, recording nothing, if a paper id is
+        already in the store.
+
+        Returns:
+            Number of papers recorded
+        """
+        generated_at = datetime.now().isoformat()
+        paper_rows, exposure_rows = [], []
+        for student_id, paper_id, question_ids in papers:
+            paper_rows.append((paper_id, student_id, generated_at))
+            exposure_rows.extend((student_id, question_id, paper_id) for question_id in question_ids)
+
+        with self._conn:
+            self._conn.executemany("INSERT INTO papers VALUES (?, ?, ?)", paper_rows)
+            self._conn.executemany("INSERT OR IGNORE INTO exposures VALUES (?, ?, ?)", exposure_rows)
+
+        for student_id, question_id, _ in exposure_rows:
+            if student_id in self._seen:
+                self._seen[student_id].add(question_id)
+        logger.debug(f"Recorded {len(paper_rows)} papers, {len(exposure_rows)} exposures")
+        return len(paper_rows)
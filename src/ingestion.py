@@ -2,9 +2,19 @@
 
 import pandas as pd
 import numpy as np
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional
 import tempfile
 import shutil
+import sys
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
 
 class DataIngestion:
     """Handles loading and merging MCQ, assignment, and participation data."""
@@ -13,13 +23,14 @@ class DataIngestion:
         if not data_dir.is_dir():
             raise FileNotFoundError(f"No such directory: {data_dir}")
         self.data_dir = data_dir
+        self.last_stream_stats: Optional["StreamStats"] = None
 
     def load_mcq_results(self, filename: str = "mcq_results.csv") -> pd.DataFrame:
         path = self.data_dir / filename
         df = pd.read_csv(path)
         # validate 0/1 values
         cols = [c for c in df.columns if c.startswith("q")]
-        if df[cols].isin([0, 1]).all().all() is False:
+        if not df[cols].isin([0, 1]).all().all():
             raise ValueError("MCQ file contains non-binary values")
         return df
 
@@ -47,29 +58,254 @@ class DataIngestion:
 
 
 
-    def merge_all_data(self) -> "ClassData":
+    def merge_all_data(self, columnar: bool = False) -> "ClassData":
+        """
+        Merge the three source files into one ClassData.
+
+        With columnar=True the responses are kept as a single uint8 matrix
+        and students are served as lightweight row views (see ClassData).
+        """
         mcq = self.load_mcq_results()
         assign = self.load_assignments()
         part = self.load_participation()
         # No import needed - StudentRecord and ClassData are already defined above
         cd = ClassData()
-        # build StudentRecord per student_id
-        for sid in mcq["student_id"]:
-            sr = StudentRecord(
+        q_cols = [c for c in mcq.columns if c.startswith("q")]
+
+        # Index every frame on student_id once; the first row wins for
+        # duplicated ids, matching the old per-student `.iloc[0]` lookup.
+        mcq = mcq.drop_duplicates("student_id", keep="first")
+        student_ids = mcq["student_id"].tolist()
+        assign_rows = _rows_by_student(assign, student_ids, "assignments")
+        part_rows = _rows_by_student(part, student_ids, "participation")
+
+        if columnar:
+            return ClassData.from_arrays(
+                student_ids=student_ids,
+                mcq_questions=q_cols,
+                responses=mcq[q_cols].to_numpy(),
+                mcq_totals=mcq["total_score"].to_numpy(dtype=float),
+                assignment_table=assign_rows,
+                participation_table=part_rows,
+            )
+
+        # Build records from row views of plain NumPy arrays
+        responses = mcq[q_cols].to_numpy().astype(np.int64).tolist()
+        mcq_totals = mcq["total_score"].to_numpy(dtype=float).tolist()
+        assign_totals = assign_rows["total"].to_numpy(dtype=float).tolist()
+        part_avgs = part_rows["average"].to_numpy(dtype=float).tolist()
+        assign_cols = list(assign_rows.columns)
+        part_cols = list(part_rows.columns)
+        assign_values = assign_rows.to_numpy(dtype=object).tolist()
+        part_values = part_rows.to_numpy(dtype=object).tolist()
+
+        for i, sid in enumerate(student_ids):
+            cd.students[sid] = StudentRecord(
                 student_id=sid,
-                mcq_responses={q: int(r) for q, r in mcq[mcq["student_id"] == sid].iloc[0].items() if q.startswith("q")},
-                mcq_total=float(mcq.loc[mcq["student_id"] == sid, "total_score"].iloc[0]),
-                assignments=assign[assign["student_id"] == sid].iloc[0].to_dict(),
-                assignment_total=float(assign.loc[assign["student_id"] == sid, "total"].iloc[0]),
-                participation=part[part["student_id"] == sid].iloc[0].to_dict(),
-                participation_avg=float(part.loc[part["student_id"] == sid, "average"].iloc[0]),
+                mcq_responses=dict(zip(q_cols, responses[i])),
+                mcq_total=mcq_totals[i],
+                assignments=dict(zip(assign_cols, assign_values[i])),
+                assignment_total=assign_totals[i],
+                participation=dict(zip(part_cols, part_values[i])),
+                participation_avg=part_avgs[i],
             )
-            cd.students[sid] = sr
-        cd.mcq_questions = [c for c in mcq.columns if c.startswith("q")]
+        cd.mcq_questions = q_cols
+        return cd
+
+    def iter_mcq_chunks(self, filename: str = "mcq_results.csv", chunksize: int = 50_000) -> Iterator[pd.DataFrame]:
+        """Yield validated MCQ chunks with q* columns narrowed to int8."""
+        path = self.data_dir / filename
+        columns = pd.read_csv(path, nrows=0).columns
+        q_cols = [c for c in columns if c.startswith("q")]
+        # Read wide and check before narrowing: int8 parsing wraps 257 to 1
+        dtypes = {c: np.int64 for c in q_cols}
+        for start, chunk in _numbered_chunks(path, dtypes, chunksize):
+            values = chunk[q_cols].to_numpy()
+            if ((values != 0) & (values != 1)).any():
+                raise ValueError(f"MCQ file contains non-binary values (rows {start}-{start + len(chunk) - 1})")
+            yield chunk.astype({c: np.int8 for c in q_cols})
+
+    def iter_assignment_chunks(self, filename: str = "assignments.csv", chunksize: int = 50_000) -> Iterator[pd.DataFrame]:
+        """Yield assignment chunks."""
+        path = self.data_dir / filename
+        for _, chunk in _numbered_chunks(path, None, chunksize):
+            yield chunk
+
+    def iter_participation_chunks(self, filename: str = "participation.csv", chunksize: int = 50_000) -> Iterator[pd.DataFrame]:
+        """Yield validated participation chunks with week_* columns narrowed to int8."""
+        path = self.data_dir / filename
+        columns = pd.read_csv(path, nrows=0).columns
+        week_cols = [c for c in columns if c.startswith("week_")]
+        dtypes = {c: np.int64 for c in week_cols}
+        for start, chunk in _numbered_chunks(path, dtypes, chunksize):
+            values = chunk[week_cols].to_numpy()
+            if ((values < 1) | (values > 5)).any():
+                raise ValueError(f"Participation scores outside 1-5 range (rows {start}-{start + len(chunk) - 1})")
+            yield chunk.astype({c: np.int8 for c in week_cols})
+
+    def stream_all_data(self, chunksize: int = 50_000) -> "ClassData":
+        """
+        Merge the source files chunk by chunk into a columnar ClassData.
+
+        Only one chunk of each CSV is parsed at a time and each chunk is cut
+        down to the rows the result needs before the next is read, so peak
+        memory is bounded by the final ClassData rather than the CSV files.
+        Throughput and peak RSS are recorded in self.last_stream_stats.
+        """
+        start = time.perf_counter()
+        builder = ClassDataBuilder()
+        for chunk in self.iter_mcq_chunks(chunksize=chunksize):
+            builder.add_mcq_chunk(chunk)
+        for chunk in self.iter_assignment_chunks(chunksize=chunksize):
+            builder.add_assignment_chunk(chunk)
+        for chunk in self.iter_participation_chunks(chunksize=chunksize):
+            builder.add_participation_chunk(chunk)
+        cd = builder.build()
+
+        self.last_stream_stats = StreamStats(
+            rows=builder.num_rows,
+            seconds=time.perf_counter() - start,
+            peak_rss_mb=_peak_rss_mb(),
+        )
         return cd
 
+
+@dataclass
+class StreamStats:
+    """Throughput report for one DataIngestion.stream_all_data run."""
+    rows: int
+    seconds: float
+    peak_rss_mb: Optional[float]  # process-wide peak; None where unsupported
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def __str__(self) -> str:
+        rss = f"{self.peak_rss_mb:.1f} MB" if self.peak_rss_mb is not None else "n/a"
+        return f"{self.rows} rows in {self.seconds:.2f}s ({self.rows_per_sec:,.0f} rows/sec, peak RSS {rss})"
+
+
+class ClassDataBuilder:
+    """
+    Assembles a columnar ClassData from incrementally added chunks.
+
+    MCQ chunks are reduced to uint8 response blocks as they arrive.
+    Assignment and participation chunks keep only the first row for each
+    student, and, once MCQ data has been added, only rows for students in
+    it, so the retained frames never outgrow the final tables. Everything
+    is joined and aligned in build().
+    """
+    def __init__(self):
+        self.mcq_questions: Optional[List[str]] = None
+        self.num_rows = 0
+        self._ids: List[List[str]] = []
+        self._responses: List[np.ndarray] = []
+        self._totals: List[np.ndarray] = []
+        self._assignments: List[pd.DataFrame] = []
+        self._participation: List[pd.DataFrame] = []
+        self._assignment_ids: set = set()
+        self._participation_ids: set = set()
+        self._mcq_ids: Optional[set] = None
+
+    def add_mcq_chunk(self, chunk: pd.DataFrame) -> None:
+        q_cols = [c for c in chunk.columns if c.startswith("q")]
+        if self.mcq_questions is None:
+            self.mcq_questions = q_cols
+        elif q_cols != self.mcq_questions:
+            raise ValueError("MCQ chunk columns do not match earlier chunks")
+        self._ids.append(chunk["student_id"].tolist())
+        self._responses.append(chunk[q_cols].to_numpy().astype(np.uint8))
+        self._totals.append(chunk["total_score"].to_numpy(dtype=float))
+        self.num_rows += len(chunk)
+        self._mcq_ids = None
+
+    @property
+    def buffered_rows(self) -> int:
+        """Assignment and participation rows held for build()."""
+        return sum(len(c) for c in self._assignments) + sum(len(c) for c in self._participation)
+
+    def add_assignment_chunk(self, chunk: pd.DataFrame) -> None:
+        self._assignments.append(self._new_rows(chunk, self._assignment_ids))
+
+    def add_participation_chunk(self, chunk: pd.DataFrame) -> None:
+        self._participation.append(self._new_rows(chunk, self._participation_ids))
+
+    def _new_rows(self, chunk: pd.DataFrame, seen: set) -> pd.DataFrame:
+        """Rows of chunk for students not yet in seen (first row wins)."""
+        chunk = chunk.drop_duplicates("student_id", keep="first")
+        keep = ~chunk["student_id"].isin(seen)
+        if self._ids:
+            if self._mcq_ids is None:
+                self._mcq_ids = {sid for ids in self._ids for sid in ids}
+            keep &= chunk["student_id"].isin(self._mcq_ids)
+        chunk = chunk[keep]
+        seen.update(chunk["student_id"])
+        return chunk
+
+    def build(self) -> "ClassData":
+        if self.mcq_questions is None:
+            raise ValueError("No MCQ data was added")
+        student_ids = [sid for ids in self._ids for sid in ids]
+        responses = np.concatenate(self._responses)
+        totals = np.concatenate(self._totals)
+        # first row wins for duplicated ids, as in merge_all_data
+        keep = ~pd.Index(student_ids).duplicated(keep="first")
+        if not keep.all():
+            student_ids = [sid for sid, k in zip(student_ids, keep) if k]
+            responses = responses[keep]
+            totals = totals[keep]
+        assign = pd.concat(self._assignments, ignore_index=True)
+        part = pd.concat(self._participation, ignore_index=True)
+        return ClassData.from_arrays(
+            student_ids=student_ids,
+            mcq_questions=self.mcq_questions,
+            responses=responses,
+            mcq_totals=totals,
+            assignment_table=_rows_by_student(assign, student_ids, "assignments"),
+            participation_table=_rows_by_student(part, student_ids, "participation"),
+        )
+
+
+def _numbered_chunks(path: Path, dtypes: Optional[dict], chunksize: int) -> Iterator[tuple]:
+    """Yield (first_row_number, chunk) pairs from a CSV file."""
+    start = 0
+    with pd.read_csv(path, dtype=dtypes, chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield start, chunk
+            start += len(chunk)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, if the platform reports it."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+def _rows_by_student(df: pd.DataFrame, student_ids: list, source: str) -> pd.DataFrame:
+    """Return the first row of df for each student id, in student_ids order."""
+    df = df.drop_duplicates("student_id", keep="first")
+    positions = pd.Index(df["student_id"]).get_indexer(student_ids)
+    if (positions < 0).any():
+        missing = [sid for sid, pos in zip(student_ids, positions) if pos < 0]
+        raise ValueError(f"Students missing from {source} data: {missing[:5]}")
+    return df.iloc[positions]
+
 class StudentRecord:
     """Represents one student's scores."""
+    __slots__ = (
+        "student_id",
+        "mcq_responses",
+        "mcq_total",
+        "assignments",
+        "assignment_total",
+        "participation",
+        "participation_avg",
+    )
+
     def __init__(
         self,
         student_id: str,
@@ -93,10 +329,70 @@ class StudentRecord:
         self.participation_avg = participation_avg
 
 class ClassData:
-    """Holds an entire class’s worth of StudentRecords."""
+    """
+    Holds an entire class’s worth of StudentRecords.
+
+    In the default row mode `students` is a plain dict of StudentRecord
+    objects. In columnar mode (see from_arrays) all MCQ responses live in
+    one contiguous uint8 matrix (rows=students, cols=questions) and
+    `students` is a read-only mapping that builds StudentRecord views over
+    a row on access, so nothing per-student is stored as Python objects.
+    """
     def __init__(self):
         self.students = {}
         self.mcq_questions = []
+        # Columnar storage, only populated by from_arrays()
+        self.student_ids: List[str] = []
+        self.student_index: Dict[str, int] = {}
+        self.question_index: Dict[str, int] = {}
+        self.responses: Optional[np.ndarray] = None
+        self.mcq_totals: Optional[np.ndarray] = None
+        self.assignment_table: Optional[pd.DataFrame] = None
+        self.participation_table: Optional[pd.DataFrame] = None
+
+    @classmethod
+    def from_arrays(
+        cls,
+        student_ids: List[str],
+        mcq_questions: List[str],
+        responses: np.ndarray,
+        mcq_totals: np.ndarray,
+        assignment_table: pd.DataFrame,
+        participation_table: pd.DataFrame,
+        validate: bool = True,
+    ) -> "ClassData":
+        """
+        Build a columnar ClassData; tables must be in student_ids order.
+
+        validate=False skips the 0/1 scan of the response matrix, for
+        trusted sources such as a memory-mapped cache that should not be
+        paged in just to be checked.
+        """
+        responses = np.asarray(responses)
+        if responses.shape != (len(student_ids), len(mcq_questions)):
+            raise ValueError("Response matrix shape does not match students x questions")
+        if validate and responses.size and not np.isin(responses, (0, 1)).all():
+            raise ValueError("MCQ response values must be 0 or 1")
+        if len(assignment_table) != len(student_ids) or len(participation_table) != len(student_ids):
+            raise ValueError("Assignment and participation tables must have one row per student")
+
+        cd = cls()
+        cd.student_ids = list(student_ids)
+        cd.student_index = {sid: i for i, sid in enumerate(cd.student_ids)}
+        if len(cd.student_index) != len(cd.student_ids):
+            raise ValueError("Duplicate student IDs in columnar class data")
+        cd.mcq_questions = list(mcq_questions)
+        cd.question_index = {q: j for j, q in enumerate(cd.mcq_questions)}
+        cd.responses = np.ascontiguousarray(responses, dtype=np.uint8)
+        cd.mcq_totals = np.asarray(mcq_totals, dtype=float)
+        cd.assignment_table = assignment_table.reset_index(drop=True)
+        cd.participation_table = participation_table.reset_index(drop=True)
+        cd.students = _ColumnarStudents(cd)
+        return cd
+
+    @property
+    def is_columnar(self) -> bool:
+        return self.responses is not None
 
     @property
     def num_students(self) -> int:
@@ -106,6 +402,98 @@ class ClassData:
     def num_questions(self) -> int:
         return len(self.mcq_questions)
 
+    def get_student_ids(self) -> List[str]:
+        """Student ids in response-matrix row order."""
+        if self.is_columnar:
+            return self.student_ids
+        return list(self.students.keys())
+
+    def get_response_matrix(self) -> np.ndarray:
+        """
+        Return the uint8 response matrix (rows=students, cols=mcq_questions).
+
+        Columnar data returns its backing array without copying; row mode
+        builds it from each record, treating unanswered questions as 0.
+        """
+        if self.is_columnar:
+            return self.responses
+        matrix = np.zeros((len(self.students), len(self.mcq_questions)), dtype=np.uint8)
+        for i, student in enumerate(self.students.values()):
+            matrix[i] = [student.mcq_responses.get(q, 0) for q in self.mcq_questions]
+        return matrix
+
+
+class _ResponseRow(Mapping):
+    """Read-only question_id -> 0/1 mapping over one response-matrix row."""
+    __slots__ = ("_row", "_question_index")
+
+    def __init__(self, row: np.ndarray, question_index: Dict[str, int]):
+        self._row = row
+        self._question_index = question_index
+
+    def __getitem__(self, question_id: str) -> int:
+        return int(self._row[self._question_index[question_id]])
+
+    def __iter__(self):
+        return iter(self._question_index)
+
+    def __len__(self) -> int:
+        return len(self._question_index)
+
+
+class _StudentRowView(StudentRecord):
+    """StudentRecord whose fields are read lazily from a columnar ClassData."""
+    __slots__ = ("_class_data", "_row")
+
+    def __init__(self, class_data: ClassData, row: int):
+        self._class_data = class_data
+        self._row = row
+
+    @property
+    def student_id(self) -> str:
+        return self._class_data.student_ids[self._row]
+
+    @property
+    def mcq_responses(self) -> _ResponseRow:
+        return _ResponseRow(self._class_data.responses[self._row], self._class_data.question_index)
+
+    @property
+    def mcq_total(self) -> float:
+        return float(self._class_data.mcq_totals[self._row])
+
+    @property
+    def assignments(self) -> dict:
+        return self._class_data.assignment_table.iloc[self._row].to_dict()
+
+    @property
+    def assignment_total(self) -> float:
+        return float(self._class_data.assignment_table["total"].iat[self._row])
+
+    @property
+    def participation(self) -> dict:
+        return self._class_data.participation_table.iloc[self._row].to_dict()
+
+    @property
+    def participation_avg(self) -> float:
+        return float(self._class_data.participation_table["average"].iat[self._row])
+
+
+class _ColumnarStudents(Mapping):
+    """Read-only student_id -> StudentRecord view mapping for columnar ClassData."""
+    __slots__ = ("_class_data",)
+
+    def __init__(self, class_data: ClassData):
+        self._class_data = class_data
+
+    def __getitem__(self, student_id: str) -> StudentRecord:
+        return _StudentRowView(self._class_data, self._class_data.student_index[student_id])
+
+    def __iter__(self):
+        return iter(self._class_data.student_ids)
+
+    def __len__(self) -> int:
+        return len(self._class_data.student_ids)
+
 def generate_sample_data(
     output_dir: Path,
     num_students: int = 10,
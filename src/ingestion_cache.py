@@ -0,0 +1,206 @@
+"""
+On-disk cache for merged class data.
+
+Parsing mcq_results.csv, assignments.csv and participation.csv on every run
+is wasted work once the files stop changing. This module stores the merged
+columnar ClassData next to the sources:
+
+- responses.npy  - the uint8 response matrix, memory-mapped on warm loads
+- arrays.npz     - MCQ totals and the numeric assignment/participation
+                   table columns
+- objects.json   - student ids and the remaining table columns, as JSON so
+                   ids keep their type and missing values stay NaN
+- manifest.json  - source file size/mtime/sha256 plus column metadata
+
+A cache entry is valid while every source file matches its manifest entry.
+Size and mtime are checked first; if only the mtime moved, the sha256 is
+compared before deciding to rebuild.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from src.ingestion import ClassData, DataIngestion
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 2
+CACHE_DIRNAME = ".ingestion_cache"
+SOURCE_FILES = ("mcq_results.csv", "assignments.csv", "participation.csv")
+
+
+class ClassDataCache:
+    """Builds, validates and loads the binary cache for one data directory."""
+
+    def __init__(self, data_dir: Path, cache_dir: Optional[Path] = None):
+        self.data_dir = Path(data_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir else self.data_dir / CACHE_DIRNAME
+
+    def load(self, rebuild: bool = False, chunksize: Optional[int] = None) -> ClassData:
+        """
+        Return cached class data, rebuilding it first if sources changed.
+
+        With chunksize, a rebuild streams the sources in chunks of that many
+        rows (see DataIngestion.stream_all_data).
+        """
+        if not rebuild:
+            manifest = self._valid_manifest()
+            if manifest is not None:
+                return self._read(manifest)
+        logger.info(f"Rebuilding ingestion cache in {self.cache_dir}")
+        # Sign the sources before reading them, so a file that changes
+        # mid-build leaves a stale manifest instead of a wrong cache
+        sources = self._source_signatures()
+        ingestion = DataIngestion(self.data_dir)
+        if chunksize:
+            class_data = ingestion.stream_all_data(chunksize=chunksize)
+        else:
+            class_data = ingestion.merge_all_data(columnar=True)
+        self.write(class_data, sources=sources)
+        return class_data
+
+    def is_fresh(self) -> bool:
+        """True if the cache exists and matches the current source files."""
+        return self._valid_manifest() is not None
+
+    def write(self, class_data: ClassData, sources: Optional[Dict] = None) -> None:
+        """
+        Write a columnar ClassData to the cache directory atomically.
+
+        sources are the signatures of the files class_data was read from,
+        taken before reading them; they default to the files' current state.
+        """
+        if not class_data.is_columnar:
+            raise ValueError("Only columnar ClassData can be cached")
+        if sources is None:
+            sources = self._source_signatures()
+
+        arrays = {"mcq_totals": class_data.mcq_totals}
+        objects = {"student_ids": _plain_list(class_data.student_ids)}
+        tables = {}
+        for name, table in (("assignments", class_data.assignment_table),
+                            ("participation", class_data.participation_table)):
+            columns = []
+            for i, col in enumerate(table.columns):
+                values = table[col].to_numpy()
+                if np.issubdtype(values.dtype, np.number):
+                    arrays[f"{name}_{i}"] = values
+                else:
+                    objects[f"{name}_{i}"] = _plain_list(values)
+                columns.append(str(col))
+            tables[name] = columns
+
+        manifest = {
+            "version": CACHE_VERSION,
+            "sources": sources,
+            "mcq_questions": class_data.mcq_questions,
+            "tables": tables,
+        }
+
+        # Build the new entry beside the old one and swap it in whole
+        self.cache_dir.parent.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(prefix=".tmp_", dir=self.cache_dir.parent))
+        try:
+            np.save(staging / "responses.npy", class_data.responses)
+            np.savez(staging / "arrays.npz", **arrays)
+            with open(staging / "objects.json", "w", encoding="utf-8") as f:
+                json.dump(objects, f)
+            with open(staging / "manifest.json", "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+            if self.cache_dir.exists():
+                shutil.rmtree(self.cache_dir)
+            os.replace(staging, self.cache_dir)
+        finally:
+            if staging.exists():
+                shutil.rmtree(staging)
+
+    def _source_signatures(self) -> Dict:
+        return {name: _file_signature(self.data_dir / name) for name in SOURCE_FILES}
+
+    def _valid_manifest(self) -> Optional[Dict]:
+        manifest_path = self.cache_dir / "manifest.json"
+        if not manifest_path.exists():
+            return None
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if manifest.get("version") != CACHE_VERSION:
+            return None
+
+        touched = False
+        for name in SOURCE_FILES:
+            cached = manifest["sources"].get(name)
+            path = self.data_dir / name
+            if cached is None or not path.exists():
+                return None
+            stat = path.stat()
+            if stat.st_size != cached["size"]:
+                return None
+            if stat.st_mtime_ns != cached["mtime_ns"]:
+                if _sha256(path) != cached["sha256"]:
+                    return None
+                cached["mtime_ns"] = stat.st_mtime_ns
+                touched = True
+
+        if touched:
+            # Content unchanged; remember the new mtimes to skip hashing next time
+            with open(manifest_path, "w", encoding="utf-8") as f:
+                json.dump(manifest, f, indent=2)
+        return manifest
+
+    def _read(self, manifest: Dict) -> ClassData:
+        responses = np.load(self.cache_dir / "responses.npy", mmap_mode="r")
+        with open(self.cache_dir / "objects.json", "r", encoding="utf-8") as f:
+            objects = json.load(f)
+        with np.load(self.cache_dir / "arrays.npz") as arrays:
+            mcq_totals = arrays["mcq_totals"]
+            # numeric columns live in arrays.npz, the rest in objects.json
+            columns = {**{key: arrays[key] for key in arrays.files}, **objects}
+            tables = {
+                name: pd.DataFrame({col: columns[f"{name}_{i}"] for i, col in enumerate(names)})
+                for name, names in manifest["tables"].items()
+            }
+        return ClassData.from_arrays(
+            student_ids=objects["student_ids"],
+            mcq_questions=manifest["mcq_questions"],
+            responses=responses,
+            mcq_totals=mcq_totals,
+            assignment_table=tables["assignments"],
+            participation_table=tables["participation"],
+            validate=False,  # validated when the cache was written
+        )
+
+
+def load_class_data(data_dir: Path, cache_dir: Optional[Path] = None, rebuild: bool = False,
+                    chunksize: Optional[int] = None) -> ClassData:
+    """Load merged class data for data_dir through the binary cache."""
+    return ClassDataCache(data_dir, cache_dir).load(rebuild=rebuild, chunksize=chunksize)
+
+
+def _plain_list(values) -> list:
+    """Values as JSON-ready Python scalars; NaN is kept and written as NaN."""
+    return [v.item() if isinstance(v, np.generic) else v for v in values]
+
+
+def _file_signature(path: Path) -> Dict:
+    stat = path.stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": _sha256(path)}
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
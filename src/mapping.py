@@ -4,11 +4,24 @@ Maps questions to syllabus topics automatically with confidence scoring
 """
 
 import json
+import os
 import re
-from typing import Dict, List, Optional
+from bisect import bisect_right
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from itertools import accumulate, chain
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
 from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
+from scipy import sparse
+
+try:
+    from src.question_bank import QuestionBank, is_sqlite_bank
+except ImportError:  # imported as a top-level module with src/ on sys.path
+    from question_bank import QuestionBank, is_sqlite_bank
+
 
 @dataclass
 class Topic:
@@ -38,14 +51,515 @@ class QuestionTopicMapping:
         }
 
 
+class MappingStore(Sequence):
+    """
+    Question-topic mappings as parallel arrays, indexed by question and topic.
+    
+    Row i is the mapping (question_ids[question_index[i]],
+    topic_ids[topic_index[i]], confidence[i], METHODS[method[i]]). Rows
+    keep mapping order - grouped by question, best topic first - and the
+    store behaves as a read-only list of QuestionTopicMapping objects,
+    built on access, so code iterating over TopicMapper.mappings keeps
+    working. Confidences stay float64 so they equal
+    calculate_topic_confidence exactly.
+    """
+    
+    METHODS = ("auto", "manual")
+    
+    def __init__(self, question_ids: List[str], topic_ids: List[str], question_index, topic_index,
+                 confidence, method):
+        self.question_ids = list(question_ids)
+        self.topic_ids = list(topic_ids)
+        self.question_index = np.asarray(question_index, dtype=np.int32)
+        self.topic_index = np.asarray(topic_index, dtype=np.int32)
+        self.confidence = np.asarray(confidence, dtype=np.float64)
+        self.method = np.asarray(method, dtype=np.uint8)
+        
+        # First position wins for a repeated id, as in QuestionIndex
+        self._question_pos: Dict[str, int] = {}
+        for i, question_id in enumerate(self.question_ids):
+            self._question_pos.setdefault(question_id, i)
+        self._topic_pos = {topic_id: i for i, topic_id in enumerate(self.topic_ids)}
+        # Rows of question (topic) i, in mapping order, are
+        # _by_question[_question_offsets[i]:_question_offsets[i + 1]]
+        self._by_question, self._question_offsets = _group_rows(self.question_index, len(self.question_ids))
+        self._by_topic, self._topic_offsets = _group_rows(self.topic_index, len(self.topic_ids))
+    
+    @classmethod
+    def from_mappings(cls, mappings: Iterable[QuestionTopicMapping]) -> "MappingStore":
+        """Store holding mappings in the given order."""
+        question_pos: Dict[str, int] = {}
+        topic_pos: Dict[str, int] = {}
+        question_index, topic_index, confidence, method = [], [], [], []
+        for mapping in mappings:
+            question_index.append(question_pos.setdefault(mapping.question_id, len(question_pos)))
+            topic_index.append(topic_pos.setdefault(mapping.topic_id, len(topic_pos)))
+            confidence.append(mapping.confidence)
+            method.append(cls.METHODS.index(mapping.method))
+        return cls(list(question_pos), list(topic_pos), question_index, topic_index, confidence, method)
+    
+    def __len__(self) -> int:
+        return len(self.confidence)
+    
+    def __getitem__(self, index: Union[int, slice]):
+        if isinstance(index, slice):
+            return [self._mapping(row) for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("mapping index out of range")
+        return self._mapping(index)
+    
+    def __iter__(self) -> Iterator[QuestionTopicMapping]:
+        return map(
+            QuestionTopicMapping,
+            map(self.question_ids.__getitem__, self.question_index.tolist()),
+            map(self.topic_ids.__getitem__, self.topic_index.tolist()),
+            self.confidence.tolist(),
+            map(self.METHODS.__getitem__, self.method.tolist()),
+        )
+    
+    def for_question(self, question_id: str) -> List[QuestionTopicMapping]:
+        """Mappings of one question, best first."""
+        i = self._question_pos.get(question_id)
+        if i is None:
+            return []
+        rows = self._by_question[self._question_offsets[i]:self._question_offsets[i + 1]]
+        return [self._mapping(row) for row in rows.tolist()]
+    
+    def for_topic(self, topic_id: str) -> List[QuestionTopicMapping]:
+        """Mappings to one topic, in mapping order."""
+        i = self._topic_pos.get(topic_id)
+        if i is None:
+            return []
+        rows = self._by_topic[self._topic_offsets[i]:self._topic_offsets[i + 1]]
+        return [self._mapping(row) for row in rows.tolist()]
+    
+    def best_topic(self, question_id: str) -> Optional[str]:
+        """The question's first (highest-confidence) topic, or None if unmapped."""
+        i = self._question_pos.get(question_id)
+        if i is None or self._question_offsets[i] == self._question_offsets[i + 1]:
+            return None
+        return self.topic_ids[self.topic_index[self._by_question[self._question_offsets[i]]]]
+    
+    def _mapping(self, row: int) -> QuestionTopicMapping:
+        return QuestionTopicMapping(
+            self.question_ids[self.question_index[row]],
+            self.topic_ids[self.topic_index[row]],
+            float(self.confidence[row]),
+            self.METHODS[self.method[row]],
+        )
+
+
+def _group_rows(keys: np.ndarray, num_keys: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Rows sorted by key (stable) and CSR offsets of each key's run."""
+    order = np.argsort(keys, kind="stable")
+    offsets = np.zeros(num_keys + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=num_keys), out=offsets[1:])
+    return order, offsets
+
+
+@dataclass
+class ClassTopicMastery:
+    """
+    Students x topics results for a whole class.
+    
+    Row s of correct and success_rate holds what aggregate_weak_questions
+    reports for student_ids[s]; for_student rebuilds that dict for one
+    student.
+    """
+    student_ids: List[str]
+    topic_ids: List[str]
+    topic_titles: List[str]
+    correct: np.ndarray  # students x topics correct answers
+    total_questions: np.ndarray  # mapped questions per topic
+    confidence_sum: np.ndarray  # mapping confidence per topic
+    topic_questions: List[List[str]]  # mapped question ids per topic, in mapping order
+    answers: np.ndarray  # students x questions, True where correct
+    question_columns: Dict[str, int]
+    
+    @property
+    def success_rate(self) -> np.ndarray:
+        """students x topics share of each topic's mapped questions answered correctly."""
+        rate = np.zeros(self.correct.shape)
+        np.divide(self.correct, self.total_questions, out=rate, where=self.total_questions > 0)
+        return rate
+    
+    def for_student(self, student_id: str) -> Dict[str, Dict]:
+        """One student's topic stats, as returned by aggregate_weak_questions."""
+        s = self.student_ids.index(student_id)
+        answers = self.answers[s]
+        stats = {}
+        for t, topic_id in enumerate(self.topic_ids):
+            total = int(self.total_questions[t])
+            correct = int(self.correct[s, t])
+            confidence_sum = float(self.confidence_sum[t])
+            stats[topic_id] = {
+                "title": self.topic_titles[t],
+                "total_questions": total,
+                "correct_answers": correct,
+                "wrong_questions": [
+                    q for q in self.topic_questions[t]
+                    if q not in self.question_columns or not answers[self.question_columns[q]]
+                ],
+                "success_rate": correct / total if total else 0.0,
+                "confidence_sum": confidence_sum,
+                "avg_confidence": confidence_sum / total if total else 0.0,
+            }
+        return stats
+
+
+class KeywordMatcher:
+    """
+    Precompiled matcher scoring many questions against every topic at once.
+    
+    calculate_topic_confidence tests each keyword with a substring scan, so
+    mapping a bank costs questions x topics x keywords scans. A pattern
+    (keyword or title word) without whitespace can only occur inside one
+    whitespace-delimited chunk of a question, so each question is split
+    once and its chunks are looked up in a cache of the chunks known to
+    contain patterns. Question banks reuse a small vocabulary, so new chunks
+    are rare; the few multi-word patterns are searched for directly. An
+    inverted index from pattern to topics turns each question's matched
+    patterns into its few candidate topics with match counts, and only
+    those candidates are scored, replaying the float steps of
+    calculate_topic_confidence so the scores are identical.
+    """
+    
+    MAX_CACHED_CHUNKS = 200_000
+    MAX_MATRIX_CELLS = 16_000_000  # bounds the question x pattern block
+    
+    def __init__(self, topics: Dict[str, Topic]):
+        self.topic_ids = list(topics.keys())
+        self.num_keywords = np.array([len(topic.keywords) for topic in topics.values()], dtype=np.int64)
+        
+        pattern_ids: Dict[str, int] = {}
+        keyword_hits: List[Tuple[int, int]] = []
+        title_hits: List[Tuple[int, int]] = []
+        # Duplicates are kept, as the original loops count them twice
+        for t, topic in enumerate(topics.values()):
+            for keyword in topic.keywords:
+                keyword_hits.append((pattern_ids.setdefault(keyword.lower(), len(pattern_ids)), t))
+            for word in topic.title.lower().split():
+                if len(word) > 3:
+                    title_hits.append((pattern_ids.setdefault(word, len(pattern_ids)), t))
+        
+        self.num_patterns = len(pattern_ids)
+        self._untagged = np.flatnonzero(self.num_keywords == 0)  # always score at least 0.1
+        
+        # Inverted index: pattern -> (topic, keyword count, title-word count)
+        # entries, stored as CSR arrays so whole batches expand at once
+        entries: Dict[int, Dict[int, List[int]]] = {}
+        for kind, hits in ((0, keyword_hits), (1, title_hits)):
+            for pattern, t in hits:
+                entries.setdefault(pattern, {}).setdefault(t, [0, 0])[kind] += 1
+        rows = [sorted(entries.get(pattern, {}).items()) for pattern in range(self.num_patterns)]
+        self._index_sizes = np.array([len(row) for row in rows], dtype=np.int64)
+        self._index_offsets = np.cumsum(self._index_sizes) - self._index_sizes
+        flat = [entry for row in rows for entry in row]
+        self._index_topics = np.array([t for t, _ in flat], dtype=np.int64)
+        self._index_keyword = np.array([counts[0] for _, counts in flat], dtype=np.int64)
+        self._index_title = np.array([counts[1] for _, counts in flat], dtype=np.int64)
+        title_totals = np.bincount(self._index_topics, weights=self._index_title, minlength=len(topics))
+        self._max_title_count = int(title_totals.max(initial=0))
+        
+        # The empty keyword is "in" every text
+        self._always = [i for text, i in pattern_ids.items() if not text]
+        # Patterns containing whitespace can span chunks and are searched whole
+        self._phrases = [(text, i) for text, i in pattern_ids.items() if text and text.split() != [text]]
+        self._words = [(text, i) for text, i in pattern_ids.items() if text and text.split() == [text]]
+        
+        self._seen_chunks: set = set()
+        # chunk containing a pattern -> row; row r's pattern ids are
+        # _chunk_patterns[_chunk_offsets[r]:_chunk_offsets[r] + _chunk_sizes[r]]
+        self._hit_chunks: Dict[str, int] = {}
+        self._chunk_patterns = np.zeros(0, dtype=np.int64)
+        self._chunk_offsets = np.zeros(0, dtype=np.int64)
+        self._chunk_sizes = np.zeros(0, dtype=np.int64)
+    
+    def topic_confidences(self, question_text: str) -> List[Tuple[str, float]]:
+        """(topic_id, confidence) for every topic with non-zero confidence, in topic order."""
+        _, topic_idx, confidence = self.score_texts([question_text], sort=False)
+        return [(self.topic_ids[t], c) for t, c in zip(topic_idx.tolist(), confidence.tolist())]
+    
+    def score_texts(
+        self,
+        texts: List[str],
+        sort: bool = True,
+        top_k: Optional[int] = None,
+        min_confidence: float = 0.0,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Score texts against the topics they share patterns with.
+        
+        Only (text, topic) pairs reached through the inverted index are
+        scored; every other topic has confidence 0 except keyword-less
+        topics, which calculate_topic_confidence scores 0.1 for any text.
+        
+        Args:
+            texts: Question texts (stem plus options)
+            sort: Order each text's topics by descending confidence (ties in
+                topic order), as map_question_to_topics does; otherwise
+                topic order
+            top_k: Keep only each text's top_k topics by that ordering
+            min_confidence: Drop scores below this value
+        
+        Returns:
+            (text index, topic index, confidence) arrays for every kept
+            non-zero confidence, grouped by text
+        """
+        block = max(1, self.MAX_MATRIX_CELLS // max(self.num_patterns, 1))
+        if len(texts) > block:
+            parts = [
+                self.score_texts(texts[i:i + block], sort, top_k, min_confidence)
+                for i in range(0, len(texts), block)
+            ]
+            offsets = range(0, len(texts), block)
+            return (
+                np.concatenate([rows + offset for (rows, _, _), offset in zip(parts, offsets)]),
+                np.concatenate([cols for _, cols, _ in parts]),
+                np.concatenate([values for _, _, values in parts]),
+            )
+        
+        num_topics = len(self.topic_ids)
+        text_idx, pattern_idx = np.nonzero(self.match_patterns(list(map(str.lower, texts))))
+        
+        # Expand each present pattern into its index entries
+        sizes = self._index_sizes[pattern_idx]
+        first = np.repeat(self._index_offsets[pattern_idx] - (np.cumsum(sizes) - sizes), sizes)
+        entry = first + np.arange(len(first))
+        keys = np.repeat(text_idx, sizes) * num_topics + self._index_topics[entry]
+        keyword_hits, title_hits = self._index_keyword[entry], self._index_title[entry]
+        if len(self._untagged):
+            untagged = (np.arange(len(texts))[:, None] * num_topics + self._untagged).ravel()
+            keys = np.concatenate([keys, untagged])
+            keyword_hits = np.concatenate([keyword_hits, np.zeros(len(untagged), dtype=np.int64)])
+            title_hits = np.concatenate([title_hits, np.zeros(len(untagged), dtype=np.int64)])
+        
+        # Sum counts per (text, topic) candidate
+        candidates, inverse = np.unique(keys, return_inverse=True)
+        keyword_counts = np.bincount(inverse, weights=keyword_hits, minlength=len(candidates)).astype(np.int64)
+        title_counts = np.bincount(inverse, weights=title_hits, minlength=len(candidates)).astype(np.int64)
+        rows, cols = np.divmod(candidates, num_topics)
+        values = self._confidence(self.num_keywords[cols], keyword_counts, title_counts)
+        
+        keep = (values > 0.0) & (values >= min_confidence)
+        rows, cols, values = rows[keep], cols[keep], values[keep]
+        if sort or top_k is not None:
+            # candidates are in (text, topic) order, so ties stay in topic order
+            order = np.lexsort((-values, rows))
+            rows, cols, values = rows[order], cols[order], values[order]
+        if top_k is not None:
+            group_start = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+            rank = np.arange(len(rows)) - np.repeat(group_start, np.diff(np.r_[group_start, len(rows)]))
+            kept = rank < top_k
+            rows, cols, values = rows[kept], cols[kept], values[kept]
+            if not sort:
+                order = np.lexsort((cols, rows))
+                rows, cols, values = rows[order], cols[order], values[order]
+        return rows, cols, values
+    
+    def _confidence(self, num_keywords: np.ndarray, keyword_counts: np.ndarray, title_counts: np.ndarray) -> np.ndarray:
+        """Same float operations, in the same order, as calculate_topic_confidence."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            confidence = keyword_counts / num_keywords
+        for step in range(self._max_title_count):
+            confidence = np.where(title_counts > step, confidence + 0.1, confidence)
+        confidence = np.minimum(confidence, 1.0)
+        title_only = np.where(title_counts > 0, np.minimum(title_counts * 0.2, 1.0), 0.1)
+        return np.where(num_keywords > 0, confidence, title_only)
+    
+    def match_patterns(self, lowered: List[str]) -> np.ndarray:
+        """Boolean texts x patterns matrix: does pattern j occur in lowercased text i."""
+        chunk_lists = list(map(str.split, lowered))
+        if not self._seen_chunks.issuperset(chain.from_iterable(chunk_lists)):
+            self._index_chunks(set().union(*chunk_lists))
+        
+        # Distinct chunks of each text that contain at least one pattern
+        text_hits = list(map(self._hit_chunks.keys().__and__, chunk_lists))
+        counts = np.fromiter(map(len, text_hits), dtype=np.int64, count=len(text_hits))
+        chunk_rows = np.fromiter(map(self._hit_chunks.__getitem__, chain.from_iterable(text_hits)),
+                                 dtype=np.int64, count=int(counts.sum()))
+        
+        # Expand each chunk into its pattern ids (CSR layout)
+        sizes = self._chunk_sizes[chunk_rows]
+        first = np.repeat(self._chunk_offsets[chunk_rows] - (np.cumsum(sizes) - sizes), sizes)
+        present = np.zeros((len(lowered), self.num_patterns), dtype=bool)
+        present[
+            np.repeat(np.repeat(np.arange(len(lowered)), counts), sizes),
+            self._chunk_patterns[first + np.arange(len(first))],
+        ] = True
+        present[:, self._always] = True
+        if self._phrases:
+            self._match_phrases(lowered, present)
+        return present
+    
+    def _index_chunks(self, batch_chunks: set) -> None:
+        """Make sure every chunk of the current batch is indexed."""
+        chunks = batch_chunks - self._seen_chunks
+        if len(self._seen_chunks) + len(chunks) > self.MAX_CACHED_CHUNKS:
+            # Evicting drops this batch's known chunks too, so index all of them
+            chunks = batch_chunks
+            self._seen_chunks.clear()
+            self._hit_chunks.clear()
+            self._chunk_patterns = self._chunk_patterns[:0]
+            self._chunk_offsets = self._chunk_offsets[:0]
+            self._chunk_sizes = self._chunk_sizes[:0]
+        rows = []
+        for chunk in chunks:
+            row = [i for text, i in self._words if text in chunk]
+            if row:
+                self._hit_chunks[chunk] = len(self._chunk_sizes) + len(rows)
+                rows.append(row)
+        self._seen_chunks.update(chunks)
+        if rows:
+            sizes = np.array([len(row) for row in rows], dtype=np.int64)
+            self._chunk_offsets = np.concatenate(
+                [self._chunk_offsets, len(self._chunk_patterns) + np.cumsum(sizes) - sizes]
+            )
+            self._chunk_sizes = np.concatenate([self._chunk_sizes, sizes])
+            self._chunk_patterns = np.concatenate([self._chunk_patterns, np.concatenate(rows)])
+    
+    def _match_phrases(self, lowered: List[str], present: np.ndarray) -> None:
+        """Find multi-word patterns with one str.find scan of the joined batch."""
+        joined = "\0".join(lowered)
+        ends = [end - 1 for end in accumulate(len(text) + 1 for text in lowered)]
+        for phrase, j in self._phrases:
+            pos = joined.find(phrase)
+            while pos != -1:
+                i = bisect_right(ends, pos)
+                if pos + len(phrase) <= ends[i]:
+                    present[i, j] = True
+                    # One hit per text is enough; resume at the next text
+                    pos = joined.find(phrase, ends[i] + 1)
+                else:
+                    # Straddles a separator: not an occurrence in either text
+                    pos = joined.find(phrase, pos + 1)
+
+
+# State for map_all_questions pool workers, set once per worker process by
+# _init_worker; the in-process path uses the mapper's own matcher instead
+_worker: Dict[str, object] = {}
+
+
+def _init_worker(matcher: KeywordMatcher, top_k: Optional[int], min_confidence: float) -> None:
+    _worker["matcher"] = matcher
+    _worker["top_k"] = top_k
+    _worker["min_confidence"] = min_confidence
+
+
+def _score_shard(texts: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Score one shard of question texts with the worker's matcher."""
+    return _worker["matcher"].score_texts(
+        texts, top_k=_worker["top_k"], min_confidence=_worker["min_confidence"]
+    )
+
+
+def iter_bank_questions(questions: Dict) -> Iterator[Tuple[str, Dict]]:
+    """Yield (question_id, question) for every question in a loaded bank, in bank order."""
+    for topic_id, topic_questions in questions.items():
+        # Handle different question structures
+        if isinstance(topic_questions, dict) and "questions" in topic_questions:
+            questions_list = topic_questions["questions"]
+        elif isinstance(topic_questions, list):
+            questions_list = topic_questions
+        else:
+            continue
+            
+        for question in questions_list:
+            if isinstance(question, dict) and "id" in question:
+                yield question["id"], question
+
+
+class QuestionIndex:
+    """
+    O(1) question lookup by id for one loaded bank.
+    
+    TopicMapper.question_index builds this once per bank and shares it with
+    the paper selectors and exporters. The first question with an id wins,
+    as in a scan of the bank. An SQLite QuestionBank is already indexed by
+    id, so lookups go to it directly.
+    """
+    
+    def __init__(self, questions: Dict):
+        self.questions = questions
+        if isinstance(questions, QuestionBank):
+            self._by_id: Optional[Dict[str, Dict]] = None
+            self._ids = [q for q in dict.fromkeys(questions.question_ids()) if q is not None]
+        else:
+            self._by_id = {}
+            for question_id, question in iter_bank_questions(questions):
+                self._by_id.setdefault(question_id, question)
+            self._ids = list(self._by_id)
+    
+    def get(self, question_id: str) -> Optional[Dict]:
+        """Question body, or None if the bank has no such question."""
+        if self._by_id is None:
+            return self.questions.get_question(question_id)
+        return self._by_id.get(question_id)
+    
+    def question_ids(self) -> List[str]:
+        """Distinct question ids in bank order."""
+        return self._ids
+    
+    def __contains__(self, question_id: str) -> bool:
+        if self._by_id is None:
+            return self.questions.question_topic(question_id) is not None
+        return question_id in self._by_id
+    
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
 class TopicMapper:
     """Main class for mapping questions to syllabus topics"""
     
-    def __init__(self, syllabus_path: str, questions_path: str, manual_mappings_path: str = None):
+    def __init__(self, syllabus_path: str, questions_path: str, manual_mappings_path: str = None,
+                 top_k: Optional[int] = None, min_confidence: float = 0.0):
+        """
+        Args:
+            syllabus_path: Syllabus topics JSON
+            questions_path: Question bank JSON
+            manual_mappings_path: Optional question_id -> topic_id overrides
+            top_k: Keep at most this many automatic mappings per question
+                (highest confidence first); None keeps every match
+            min_confidence: Drop automatic mappings below this confidence
+        """
         self.topics = self._load_topics(syllabus_path)
         self.questions = self._load_questions(questions_path)
         self.manual_mappings = self._load_manual_mappings(manual_mappings_path)
-        self.mappings: List[QuestionTopicMapping] = []
+        self.top_k = top_k
+        self.min_confidence = min_confidence
+        self.mappings = []
+        self._matcher: Optional[KeywordMatcher] = None
+        self._matcher_topics: Optional[Dict[str, Topic]] = None
+        self._question_index: Optional[QuestionIndex] = None
+    
+    @property
+    def question_index(self) -> QuestionIndex:
+        """Question lookup by id for self.questions, rebuilt if the bank is replaced."""
+        if self._question_index is None or self._question_index.questions is not self.questions:
+            self._question_index = QuestionIndex(self.questions)
+        return self._question_index
+    
+    @property
+    def mappings(self) -> MappingStore:
+        """All question-topic mappings, grouped by question in bank order."""
+        return self._mappings
+    
+    @mappings.setter
+    def mappings(self, mappings: Iterable[QuestionTopicMapping]) -> None:
+        if not isinstance(mappings, MappingStore):
+            mappings = MappingStore.from_mappings(mappings)
+        self._mappings = mappings
+    
+    @property
+    def matcher(self) -> KeywordMatcher:
+        """Compiled matcher for self.topics, rebuilt if topics is replaced."""
+        if self._matcher is None or self._matcher_topics is not self.topics:
+            self._matcher = KeywordMatcher(self.topics)
+            self._matcher_topics = self.topics
+        return self._matcher
     
     def _load_topics(self, path: str) -> Dict[str, Topic]:
         """Load syllabus topics with keywords"""
@@ -86,7 +600,10 @@ class TopicMapper:
         return topics
     
     def _load_questions(self, path: str) -> Dict:
-        """Load questions bank"""
+        """Load questions bank; an SQLite bank is opened lazily instead of parsed"""
+        if is_sqlite_bank(path):
+            return QuestionBank(path)
+        
         with open(path, 'r', encoding='utf-8') as f:
             data = json.load(f)
         
@@ -110,7 +627,12 @@ class TopicMapper:
             return data.get("manual_topic_mappings", data)
     
     def calculate_topic_confidence(self, question_text: str, topic: Topic) -> float:
-        """Calculate confidence score for question-topic mapping"""
+        """
+        Calculate confidence score for question-topic mapping.
+        
+        Reference definition for a single topic; map_question_to_topics gets
+        the same scores for all topics at once from self.matcher.
+        """
         text_lower = question_text.lower()
         
         # Count keyword matches
@@ -140,31 +662,19 @@ class TopicMapper:
     
     def map_question_to_topics(self, question_id: str, question_data: Dict) -> List[QuestionTopicMapping]:
         """Map a single question to most relevant topics"""
-        # Handle different question structures
-        if isinstance(question_data, dict):
-            if "question" in question_data:
-                question_text = question_data["question"]
-                if "options" in question_data:
-                    question_text += " " + " ".join(question_data["options"].values())
-            else:
-                question_text = str(question_data)
-        else:
-            question_text = str(question_data)
+        question_text = self._question_text(question_data)
         
         # Check for manual mapping first
         if question_id in self.manual_mappings:
             manual_topic = self.manual_mappings[question_id]
             return [QuestionTopicMapping(question_id, manual_topic, 1.0, "manual")]
         
-        # Calculate confidence for each topic
-        topic_scores = []
-        for topic_id, topic in self.topics.items():
-            confidence = self.calculate_topic_confidence(question_text, topic)
-            if confidence > 0.0:  # Include all non-zero matches
-                topic_scores.append((topic_id, confidence))
+        # Confidence for every candidate topic with a non-zero match, in one matcher pass
+        topic_scores = self.matcher.topic_confidences(question_text)
         
-        # Sort by confidence and return mappings
+        # Sort by confidence and prune low-value mappings
         topic_scores.sort(key=lambda x: x[1], reverse=True)
+        topic_scores = [(t, c) for t, c in topic_scores if c >= self.min_confidence][:self.top_k]
         
         mappings = []
         for topic_id, confidence in topic_scores:
@@ -172,24 +682,113 @@ class TopicMapper:
         
         return mappings
     
-    def map_all_questions(self) -> None:
-        """Map all questions to topics"""
-        self.mappings = []
+    def map_all_questions(self, batch_size: int = 20_000, n_jobs: Optional[int] = 1) -> None:
+        """
+        Map all questions to topics.
         
-        for topic_id, topic_questions in self.questions.items():
-            # Handle different question structures
-            if isinstance(topic_questions, dict) and "questions" in topic_questions:
-                questions_list = topic_questions["questions"]
-            elif isinstance(topic_questions, list):
-                questions_list = topic_questions
-            else:
-                continue
-                
-            for question in questions_list:
-                if isinstance(question, dict) and "id" in question:
-                    question_id = question["id"]
-                    mappings = self.map_question_to_topics(question_id, question)
-                    self.mappings.extend(mappings)
+        Gives the same mappings, in the same order, as calling
+        map_question_to_topics for each distinct question id (the first
+        question with an id wins, as in QuestionIndex), but scores questions in
+        batches of batch_size through the compiled matcher. top_k and
+        min_confidence pruning is applied inside the matcher, so pruned
+        mappings are never built.
+        
+        Args:
+            batch_size: Questions scored per matcher call (or per worker task)
+            n_jobs: Worker processes; 1 runs in-process, None uses every CPU.
+                Workers get a copy of the compiled matcher once, score
+                shards of question texts, and return index arrays that are
+                turned into mappings here in bank order, so the result does
+                not depend on the number of workers.
+        """
+        self.mappings = self.map_questions(list(self._iter_questions()), batch_size, n_jobs)
+    
+    def map_questions(self, questions: List[Tuple[str, Dict]], batch_size: int = 20_000,
+                      n_jobs: Optional[int] = 1) -> MappingStore:
+        """Mappings for (question_id, question) pairs, in order; see map_all_questions."""
+        unique: Dict[str, Dict] = {}
+        for question_id, question in questions:
+            unique.setdefault(question_id, question)
+        if len(unique) < len(questions):
+            questions = list(unique.items())
+        workers = n_jobs or os.cpu_count() or 1
+        if workers > 1:
+            # Enough shards to keep every worker busy
+            batch_size = max(1, min(batch_size, -(-len(questions) // (2 * workers))))
+        starts = range(0, len(questions), batch_size)
+        batches = [questions[start:start + batch_size] for start in starts]
+        
+        # Manual mappings may name topics outside the syllabus
+        topic_ids = list(self.matcher.topic_ids)
+        topic_pos = {topic_id: i for i, topic_id in enumerate(topic_ids)}
+        for topic_id in self.manual_mappings.values():
+            if topic_id not in topic_pos:
+                topic_pos[topic_id] = len(topic_ids)
+                topic_ids.append(topic_id)
+        
+        parts = []
+        if workers == 1 or len(batches) < 2:
+            for start, batch in zip(starts, batches):
+                texts = self._auto_texts(batch)
+                scores = self.matcher.score_texts(texts, top_k=self.top_k, min_confidence=self.min_confidence)
+                parts.append(self._batch_rows(start, batch, scores, topic_pos))
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                     initargs=(self.matcher, self.top_k, self.min_confidence)) as pool:
+                # map() yields in submission order while later shards are scored
+                shard_scores = pool.map(_score_shard, map(self._auto_texts, batches))
+                for start, batch, scores in zip(starts, batches, shard_scores):
+                    parts.append(self._batch_rows(start, batch, scores, topic_pos))
+        
+        columns = [np.concatenate(column) for column in zip(*parts)] if parts else [[], [], [], []]
+        return MappingStore([question_id for question_id, _ in questions], topic_ids, *columns)
+    
+    def _auto_texts(self, batch: List[Tuple[str, Dict]]) -> List[str]:
+        """Texts of the questions in batch without a manual mapping."""
+        return [self._question_text(question) for question_id, question in batch
+                if question_id not in self.manual_mappings]
+    
+    def _batch_rows(self, start: int, batch: List[Tuple[str, Dict]],
+                    scores: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                    topic_pos: Dict[str, int]) -> Tuple[np.ndarray, ...]:
+        """Store rows for a batch starting at question start, given scores for its automatic questions."""
+        rows, cols, values = scores
+        positions = np.arange(start, start + len(batch))
+        manual = np.fromiter((question_id in self.manual_mappings for question_id, _ in batch),
+                             dtype=bool, count=len(batch))
+        question_index = positions[~manual][rows]
+        topic_index, confidence = cols, values
+        method = np.zeros(len(rows), dtype=np.uint8)
+        if not manual.any():
+            return question_index, topic_index, confidence, method
+        
+        # Interleave manual mappings; a stable sort keeps each question's rows in order
+        manual_topics = [topic_pos[self.manual_mappings[question_id]]
+                         for question_id, _ in batch if question_id in self.manual_mappings]
+        question_index = np.concatenate([question_index, positions[manual]])
+        order = np.argsort(question_index, kind="stable")
+        return (
+            question_index[order],
+            np.concatenate([topic_index, manual_topics])[order],
+            np.concatenate([confidence, np.ones(len(manual_topics))])[order],
+            np.concatenate([method, np.ones(len(manual_topics), dtype=np.uint8)])[order],
+        )
+    
+    def _iter_questions(self) -> Iterator[Tuple[str, Dict]]:
+        """Yield (question_id, question) for every question in the bank."""
+        return iter_bank_questions(self.questions)
+    
+    @staticmethod
+    def _question_text(question_data) -> str:
+        """Text matched against topics: the stem plus all options."""
+        # Handle different question structures
+        if isinstance(question_data, dict):
+            if "question" in question_data:
+                question_text = question_data["question"]
+                if "options" in question_data:
+                    question_text += " " + " ".join(question_data["options"].values())
+                return question_text
+        return str(question_data)
     
     def aggregate_weak_questions(self, student_results: Dict[str, bool]) -> Dict[str, Dict]:
         """Aggregate weak questions by topic"""
@@ -206,19 +805,29 @@ class TopicMapper:
                 "confidence_sum": 0.0
             }
         
-        # Aggregate question results by topic
-        for mapping in self.mappings:
-            if mapping.confidence > 0.3:  # Only consider high-confidence mappings
-                topic_id = mapping.topic_id
-                question_id = mapping.question_id
-                
-                topic_stats[topic_id]["total_questions"] += 1
-                topic_stats[topic_id]["confidence_sum"] += mapping.confidence
-                
-                if student_results.get(question_id, False):
-                    topic_stats[topic_id]["correct_answers"] += 1
-                else:
-                    topic_stats[topic_id]["wrong_questions"].append(question_id)
+        # Aggregate question results by topic over the store's arrays
+        store = self.mappings
+        rows = np.flatnonzero(store.confidence > 0.3)  # Only consider high-confidence mappings
+        answered = np.fromiter((bool(student_results.get(q, False)) for q in store.question_ids),
+                               dtype=bool, count=len(store.question_ids))
+        correct = answered[store.question_index[rows]]
+        topic_index = store.topic_index[rows]
+        num_topics = len(store.topic_ids)
+        # bincount adds weights in row order, matching a running float sum
+        totals = np.bincount(topic_index, minlength=num_topics).tolist()
+        correct_counts = np.bincount(topic_index[correct], minlength=num_topics).tolist()
+        confidence_sums = np.bincount(topic_index, weights=store.confidence[rows], minlength=num_topics).tolist()
+        
+        for i, topic_id in enumerate(store.topic_ids):
+            if topic_id in topic_stats:
+                topic_stats[topic_id]["total_questions"] = totals[i]
+                topic_stats[topic_id]["correct_answers"] = correct_counts[i]
+                topic_stats[topic_id]["confidence_sum"] = confidence_sums[i]
+        wrong = rows[~correct]
+        for t, q in zip(store.topic_index[wrong].tolist(), store.question_index[wrong].tolist()):
+            topic_id = store.topic_ids[t]
+            if topic_id in topic_stats:
+                topic_stats[topic_id]["wrong_questions"].append(store.question_ids[q])
         
         # Calculate success rates
         for topic_id, stats in topic_stats.items():
@@ -231,6 +840,79 @@ class TopicMapper:
         
         return topic_stats
     
+    def topic_confidence_matrix(self, question_ids: List[str], threshold: float = 0.3) -> sparse.csr_matrix:
+        """
+        Sparse questions x topics matrix of mapping confidences above threshold.
+        
+        Rows follow question_ids and columns self.topics; questions without
+        mappings (or not in the bank) have empty rows.
+        """
+        store = self.mappings
+        topic_pos = {topic_id: i for i, topic_id in enumerate(self.topics)}
+        question_rows = {question_id: i for i, question_id in enumerate(question_ids)}
+        row_of_question = np.array([question_rows.get(q, -1) for q in store.question_ids], dtype=np.int64)
+        col_of_topic = np.array([topic_pos.get(t, -1) for t in store.topic_ids], dtype=np.int64)
+        
+        rows = row_of_question[store.question_index] if len(store) else np.zeros(0, dtype=np.int64)
+        cols = col_of_topic[store.topic_index] if len(store) else np.zeros(0, dtype=np.int64)
+        keep = (store.confidence > threshold) & (rows >= 0) & (cols >= 0)
+        return sparse.csr_matrix(
+            (store.confidence[keep], (rows[keep], cols[keep])),
+            shape=(len(question_ids), len(self.topics)),
+        )
+    
+    def aggregate_class_weak_topics(self, responses: np.ndarray, question_ids: List[str],
+                                    student_ids: Optional[List[str]] = None,
+                                    threshold: float = 0.3) -> ClassTopicMastery:
+        """
+        aggregate_weak_questions for a whole class in one sparse product.
+        
+        Args:
+            responses: students x questions matrix, non-zero where correct
+            question_ids: Question id of each response column
+            student_ids: Id of each response row (defaults to row numbers)
+            threshold: Mappings at or below this confidence are ignored
+        
+        Returns:
+            ClassTopicMastery whose row for each student matches
+            aggregate_weak_questions on that student's answers
+        """
+        responses = np.asarray(responses)
+        if student_ids is None:
+            student_ids = [str(i) for i in range(responses.shape[0])]
+        answers = responses != 0
+        
+        # Correct answers per student per topic: answers @ (question x topic indicator)
+        indicator = self.topic_confidence_matrix(question_ids, threshold)
+        indicator.data = np.ones_like(indicator.data, dtype=np.float32)
+        correct = np.asarray(answers.astype(np.float32) @ indicator).astype(np.int64)
+        
+        # Per-topic totals count every mapped question, answered or not,
+        # with confidences summed in mapping order as aggregate_weak_questions does
+        store = self.mappings
+        topic_ids = list(self.topics)
+        topic_pos = {topic_id: i for i, topic_id in enumerate(topic_ids)}
+        topic_questions: List[List[str]] = [[] for _ in topic_ids]
+        confidence_sum = np.zeros(len(topic_ids))
+        rows = np.flatnonzero(store.confidence > threshold)
+        for row, t, q in zip(rows.tolist(), store.topic_index[rows].tolist(), store.question_index[rows].tolist()):
+            i = topic_pos.get(store.topic_ids[t])
+            if i is not None:
+                topic_questions[i].append(store.question_ids[q])
+                confidence_sum[i] += store.confidence[row]
+        
+        return ClassTopicMastery(
+            student_ids=list(student_ids),
+            topic_ids=topic_ids,
+            topic_titles=[topic.title for topic in self.topics.values()],
+            correct=correct,
+            total_questions=np.array([len(questions) for questions in topic_questions], dtype=np.int64),
+            confidence_sum=confidence_sum,
+            topic_questions=topic_questions,
+            answers=answers,
+            question_columns={question_id: j for j, question_id in enumerate(question_ids)},
+        )
+    
     def export_mappings(self, output_path: str) -> None:
         """Export question-topic mappings to JSON"""
         mappings_data = {
@@ -0,0 +1,139 @@
+"""
+On-disk cache for question-topic mappings.
+
+map_all_questions scores every question in the bank on every run, although
+between runs usually only a handful of questions are added or edited. This
+module stores each question's mappings in one JSON file together with:
+
+- a config hash over the syllabus topics (ids, titles, keywords), the
+  manual mappings and the mapper's top_k/min_confidence pruning
+- a content hash per question over the text that is matched (stem plus
+  options)
+
+While the config hash matches, only questions whose content hash changed
+(or that are new) are remapped; the rest are loaded from the file. Any
+syllabus or manual-mapping change invalidates every entry.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from src.mapping import QuestionTopicMapping, TopicMapper
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+CACHE_FILENAME = ".mapping_cache.json"
+
+
+class MappingCache:
+    """Loads, refreshes and writes cached mappings for one question bank."""
+
+    def __init__(self, cache_path: Path):
+        self.cache_path = Path(cache_path)
+
+    def map_all_questions(self, mapper: TopicMapper, rebuild: bool = False, **map_kwargs) -> int:
+        """
+        Fill mapper.mappings, remapping only new or edited questions.
+
+        Gives the same mappings, in the same order, as
+        mapper.map_all_questions(); map_kwargs (batch_size, n_jobs) are
+        passed through for the questions that are remapped.
+
+        Returns:
+            Number of questions that were remapped
+        """
+        config = config_hash(mapper)
+        entries = {} if rebuild else self._load_entries(config)
+
+        # The first question with an id wins, as in QuestionIndex
+        unique: Dict[str, Dict] = {}
+        for question_id, question in mapper._iter_questions():
+            unique.setdefault(question_id, question)
+        questions = list(unique.items())
+        hashes = [_sha256(mapper._question_text(question)) for _, question in questions]
+        stale = [
+            pair for pair, digest in zip(questions, hashes)
+            if entries.get(pair[0], {}).get("hash") != digest
+        ]
+
+        # Fresh mappings come back grouped by question, in order
+        fresh: Dict[str, List[QuestionTopicMapping]] = {question_id: [] for question_id, _ in stale}
+        for mapping in mapper.map_questions(stale, **map_kwargs):
+            fresh[mapping.question_id].append(mapping)
+        for question_id, mappings in fresh.items():
+            entries[question_id] = {
+                "mappings": [[m.topic_id, m.confidence, m.method] for m in mappings]
+            }
+        for (question_id, _), digest in zip(questions, hashes):
+            entries[question_id]["hash"] = digest
+
+        mappings: List[QuestionTopicMapping] = []
+        for question_id, _ in questions:
+            if question_id in fresh:
+                mappings.extend(fresh[question_id])
+            else:
+                mappings.extend(
+                    QuestionTopicMapping(question_id, topic_id, confidence, method)
+                    for topic_id, confidence, method in entries[question_id]["mappings"]
+                )
+        mapper.mappings = mappings
+
+        if stale or len(entries) != len(unique):
+            self._write(config, {question_id: entries[question_id] for question_id in unique})
+        logger.info(f"Mapping cache: remapped {len(stale)} of {len(questions)} questions")
+        return len(stale)
+
+    def _load_entries(self, config: str) -> Dict[str, Dict]:
+        if not self.cache_path.exists():
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                cached = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if cached.get("version") != CACHE_VERSION or cached.get("config") != config:
+            return {}
+        return cached["questions"]
+
+    def _write(self, config: str, entries: Dict[str, Dict]) -> None:
+        """Write the cache file atomically."""
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, staging = tempfile.mkstemp(prefix=".tmp_", dir=self.cache_path.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": CACHE_VERSION, "config": config, "questions": entries}, f)
+            os.replace(staging, self.cache_path)
+        finally:
+            if os.path.exists(staging):
+                os.remove(staging)
+
+
+def map_all_questions_cached(mapper: TopicMapper, cache_path: Optional[Path] = None,
+                             rebuild: bool = False, **map_kwargs) -> int:
+    """
+    mapper.map_all_questions() through the mapping cache.
+
+    cache_path defaults to .mapping_cache.json in the working directory.
+    """
+    return MappingCache(cache_path or Path(CACHE_FILENAME)).map_all_questions(mapper, rebuild, **map_kwargs)
+
+
+def config_hash(mapper: TopicMapper) -> str:
+    """Hash of everything besides question text that the mappings depend on."""
+    config = {
+        "topics": [[topic_id, topic.title, topic.keywords] for topic_id, topic in mapper.topics.items()],
+        "manual_mappings": mapper.manual_mappings,
+        "top_k": mapper.top_k,
+        "min_confidence": mapper.min_confidence,
+    }
+    return _sha256(json.dumps(config, sort_keys=True))
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
@@ -0,0 +1,432 @@
+"""
+Streaming export of generated papers.
+
+Each output format is a PaperRenderer that writes a paper to a text stream
+as it goes, rather than building the whole output in memory first:
+
+- json        - the full paper                             PAPER.json
+- text        - printable paper                            PAPER.txt
+- answer_key  - answers, if the paper's config asks for it  PAPER_answers.txt
+- analysis    - difficulty and selection breakdown         PAPER_analysis.json
+- jsonl       - the full paper as one compact JSON line    PAPER.jsonl
+- html        - printable paper, answers on a last page    PAPER.html
+
+Where the streams end up is up to a writer. DirectoryWriter gives every
+output its own file, as export_paper always has; PaperBundle writes every
+output of a batch into one zip archive, so a cohort's papers don't land in
+output/ as thousands of small files.
+"""
+
+import html
+import io
+import json
+import os
+import tempfile
+import threading
+import zipfile
+from abc import ABC, abstractmethod
+from dataclasses import asdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, TextIO, Tuple
+
+DEFAULT_FORMATS = ("json", "text", "answer_key", "analysis")
+
+
+class PaperRenderer(ABC):
+    """One export format: writes a paper to a text stream."""
+
+    name = ""
+    suffix = ""
+
+    def applies_to(self, paper) -> bool:
+        return True
+
+    @abstractmethod
+    def render(self, paper, out: TextIO) -> None:
+        """Write paper to out."""
+
+
+class JsonRenderer(PaperRenderer):
+    name = "json"
+    suffix = ".json"
+
+    def render(self, paper, out: TextIO) -> None:
+        json.dump(paper_dict(paper), out, indent=2, ensure_ascii=False)
+
+
+class JsonlRenderer(PaperRenderer):
+    name = "jsonl"
+    suffix = ".jsonl"
+
+    def render(self, paper, out: TextIO) -> None:
+        out.write(json.dumps(paper_dict(paper), separators=(",", ":"), ensure_ascii=False))
+        out.write("\n")
+
+
+class TextRenderer(PaperRenderer):
+    name = "text"
+    suffix = ".txt"
+
+    def __init__(self, topic_mapper):
+        self.topic_mapper = topic_mapper
+
+    def render(self, paper, out: TextIO) -> None:
+        _write_lines(out, self._lines(paper))
+
+    def _lines(self, paper) -> Iterator[str]:
+        yield f"{paper.title}"
+        yield "=" * len(paper.title)
+        yield f"Paper ID: {paper.paper_id}"
+        yield f"Generated: {paper.generated_at}"
+        yield f"Time Limit: {paper.config.time_limit_minutes} minutes"
+        yield f"Total Points: {paper.total_points}"
+        yield ""
+
+        yield "INSTRUCTIONS:"
+        yield "- Answer ALL questions"
+        yield "- Write clearly and show your working"
+        yield "- Points for each question are shown in brackets"
+        yield ""
+
+        question_index = self.topic_mapper.question_index
+        for i, question_sel in enumerate(paper.questions, 1):
+            question_data = question_index.get(question_sel.question_id)
+            if question_data:
+                yield f"Question {i}: [{question_sel.points} marks]"
+                yield f"{question_data['question']}"
+                yield ""
+
+                if "options" in question_data:
+                    for option_key, option_text in question_data["options"].items():
+                        yield f"   {option_key}) {option_text}"
+                    yield ""
+
+
+class AnswerKeyRenderer(PaperRenderer):
+    name = "answer_key"
+    suffix = "_answers.txt"
+
+    def __init__(self, topic_mapper):
+        self.topic_mapper = topic_mapper
+
+    def applies_to(self, paper) -> bool:
+        return paper.config.include_answer_key
+
+    def render(self, paper, out: TextIO) -> None:
+        _write_lines(out, self._lines(paper))
+
+    def _lines(self, paper) -> Iterator[str]:
+        yield f"ANSWER KEY - {paper.title}"
+        yield "=" * (len(paper.title) + 13)
+        yield f"Paper ID: {paper.paper_id}"
+        yield ""
+
+        question_index = self.topic_mapper.question_index
+        for i, question_sel in enumerate(paper.questions, 1):
+            question_data = question_index.get(question_sel.question_id)
+            if question_data and "correct_answer" in question_data:
+                topic_title = self.topic_mapper.topics[question_sel.topic_id].title
+                yield f"Question {i}: {question_data['correct_answer']} [{question_sel.points} marks]"
+                yield f"Topic: {topic_title}"
+                yield f"Difficulty: {question_sel.difficulty}"
+                yield ""
+
+
+class AnalysisRenderer(PaperRenderer):
+    name = "analysis"
+    suffix = "_analysis.json"
+
+    def render(self, paper, out: TextIO) -> None:
+        analysis = {
+            "paper_summary": {
+                "total_questions": len(paper.questions),
+                "total_points": paper.total_points,
+                "average_points_per_question": paper.total_points / len(paper.questions) if paper.questions else 0
+            },
+            "difficulty_breakdown": analyze_difficulty(paper.questions),
+            "topic_coverage": paper.topic_coverage,
+            "selection_reasons": analyze_selection_reasons(paper.questions),
+            "paper_statistics": {
+                "generation_strategy": paper.config.paper_type,
+                "config_used": asdict(paper.config),
+                "metadata": paper.metadata
+            }
+        }
+        json.dump(analysis, out, indent=2, ensure_ascii=False)
+
+
+# Page shell for HtmlRenderer. Question numbers come from a CSS counter so
+# that a question's fragment reads the same wherever it appears in a paper.
+HTML_HEAD = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="UTF-8">
+<title>{title}</title>
+<style>
+body { font-family: Georgia, serif; max-width: 46em; margin: 2em auto; line-height: 1.4; }
+header { border-bottom: 2px solid #000; margin-bottom: 1.5em; }
+.details { display: flex; flex-wrap: wrap; gap: 0 2em; padding: 0; list-style: none; }
+.questions { counter-reset: question; }
+.question { break-inside: avoid; margin-bottom: 1.5em; }
+.question h2 { font-size: 1.05em; margin: 0 0 0.4em; }
+.question h2::before { counter-increment: question; content: "Question " counter(question) ": "; }
+.options { list-style: none; padding-left: 1.5em; }
+.answers { break-before: page; counter-reset: answer; }
+.answers ol { list-style: none; padding-left: 0; }
+.answers li::before { counter-increment: answer; content: "Question " counter(answer) ": "; }
+.topic { color: #555; font-weight: normal; }
+</style>
+</head>
+<body>
+"""
+HTML_FOOT = "</body>\n</html>\n"
+HTML_INSTRUCTIONS = """<section class="instructions">
+<h2>Instructions</h2>
+<ul>
+<li>Answer ALL questions</li>
+<li>Write clearly and show your working</li>
+<li>Points for each question are shown in brackets</li>
+</ul>
+</section>
+"""
+
+
+class HtmlRenderer(PaperRenderer):
+    """
+    Printable HTML paper.
+
+    The page shell is fixed text, and each question's HTML (with its
+    answer-key line) is built once and cached. The cache key holds the
+    question's id, text, options and answer along with its topic title and
+    points, so edits to the bank, in place or not, give new fragments.
+    Rendering a paper only looks up each question and joins cached
+    fragments around a small per-paper header.
+    """
+
+    name = "html"
+    suffix = ".html"
+
+    def __init__(self, topic_mapper, cache_size: int = 100_000):
+        self.topic_mapper = topic_mapper
+        self._fragments = lru_cache(maxsize=cache_size)(_question_fragments)
+
+    def cache_info(self):
+        """Hit and miss counts of the fragment cache, as functools.lru_cache reports them."""
+        return self._fragments.cache_info()
+
+    def render(self, paper, out: TextIO) -> None:
+        question_index = self.topic_mapper.question_index
+        fragments = [
+            self._fragments(q.question_id, *_fragment_content(question_index.get(q.question_id)),
+                            self._topic_title(q.topic_id), q.points)
+            for q in paper.questions
+        ]
+        out.write(HTML_HEAD.replace("{title}", html.escape(paper.title), 1))
+        out.write(
+            f"<header>\n<h1>{html.escape(paper.title)}</h1>\n<ul class=\"details\">\n"
+            f"<li>Paper ID: {html.escape(paper.paper_id)}</li>\n"
+            f"<li>Time Limit: {paper.config.time_limit_minutes} minutes</li>\n"
+            f"<li>Total Points: {paper.total_points}</li>\n</ul>\n</header>\n"
+        )
+        out.write(HTML_INSTRUCTIONS)
+        out.write('<section class="questions">\n')
+        out.write("".join(question for question, _ in fragments))
+        out.write("</section>\n")
+        if paper.config.include_answer_key:
+            out.write('<section class="answers">\n<h2>Answer Key</h2>\n<ol>\n')
+            out.write("".join(answer for _, answer in fragments))
+            out.write("</ol>\n</section>\n")
+        out.write(HTML_FOOT)
+
+    def _topic_title(self, topic_id: str) -> str:
+        topic = self.topic_mapper.topics.get(topic_id)
+        return topic.title if topic else ""
+
+
+def _fragment_content(question_data) -> Tuple:
+    """(text, options, answer) of a question as hashable strings; all None if it is missing."""
+    if not question_data:
+        return None, None, None
+    options = question_data.get("options")
+    if options is not None:
+        options = tuple((str(key), str(text)) for key, text in options.items())
+    return str(question_data.get("question", "")), options, str(question_data.get("correct_answer", ""))
+
+
+def _question_fragments(question_id: str, text, options, answer, topic_title: str,
+                        points: int) -> Tuple[str, str]:
+    """(question, answer key) HTML for one question; empty if the bank lacks it."""
+    if text is None:
+        return "", ""
+    parts = [
+        f'<section class="question" id="{html.escape(question_id)}">\n',
+        f'<h2>[{points} marks] <span class="topic">{html.escape(topic_title)}</span></h2>\n',
+        f"<p>{html.escape(text)}</p>\n",
+    ]
+    if options is not None:
+        parts.append('<ul class="options">\n')
+        for option_key, option_text in options:
+            parts.append(f"<li>{html.escape(option_key)}) {html.escape(option_text)}</li>\n")
+        parts.append("</ul>\n")
+    parts.append("</section>\n")
+    return "".join(parts), f"<li>{html.escape(answer)} [{points} marks]</li>\n"
+
+
+def default_renderers(topic_mapper) -> Dict[str, PaperRenderer]:
+    """Every built-in renderer, by format name."""
+    renderers = [
+        JsonRenderer(), TextRenderer(topic_mapper), AnswerKeyRenderer(topic_mapper),
+        AnalysisRenderer(), JsonlRenderer(), HtmlRenderer(topic_mapper),
+    ]
+    return {renderer.name: renderer for renderer in renderers}
+
+
+class DirectoryWriter:
+    """Writes each output to its own file in a directory."""
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    def write(self, name: str, render: Callable[[TextIO], None]) -> str:
+        path = self.output_dir / name
+        with open(path, "w", encoding="utf-8") as out:
+            render(out)
+        return str(path)
+
+
+class PaperBundle:
+    """
+    Writes outputs as members of one zip archive.
+
+    Members are streamed into a temporary archive next to archive_path as
+    they are rendered. Writes from several threads are serialised. close()
+    (or leaving the with block cleanly) moves the archive into place; if
+    any member failed to render, or discard() is called, the temporary
+    archive is removed and no bundle is left behind.
+    """
+
+    def __init__(self, archive_path: Path, compression: int = zipfile.ZIP_DEFLATED):
+        self.archive_path = Path(archive_path)
+        self.archive_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.archive_path.parent, prefix=f".{self.archive_path.name}.",
+                                        suffix=".tmp")
+        os.close(fd)
+        self._tmp_path = tmp_path
+        self._zip = zipfile.ZipFile(tmp_path, "w", compression=compression)
+        self._lock = threading.Lock()
+        self._failed = False
+        self._closed = False
+
+    def write(self, name: str, render: Callable[[TextIO], None]) -> str:
+        with self._lock:
+            try:
+                with self._zip.open(name, "w") as raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as out:
+                    render(out)
+            except BaseException:
+                self._failed = True
+                raise
+        return os.path.join(str(self.archive_path), name)
+
+    def close(self) -> None:
+        """Finish the archive and move it into place, unless a write failed."""
+        if self._failed:
+            self.discard()
+            return
+        if self._closed:
+            return
+        try:
+            self._zip.close()
+            os.replace(self._tmp_path, self.archive_path)
+            self._closed = True
+        except BaseException:
+            self.discard()
+            raise
+
+    def discard(self) -> None:
+        """Abandon the archive, removing the temporary file."""
+        self._failed = self._closed = True
+        try:
+            self._zip.close()
+        finally:
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+
+    def __enter__(self) -> "PaperBundle":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        if exc_type is not None:
+            self.discard()
+        else:
+            self.close()
+
+
+def export_paper(paper, writer, renderers: Iterable[PaperRenderer]) -> Dict[str, str]:
+    """Render paper with each applicable renderer; returns format name -> location."""
+    files_created = {}
+    for renderer in renderers:
+        if renderer.applies_to(paper):
+            files_created[renderer.name] = writer.write(
+                f"{paper.paper_id}{renderer.suffix}", lambda out: renderer.render(paper, out)
+            )
+    return files_created
+
+
+def paper_dict(paper) -> Dict:
+    """JSON-ready form of a GeneratedPaper."""
+    return {
+        "paper_id": paper.paper_id,
+        "title": paper.title,
+        "questions": [asdict(q) for q in paper.questions],
+        "config": asdict(paper.config),
+        "metadata": paper.metadata,
+        "generated_at": paper.generated_at,
+        "total_points": paper.total_points,
+        "topic_coverage": paper.topic_coverage
+    }
+
+
+def analyze_difficulty(questions: List) -> Dict:
+    """Question count and points per difficulty."""
+    difficulty_count = {"easy": 0, "medium": 0, "hard": 0}
+    difficulty_points = {"easy": 0, "medium": 0, "hard": 0}
+
+    for q in questions:
+        difficulty_count[q.difficulty] += 1
+        difficulty_points[q.difficulty] += q.points
+
+    total_questions = len(questions)
+    total_points = sum(q.points for q in questions)
+
+    return {
+        "count_distribution": difficulty_count,
+        "points_distribution": difficulty_points,
+        "percentage_by_count": {
+            diff: (count / total_questions * 100) if total_questions > 0 else 0
+            for diff, count in difficulty_count.items()
+        },
+        "percentage_by_points": {
+            diff: (points / total_points * 100) if total_points > 0 else 0
+            for diff, points in difficulty_points.items()
+        }
+    }
+
+
+def analyze_selection_reasons(questions: List) -> Dict:
+    """Question count per selection reason."""
+    reasons = {}
+    for q in questions:
+        reason_category = q.selection_reason.split(":")[0]
+        reasons[reason_category] = reasons.get(reason_category, 0) + 1
+
+    return reasons
+
+
+def _write_lines(out: TextIO, lines: Iterable[str]) -> None:
+    """Write lines joined by newlines, without a trailing one."""
+    for i, line in enumerate(lines):
+        if i:
+            out.write("\n")
+        out.write(line)
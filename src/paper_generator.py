@@ -3,10 +3,20 @@ Paper Generation System for IGCSE Chemistry Assessment Tool
 Creates custom assessment papers based on student performance and topic analysis
 """
 
+import heapq
 import json
+import logging
+import os
 import random
-from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass, asdict
+import re
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from dataclasses import dataclass, asdict, field
 from datetime import datetime
 from pathlib import Path
 import sys
@@ -14,6 +24,14 @@ import sys
 # Import our topic mapping system
 sys.path.append(str(Path(__file__).parent))
 from mapping import TopicMapper, Topic
+from exposure_store import ExposureStore
+import paper_export
+from paper_export import DEFAULT_FORMATS, DirectoryWriter, PaperBundle, PaperRenderer
+
+logger = logging.getLogger(__name__)
+
+# Papers recorded per exposure store transaction during batch generation
+EXPOSURE_FLUSH_SIZE = 500
 
 
 @dataclass
@@ -34,7 +52,7 @@ class PaperConfig:
     total_points: int = 100
     difficulty_distribution: Dict[str, float] = None
     topic_focus: List[str] = None
-    paper_type: str = "balanced"  # balanced, weak_focus, comprehensive
+    paper_type: str = "balanced"  # balanced, weak_focus, comprehensive, assembled
     include_answer_key: bool = True
     time_limit_minutes: int = 90
     
@@ -56,58 +74,128 @@ class GeneratedPaper:
     topic_coverage: Dict[str, int]
 
 
+@dataclass
+class BatchGenerationResult:
+    """Outcome of PaperGenerator.generate_batch"""
+    files: Dict[str, Dict[str, str]] = field(default_factory=dict)  # student_id -> export_paper result
+    elapsed_seconds: float = 0.0
+    
+    @property
+    def num_papers(self) -> int:
+        return len(self.files)
+    
+    @property
+    def papers_per_second(self) -> float:
+        return self.num_papers / self.elapsed_seconds if self.elapsed_seconds > 0 else 0.0
+
+
 class QuestionSelector:
     """Handles intelligent question selection algorithms"""
     
     def __init__(self, topic_mapper: TopicMapper):
         self.topic_mapper = topic_mapper
         self.available_questions = self._build_question_pool()
+        self._build_buckets()
     
     def _build_question_pool(self) -> Dict[str, Dict]:
         """Build a searchable pool of all available questions"""
         question_pool = {}
+        mappings = self.topic_mapper.mappings
+        question_index = self.topic_mapper.question_index
         
-        for topic_id, topic_data in self.topic_mapper.questions.items():
-            if isinstance(topic_data, dict) and "questions" in topic_data:
-                for question in topic_data["questions"]:
-                    question_id = question.get("id")
-                    if question_id:
-                        # Get topic info
-                        mapped_topic = None
-                        for mapping in self.topic_mapper.mappings:
-                            if mapping.question_id == question_id:
-                                mapped_topic = mapping.topic_id
-                                break
-                        
-                        if mapped_topic and mapped_topic in self.topic_mapper.topics:
-                            topic_obj = self.topic_mapper.topics[mapped_topic]
-                            question_pool[question_id] = {
-                                "question_data": question,
-                                "topic_id": mapped_topic,
-                                "topic_title": topic_obj.title,
-                                "difficulty": topic_obj.level,
-                                "weight": topic_obj.weight,
-                                "keywords": topic_obj.keywords
-                            }
+        for question_id in question_index.question_ids():
+            # Get topic info (indexed lookup of the best mapping)
+            mapped_topic = mappings.best_topic(question_id)
+            
+            if mapped_topic and mapped_topic in self.topic_mapper.topics:
+                topic_obj = self.topic_mapper.topics[mapped_topic]
+                # Bodies stay in the bank until read, so a lazy bank stays lazy
+                question_pool[question_id] = _PoolEntry(question_id, question_index, {
+                    "topic_id": mapped_topic,
+                    "topic_title": topic_obj.title,
+                    "difficulty": topic_obj.level,
+                    "weight": topic_obj.weight,
+                    "keywords": topic_obj.keywords
+                })
         
         return question_pool
     
-    def select_by_weak_topics(self, weak_topics: List[str], num_questions: int) -> List[QuestionSelection]:
+    def _build_buckets(self):
+        """Group the pool by topic, difficulty and (topic, difficulty), in pool order"""
+        self._by_topic: Dict[str, List[str]] = {}
+        self._by_difficulty: Dict[str, List[str]] = {}
+        self._by_topic_difficulty: Dict[Tuple[str, str], List[str]] = {}
+        for qid, qdata in self.available_questions.items():
+            topic_id, difficulty = qdata["topic_id"], qdata["difficulty"]
+            self._by_topic.setdefault(topic_id, []).append(qid)
+            self._by_difficulty.setdefault(difficulty, []).append(qid)
+            self._by_topic_difficulty.setdefault((topic_id, difficulty), []).append(qid)
+    
+    def bucket(self, topic_id: Optional[str] = None, difficulty: Optional[str] = None) -> List[str]:
+        """
+        Pool question ids with the given topic and/or difficulty, in pool order.
+        
+        The list is shared with the selector and must not be modified.
+        """
+        if topic_id is not None and difficulty is not None:
+            return self._by_topic_difficulty.get((topic_id, difficulty), [])
+        if topic_id is not None:
+            return self._by_topic.get(topic_id, [])
+        if difficulty is not None:
+            return self._by_difficulty.get(difficulty, [])
+        return list(self.available_questions)
+    
+    def buckets(self) -> Dict[Tuple[str, str], List[str]]:
+        """(topic_id, difficulty) -> pool question ids, for every non-empty bucket"""
+        return dict(self._by_topic_difficulty)
+    
+    def sample(self, bucket: List[str], k: int, rng, excluded_ids: set = None,
+               num_excluded: Optional[int] = None) -> List[str]:
+        """
+        Up to k ids drawn from bucket, skipping excluded ids.
+        
+        At most num_excluded draws (the excluded ids in the bucket, if
+        known) can be excluded, so drawing that many extra and filtering
+        is uniform over the remaining ids and costs O(k + num_excluded)
+        rather than a pass over the bucket.
+        """
+        if num_excluded is None:
+            num_excluded = len(excluded_ids) if excluded_ids else 0
+        if not num_excluded:
+            return rng.sample(bucket, min(k, len(bucket)))
+        drawn = rng.sample(bucket, min(k + num_excluded, len(bucket)))
+        return [qid for qid in drawn if qid not in excluded_ids][:k]
+    
+    def excluded_counts(self, excluded_ids: set) -> Counter:
+        """Excluded pool questions per (topic, difficulty)"""
+        counts = Counter()
+        for qid in excluded_ids:
+            qdata = self.available_questions.get(qid)
+            if qdata is not None:
+                counts[qdata["topic_id"], qdata["difficulty"]] += 1
+        return counts
+    
+    def _excluded_by_topic(self, excluded_ids: set) -> Counter:
+        """Excluded pool questions per topic"""
+        counts = Counter()
+        for (topic_id, _), count in self.excluded_counts(excluded_ids).items():
+            counts[topic_id] += count
+        return counts
+    
+    def select_by_weak_topics(self, weak_topics: List[str], num_questions: int,
+                              rng: Optional[random.Random] = None,
+                              excluded_ids: set = None) -> List[QuestionSelection]:
         """Select questions focusing on weak topics"""
+        rng = rng or random
+        excluded_ids = excluded_ids or set()
+        excluded_by_topic = self._excluded_by_topic(excluded_ids)
         selections = []
         questions_per_topic = max(1, num_questions // len(weak_topics)) if weak_topics else 0
         
         for topic_id in weak_topics:
-            topic_questions = [
-                qid for qid, qdata in self.available_questions.items()
-                if qdata["topic_id"] == topic_id
-            ]
-            
             # Select questions from this topic
-            selected = random.sample(
-                topic_questions, 
-                min(questions_per_topic, len(topic_questions))
-            )
+            selected = self.sample(self.bucket(topic_id=topic_id), questions_per_topic, rng,
+                                   excluded_ids, excluded_by_topic[topic_id])
             
             for qid in selected:
                 qdata = self.available_questions[qid]
@@ -123,30 +211,23 @@ class QuestionSelector:
         # Fill remaining slots with balanced selection
         remaining = num_questions - len(selections)
         if remaining > 0:
-            excluded_ids = {s.question_id for s in selections}
-            balanced_selections = self.select_balanced(remaining, excluded_ids)
+            excluded_ids = excluded_ids | {s.question_id for s in selections}
+            balanced_selections = self.select_balanced(remaining, excluded_ids, rng)
             selections.extend(balanced_selections)
         
         return selections[:num_questions]
     
-    def select_balanced(self, num_questions: int, excluded_ids: set = None) -> List[QuestionSelection]:
+    def select_balanced(self, num_questions: int, excluded_ids: set = None,
+                        rng: Optional[random.Random] = None) -> List[QuestionSelection]:
         """Select questions with balanced topic and difficulty distribution"""
+        rng = rng or random
         if excluded_ids is None:
             excluded_ids = set()
         
-        available = [
-            qid for qid in self.available_questions.keys()
-            if qid not in excluded_ids
-        ]
-        
-        if len(available) < num_questions:
-            available = list(self.available_questions.keys())
-        
-        # Group by difficulty
-        by_difficulty = {"easy": [], "medium": [], "hard": []}
-        for qid in available:
-            difficulty = self.available_questions[qid]["difficulty"]
-            by_difficulty[difficulty].append(qid)
+        # Too few questions left: fall back to the whole pool
+        num_excluded = sum(1 for qid in excluded_ids if qid in self.available_questions)
+        if len(self.available_questions) - num_excluded < num_questions:
+            excluded_ids = set()
         
         selections = []
         target_easy = int(num_questions * 0.4)
@@ -155,9 +236,7 @@ class QuestionSelector:
         
         # Select by difficulty targets
         for difficulty, target in [("easy", target_easy), ("medium", target_medium), ("hard", target_hard)]:
-            available_for_difficulty = by_difficulty[difficulty]
-            selected_count = min(target, len(available_for_difficulty))
-            selected = random.sample(available_for_difficulty, selected_count)
+            selected = self.sample(self.bucket(difficulty=difficulty), target, rng, excluded_ids)
             
             for qid in selected:
                 qdata = self.available_questions[qid]
@@ -172,21 +251,20 @@ class QuestionSelector:
         
         return selections
     
-    def select_by_topics(self, target_topics: List[str], num_questions: int) -> List[QuestionSelection]:
+    def select_by_topics(self, target_topics: List[str], num_questions: int,
+                         rng: Optional[random.Random] = None,
+                         excluded_ids: set = None) -> List[QuestionSelection]:
         """Select questions from specific topics"""
+        rng = rng or random
+        excluded_ids = excluded_ids or set()
+        excluded_by_topic = self._excluded_by_topic(excluded_ids)
         selections = []
         questions_per_topic = max(1, num_questions // len(target_topics))
         
         for topic_id in target_topics:
-            topic_questions = [
-                qid for qid, qdata in self.available_questions.items()
-                if qdata["topic_id"] == topic_id
-            ]
-            
-            selected_count = min(questions_per_topic, len(topic_questions))
-            if selected_count > 0:
-                selected = random.sample(topic_questions, selected_count)
-                
+            selected = self.sample(self.bucket(topic_id=topic_id), questions_per_topic, rng,
+                                   excluded_ids, excluded_by_topic[topic_id])
+            if selected:
                 for qid in selected:
                     qdata = self.available_questions[qid]
                     selections.append(QuestionSelection(
@@ -200,34 +278,266 @@ class QuestionSelector:
         
         return selections[:num_questions]
     
+    def points_for(self, difficulty: str) -> int:
+        """Marks a question of this difficulty is worth"""
+        return self._calculate_points(difficulty)
+    
     def _calculate_points(self, difficulty: str) -> int:
         """Calculate points based on difficulty"""
         point_mapping = {"easy": 3, "medium": 5, "hard": 7}
         return point_mapping.get(difficulty, 5)
 
 
+class _PoolEntry(Mapping):
+    """A pool question's fields; "question_data" is read from the question index on access."""
+    __slots__ = ("_question_id", "_question_index", "_fields")
+    
+    def __init__(self, question_id: str, question_index, fields: Dict):
+        self._question_id = question_id
+        self._question_index = question_index
+        self._fields = fields
+    
+    def __getitem__(self, key: str):
+        if key == "question_data":
+            return self._question_index.get(self._question_id)
+        return self._fields[key]
+    
+    def __contains__(self, key) -> bool:
+        return key == "question_data" or key in self._fields
+    
+    def __iter__(self) -> Iterator[str]:
+        yield "question_data"
+        yield from self._fields
+    
+    def __len__(self) -> int:
+        return len(self._fields) + 1
+
+
+@dataclass
+class AssemblyReport:
+    """How far an assembled paper is from each target in its PaperConfig"""
+    target_questions: int
+    num_questions: int
+    target_points: int
+    points: int
+    points_deviation: int
+    difficulty_targets: Dict[str, float]  # question counts from difficulty_distribution
+    difficulty_counts: Dict[str, int]
+    difficulty_deviation: Dict[str, float]
+    coverage_target: int  # distinct topics a paper of this size could cover
+    topics_covered: int
+    weak_topic_questions: int
+    elapsed_ms: float
+
+
+class PaperAssembler:
+    """
+    Assembles papers that meet PaperConfig targets as closely as the bank allows.
+    
+    A question's points follow from its difficulty, so the mark total and
+    difficulty ratios are solved together over per-difficulty question
+    counts: a bounded DP over (questions, points) keeps, for every
+    reachable state, the counts nearest the difficulty_distribution
+    targets. The counts with points nearest total_points (exact when
+    reachable) win, ties going to the better distribution fit.
+    
+    Each difficulty's count is then shared out over its topics by
+    weighted round-robin, so a paper covers as many topics as it can and
+    weak topics get extra questions in proportion to 1 - success_rate.
+    """
+    
+    def __init__(self, selector: QuestionSelector, weak_topic_weight: float = 3.0):
+        self.selector = selector
+        self.weak_topic_weight = weak_topic_weight
+    
+    def assemble(self, config: PaperConfig, weak_topics_analysis: Dict = None,
+                 rng: Optional[random.Random] = None,
+                 excluded_ids: set = None) -> Tuple[List[QuestionSelection], AssemblyReport]:
+        """Select questions for config; returns them with the deviation report"""
+        start = time.perf_counter()
+        rng = rng or random
+        excluded_ids = excluded_ids or set()
+        weak_topics = (weak_topics_analysis or {}).get("weak_topics", {})
+        
+        # Questions left in each (topic, difficulty) bucket and each difficulty
+        excluded_counts = self.selector.excluded_counts(excluded_ids)
+        available = {
+            key: len(qids) - excluded_counts[key]
+            for key, qids in self.selector.buckets().items()
+        }
+        capacity: Dict[str, int] = {}
+        for (_, difficulty), size in available.items():
+            capacity[difficulty] = capacity.get(difficulty, 0) + size
+        
+        num_questions = min(config.total_questions, sum(capacity.values()))
+        targets = self._difficulty_targets(config, num_questions)
+        counts = self._solve_counts(num_questions, config.total_points, targets, capacity)
+        
+        selections = []
+        for difficulty, count in counts.items():
+            selections.extend(self._select_difficulty(difficulty, count, weak_topics, rng, excluded_ids, available))
+        
+        points = sum(s.points for s in selections)
+        per_difficulty = {d: 0 for d in list(targets) + list(counts)}
+        for selection in selections:
+            per_difficulty[selection.difficulty] += 1
+        report = AssemblyReport(
+            target_questions=config.total_questions,
+            num_questions=len(selections),
+            target_points=config.total_points,
+            points=points,
+            points_deviation=points - config.total_points,
+            difficulty_targets=targets,
+            difficulty_counts=per_difficulty,
+            difficulty_deviation={d: per_difficulty[d] - targets.get(d, 0.0) for d in per_difficulty},
+            coverage_target=min(num_questions, len({topic_id for (topic_id, _), size in available.items() if size})),
+            topics_covered=len({s.topic_id for s in selections}),
+            weak_topic_questions=sum(1 for s in selections if s.topic_id in weak_topics),
+            elapsed_ms=(time.perf_counter() - start) * 1000,
+        )
+        return selections, report
+    
+    def _difficulty_targets(self, config: PaperConfig, num_questions: int) -> Dict[str, float]:
+        distribution = config.difficulty_distribution or {}
+        total = sum(distribution.values())
+        if total <= 0:
+            return {}
+        return {d: num_questions * share / total for d, share in distribution.items()}
+    
+    def _solve_counts(self, num_questions: int, total_points: int, targets: Dict[str, float],
+                      capacity: Dict[str, int]) -> Dict[str, int]:
+        """Per-difficulty counts summing to num_questions, nearest total_points then targets."""
+        difficulties = [d for d in capacity if capacity[d] > 0]
+        # (questions, points) -> (distribution error, counts)
+        states: Dict[Tuple[int, int], Tuple[float, Tuple[int, ...]]] = {(0, 0): (0.0, ())}
+        for i, difficulty in enumerate(difficulties):
+            points = self.selector.points_for(difficulty)
+            target = targets.get(difficulty, 0.0)
+            last = i == len(difficulties) - 1
+            next_states: Dict[Tuple[int, int], Tuple[float, Tuple[int, ...]]] = {}
+            for (n, p), (error, counts) in states.items():
+                # The last difficulty takes whatever the question count leaves
+                low = num_questions - n if last else 0
+                for count in range(low, min(capacity[difficulty], num_questions - n) + 1):
+                    key = (n + count, p + count * points)
+                    candidate = (error + abs(count - target), counts + (count,))
+                    if key not in next_states or candidate < next_states[key]:
+                        next_states[key] = candidate
+            states = next_states
+        
+        missing = sum(targets.get(d, 0.0) for d in targets if d not in difficulties)
+        best = min(
+            ((abs(p - total_points), error + missing, counts) for (n, p), (error, counts) in states.items()
+             if n == num_questions),
+            default=None,
+        )
+        return dict(zip(difficulties, best[2])) if best else {}
+    
+    def _select_difficulty(self, difficulty: str, count: int, weak_topics: Dict, rng, excluded_ids: set,
+                           available: Dict[Tuple[str, str], int]) -> List[QuestionSelection]:
+        """count questions of one difficulty, spread over its topics"""
+        if count <= 0:
+            return []
+        topics = [topic_id for topic_id, d in available if d == difficulty]
+        rng.shuffle(topics)  # ties between equal topics go a different way each paper
+        
+        # Weighted round-robin: the next question goes to the topic with the
+        # highest weight / (questions allocated + 1)
+        allocation = {topic_id: 0 for topic_id in topics}
+        heap = []
+        for order, topic_id in enumerate(topics):
+            if available[topic_id, difficulty]:
+                heapq.heappush(heap, (-self._topic_weight(topic_id, weak_topics), order, topic_id))
+        for _ in range(count):
+            if not heap:
+                break
+            _, order, topic_id = heapq.heappop(heap)
+            allocation[topic_id] += 1
+            if allocation[topic_id] < available[topic_id, difficulty]:
+                weight = self._topic_weight(topic_id, weak_topics) / (allocation[topic_id] + 1)
+                heapq.heappush(heap, (-weight, order, topic_id))
+        
+        selections = []
+        points = self.selector.points_for(difficulty)
+        for topic_id in topics:
+            if not allocation[topic_id]:
+                continue
+            reason = "Weak topic focus" if topic_id in weak_topics else "Assembled"
+            bucket = self.selector.bucket(topic_id, difficulty)
+            num_excluded = len(bucket) - available[topic_id, difficulty]
+            for qid in self.selector.sample(bucket, allocation[topic_id], rng, excluded_ids, num_excluded):
+                qdata = self.selector.available_questions[qid]
+                selections.append(QuestionSelection(
+                    question_id=qid,
+                    topic_id=topic_id,
+                    difficulty=difficulty,
+                    points=points,
+                    selection_reason=f"{reason}: {qdata['topic_title']} ({difficulty})",
+                    confidence_score=qdata["weight"]
+                ))
+        return selections
+    
+    def _topic_weight(self, topic_id: str, weak_topics: Dict) -> float:
+        if topic_id not in weak_topics:
+            return 1.0
+        success_rate = weak_topics[topic_id].get("success_rate", 0.0)
+        return 1.0 + self.weak_topic_weight * (1.0 - success_rate)
+
+
 class PaperGenerator:
     """Main paper generation system"""
     
-    def __init__(self, topic_mapper: TopicMapper):
+    def __init__(self, topic_mapper: TopicMapper, exposure_store: Optional[ExposureStore] = None):
         self.topic_mapper = topic_mapper
         self.question_selector = QuestionSelector(topic_mapper)
+        self.assembler = PaperAssembler(self.question_selector)
+        self.exposure_store = exposure_store
+        # Export formats by name; add a PaperRenderer here to export another format
+        self.renderers: Dict[str, PaperRenderer] = paper_export.default_renderers(topic_mapper)
     
-    def generate_paper(self, config: PaperConfig, weak_topics_analysis: Dict = None) -> GeneratedPaper:
-        """Generate a complete assessment paper"""
+    @property
+    def question_index(self):
+        """Question lookup by id, shared with the topic mapper and selectors"""
+        return self.topic_mapper.question_index
+    
+    def generate_paper(self, config: PaperConfig, weak_topics_analysis: Dict = None,
+                       rng: Optional[random.Random] = None, paper_id: Optional[str] = None,
+                       student_id: Optional[str] = None) -> GeneratedPaper:
+        """
+        Generate a complete assessment paper.
+        
+        rng makes question sampling reproducible (the module-level random
+        state is used otherwise); paper_id defaults to a new unique id.
+        With an exposure store and a student_id, questions the student has
+        already been given are avoided and the paper is recorded.
+        """
+        track = self.exposure_store is not None and student_id is not None
+        excluded_ids = self.exposure_store.seen(student_id) if track else set()
+        paper = self._build_paper(config, weak_topics_analysis, rng, paper_id, excluded_ids)
+        if track:
+            self.exposure_store.record(student_id, paper.paper_id, [q.question_id for q in paper.questions])
+        return paper
+    
+    def _build_paper(self, config: PaperConfig, weak_topics_analysis: Optional[Dict],
+                     rng: Optional[random.Random], paper_id: Optional[str], excluded_ids: set) -> GeneratedPaper:
+        """Select questions avoiding excluded_ids and wrap them as a paper"""
         
         # Determine paper generation strategy
-        if config.paper_type == "weak_focus" and weak_topics_analysis:
-            questions = self._generate_weak_focus_paper(config, weak_topics_analysis)
+        report = None
+        if config.paper_type == "assembled":
+            questions, report = self.assembler.assemble(config, weak_topics_analysis, rng, excluded_ids)
+        elif config.paper_type == "weak_focus" and weak_topics_analysis:
+            questions = self._generate_weak_focus_paper(config, weak_topics_analysis, rng, excluded_ids)
         elif config.paper_type == "comprehensive":
-            questions = self._generate_comprehensive_paper(config)
+            questions = self._generate_comprehensive_paper(config, rng, excluded_ids)
         elif config.topic_focus:
-            questions = self._generate_topic_focus_paper(config)
+            questions = self._generate_topic_focus_paper(config, rng, excluded_ids)
         else:
-            questions = self._generate_balanced_paper(config)
+            questions = self._generate_balanced_paper(config, rng, excluded_ids)
         
         # Generate paper metadata
-        paper_id = f"PAPER_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        if paper_id is None:
+            paper_id = new_paper_id()
         
         # Calculate topic coverage
         topic_coverage = {}
@@ -253,41 +563,51 @@ class PaperGenerator:
             total_points=total_points,
             topic_coverage=topic_coverage
         )
+        if report is not None:
+            paper.metadata["assembly_report"] = asdict(report)
         
         return paper
     
-    def _generate_weak_focus_paper(self, config: PaperConfig, weak_topics_analysis: Dict) -> List[QuestionSelection]:
+    def _generate_weak_focus_paper(self, config: PaperConfig, weak_topics_analysis: Dict,
+                                   rng: Optional[random.Random] = None,
+                                   excluded_ids: set = None) -> List[QuestionSelection]:
         """Generate paper focusing on weak topics"""
         weak_topics = list(weak_topics_analysis.get("weak_topics", {}).keys())
+        excluded_ids = excluded_ids or set()
         
         if not weak_topics:
-            return self._generate_balanced_paper(config)
+            return self._generate_balanced_paper(config, rng, excluded_ids)
         
         # Allocate 70% to weak topics, 30% to balanced
         weak_focus_count = int(config.total_questions * 0.7)
         balanced_count = config.total_questions - weak_focus_count
         
         questions = []
-        questions.extend(self.question_selector.select_by_weak_topics(weak_topics, weak_focus_count))
+        questions.extend(self.question_selector.select_by_weak_topics(weak_topics, weak_focus_count, rng,
+                                                                      excluded_ids))
         
         if balanced_count > 0:
-            excluded_ids = {q.question_id for q in questions}
-            questions.extend(self.question_selector.select_balanced(balanced_count, excluded_ids))
+            excluded_ids = excluded_ids | {q.question_id for q in questions}
+            questions.extend(self.question_selector.select_balanced(balanced_count, excluded_ids, rng))
         
         return questions
     
-    def _generate_comprehensive_paper(self, config: PaperConfig) -> List[QuestionSelection]:
+    def _generate_comprehensive_paper(self, config: PaperConfig, rng: Optional[random.Random] = None,
+                                      excluded_ids: set = None) -> List[QuestionSelection]:
         """Generate comprehensive paper covering all topics"""
         all_topics = list(self.topic_mapper.topics.keys())
-        return self.question_selector.select_by_topics(all_topics, config.total_questions)
+        return self.question_selector.select_by_topics(all_topics, config.total_questions, rng, excluded_ids)
     
-    def _generate_topic_focus_paper(self, config: PaperConfig) -> List[QuestionSelection]:
+    def _generate_topic_focus_paper(self, config: PaperConfig, rng: Optional[random.Random] = None,
+                                    excluded_ids: set = None) -> List[QuestionSelection]:
         """Generate paper focusing on specific topics"""
-        return self.question_selector.select_by_topics(config.topic_focus, config.total_questions)
+        return self.question_selector.select_by_topics(config.topic_focus, config.total_questions, rng,
+                                                       excluded_ids)
     
-    def _generate_balanced_paper(self, config: PaperConfig) -> List[QuestionSelection]:
+    def _generate_balanced_paper(self, config: PaperConfig, rng: Optional[random.Random] = None,
+                                 excluded_ids: set = None) -> List[QuestionSelection]:
         """Generate balanced paper with even distribution"""
-        return self.question_selector.select_balanced(config.total_questions)
+        return self.question_selector.select_balanced(config.total_questions, excluded_ids, rng)
     
     def _generate_title(self, config: PaperConfig) -> str:
         """Generate appropriate title for the paper"""
@@ -295,6 +615,7 @@ class PaperGenerator:
             "balanced": "IGCSE Chemistry Practice Paper",
             "weak_focus": "IGCSE Chemistry Focused Review Paper",
             "comprehensive": "IGCSE Chemistry Comprehensive Assessment",
+            "assembled": "IGCSE Chemistry Practice Paper",
         }
         
         base_title = titles.get(config.paper_type, "IGCSE Chemistry Assessment Paper")
@@ -308,179 +629,170 @@ class PaperGenerator:
         
         return base_title
     
-    def export_paper(self, paper: GeneratedPaper, output_dir: str = "output") -> Dict[str, str]:
-        """Export paper in multiple formats"""
-        output_path = Path(output_dir)
-        output_path.mkdir(exist_ok=True)
-        
-        files_created = {}
-        
-        # Export as JSON
-        json_file = output_path / f"{paper.paper_id}.json"
-        self._export_json(paper, json_file)
-        files_created["json"] = str(json_file)
-        
-        # Export as formatted text
-        text_file = output_path / f"{paper.paper_id}.txt"
-        self._export_text(paper, text_file)
-        files_created["text"] = str(text_file)
-        
-        # Export answer key if requested
-        if paper.config.include_answer_key:
-            key_file = output_path / f"{paper.paper_id}_answers.txt"
-            self._export_answer_key(paper, key_file)
-            files_created["answer_key"] = str(key_file)
-        
-        # Export paper analysis
-        analysis_file = output_path / f"{paper.paper_id}_analysis.json"
-        self._export_analysis(paper, analysis_file)
-        files_created["analysis"] = str(analysis_file)
-        
-        return files_created
-    
-    def _export_json(self, paper: GeneratedPaper, file_path: Path):
-        """Export paper as JSON"""
-        # Convert to dictionary for JSON serialization
-        paper_dict = {
-            "paper_id": paper.paper_id,
-            "title": paper.title,
-            "questions": [asdict(q) for q in paper.questions],
-            "config": asdict(paper.config),
-            "metadata": paper.metadata,
-            "generated_at": paper.generated_at,
-            "total_points": paper.total_points,
-            "topic_coverage": paper.topic_coverage
-        }
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(paper_dict, f, indent=2, ensure_ascii=False)
-    
-    def _export_text(self, paper: GeneratedPaper, file_path: Path):
-        """Export paper as formatted text"""
-        content = []
-        content.append(f"{paper.title}")
-        content.append("=" * len(paper.title))
-        content.append(f"Paper ID: {paper.paper_id}")
-        content.append(f"Generated: {paper.generated_at}")
-        content.append(f"Time Limit: {paper.config.time_limit_minutes} minutes")
-        content.append(f"Total Points: {paper.total_points}")
-        content.append("")
-        
-        content.append("INSTRUCTIONS:")
-        content.append("- Answer ALL questions")
-        content.append("- Write clearly and show your working")
-        content.append("- Points for each question are shown in brackets")
-        content.append("")
-        
-        for i, question_sel in enumerate(paper.questions, 1):
-            # Get the actual question data
-            question_data = None
-            for topic_data in self.topic_mapper.questions.values():
-                if isinstance(topic_data, dict) and "questions" in topic_data:
-                    for q in topic_data["questions"]:
-                        if q.get("id") == question_sel.question_id:
-                            question_data = q
-                            break
-                if question_data:
-                    break
-            
-            if question_data:
-                content.append(f"Question {i}: [{question_sel.points} marks]")
-                content.append(f"{question_data['question']}")
-                content.append("")
-                
-                if "options" in question_data:
-                    for option_key, option_text in question_data["options"].items():
-                        content.append(f"   {option_key}) {option_text}")
-                    content.append("")
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(content))
-    
-    def _export_answer_key(self, paper: GeneratedPaper, file_path: Path):
-        """Export answer key"""
-        content = []
-        content.append(f"ANSWER KEY - {paper.title}")
-        content.append("=" * (len(paper.title) + 13))
-        content.append(f"Paper ID: {paper.paper_id}")
-        content.append("")
-        
-        for i, question_sel in enumerate(paper.questions, 1):
-            # Get the actual question data
-            question_data = None
-            for topic_data in self.topic_mapper.questions.values():
-                if isinstance(topic_data, dict) and "questions" in topic_data:
-                    for q in topic_data["questions"]:
-                        if q.get("id") == question_sel.question_id:
-                            question_data = q
-                            break
-                if question_data:
-                    break
-            
-            if question_data and "correct_answer" in question_data:
-                topic_title = self.topic_mapper.topics[question_sel.topic_id].title
-                content.append(f"Question {i}: {question_data['correct_answer']} [{question_sel.points} marks]")
-                content.append(f"Topic: {topic_title}")
-                content.append(f"Difficulty: {question_sel.difficulty}")
-                content.append("")
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(content))
-    
-    def _export_analysis(self, paper: GeneratedPaper, file_path: Path):
-        """Export paper analysis"""
-        analysis = {
-            "paper_summary": {
-                "total_questions": len(paper.questions),
-                "total_points": paper.total_points,
-                "average_points_per_question": paper.total_points / len(paper.questions) if paper.questions else 0
-            },
-            "difficulty_breakdown": self._analyze_difficulty(paper.questions),
-            "topic_coverage": paper.topic_coverage,
-            "selection_reasons": self._analyze_selection_reasons(paper.questions),
-            "paper_statistics": {
-                "generation_strategy": paper.config.paper_type,
-                "config_used": asdict(paper.config),
-                "metadata": paper.metadata
-            }
-        }
-        
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(analysis, f, indent=2, ensure_ascii=False)
+    def export_paper(self, paper: GeneratedPaper, output_dir: str = "output",
+                     formats: Optional[Iterable[str]] = None, writer=None) -> Dict[str, str]:
+        """
+        Export paper in multiple formats.
+        
+        formats are renderer names (json, text, answer_key and analysis by
+        default; jsonl, or any renderer added to self.renderers). Outputs
+        go to their own files in output_dir unless another writer, such
+        as a PaperBundle, is given.
+        """
+        writer = writer or DirectoryWriter(output_dir)
+        renderers = [self.renderers[name] for name in (formats or DEFAULT_FORMATS)]
+        return paper_export.export_paper(paper, writer, renderers)
+    
+    def generate_batch(self, analyses: Dict[str, Dict], config: Optional[PaperConfig] = None,
+                       output_dir: str = "output", seed: int = 0, n_jobs: Optional[int] = 1,
+                       max_writers: int = 4, chunk_size: Optional[int] = None,
+                       formats: Optional[Iterable[str]] = None, bundle: Optional[str] = None) -> BatchGenerationResult:
+        """
+        Generate and export a personalized paper for every student.
+        
+        Each student's questions are drawn from random.Random seeded with
+        (seed, student_id), so a paper is reproducible whatever the number
+        of workers or the student's place in the batch. Papers are
+        generated in worker processes (n_jobs; None uses every CPU) and
+        streamed to a pool of max_writers export threads; generation waits
+        when too many papers are queued for writing, so memory stays
+        bounded for any cohort size. With an exposure store, each student's
+        seen questions are avoided, and each paper is recorded in bulk once
+        its export has succeeded.
+        With bundle, every output goes into that zip archive in output_dir
+        instead of a file per output; the archive only appears once the
+        whole batch has been written.
+        
+        Args:
+            analyses: student_id -> weak topics analysis, as passed to generate_paper
+            config: Paper configuration for every student (weak_focus by default)
+            output_dir: Directory the papers are exported to
+            seed: Batch seed
+            n_jobs: Worker processes; 1 generates in-process
+            max_writers: Export threads
+            chunk_size: Students per worker task
+            formats: Export formats, as for export_paper
+            bundle: Archive file name (e.g. "batch.zip") to bundle the outputs in
+        
+        Returns:
+            BatchGenerationResult with each student's exported files and papers/sec
+        """
+        config = config or PaperConfig(paper_type="weak_focus")
+        start = time.perf_counter()
+        store = self.exposure_store
+        jobs = [
+            (student_id, analysis, f"{seed}:{student_id}", new_paper_id(student_id),
+             store.seen(student_id) if store is not None else set())
+            for student_id, analysis in analyses.items()
+        ]
+        exposures = []
+        
+        result = BatchGenerationResult()
+        slots = threading.BoundedSemaphore(max_writers * 4)
+        writer = PaperBundle(Path(output_dir) / bundle) if bundle else DirectoryWriter(output_dir)
+        
+        def write(student_id: str, paper: GeneratedPaper) -> Tuple[str, Dict[str, str], str, List[str]]:
+            try:
+                files = self.export_paper(paper, formats=formats, writer=writer)
+                return student_id, files, paper.paper_id, [q.question_id for q in paper.questions]
+            finally:
+                slots.release()
+        
+        def settle(future) -> None:
+            """Collect one export; only a written paper counts as seen."""
+            nonlocal exposures
+            student_id, files, paper_id, question_ids = future.result()
+            result.files[student_id] = files
+            if store is not None:
+                exposures.append((student_id, paper_id, question_ids))
+                if len(exposures) >= EXPOSURE_FLUSH_SIZE:
+                    store.record_many(exposures)
+                    exposures = []
+        
+        try:
+            with ThreadPoolExecutor(max_workers=max_writers) as writers:
+                pending = deque()
+                try:
+                    for student_id, paper in self._generate_jobs(jobs, config, n_jobs, chunk_size):
+                        slots.acquire()
+                        pending.append(writers.submit(write, student_id, paper))
+                        # Settle finished exports in job order as we go
+                        while pending and pending[0].done():
+                            settle(pending.popleft())
+                    while pending:
+                        settle(pending.popleft())
+                finally:
+                    # After a failure, every paper that was still written is recorded
+                    for future in pending:
+                        if future.exception() is None:
+                            settle(future)
+                    if store is not None and exposures:
+                        store.record_many(exposures)
+        except BaseException:
+            # Leave no half-written bundle behind
+            if bundle:
+                writer.discard()
+            raise
+        if bundle:
+            writer.close()
+        
+        result.elapsed_seconds = time.perf_counter() - start
+        logger.info(f"Generated {result.num_papers} papers in {result.elapsed_seconds:.1f}s "
+                    f"({result.papers_per_second:.1f} papers/sec)")
+        return result
+    
+    def _generate_jobs(self, jobs: List[Tuple[str, Dict, str, str, set]], config: PaperConfig,
+                       n_jobs: Optional[int], chunk_size: Optional[int]) -> Iterator[Tuple[str, GeneratedPaper]]:
+        """(student_id, paper) for each job, in job order."""
+        workers = n_jobs or os.cpu_count() or 1
+        if workers == 1:
+            for student_id, analysis, rng_seed, paper_id, excluded_ids in jobs:
+                yield student_id, self._build_paper(config, analysis, random.Random(rng_seed), paper_id, excluded_ids)
+            return
+        
+        chunk_size = chunk_size or max(1, -(-len(jobs) // (4 * workers)))
+        chunks = [jobs[i:i + chunk_size] for i in range(0, len(jobs), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(self.topic_mapper,)) as pool:
+            # map() yields chunks in submission order while later ones are generated
+            for papers in pool.map(_generate_chunk, chunks, [config] * len(chunks)):
+                yield from papers
     
     def _analyze_difficulty(self, questions: List[QuestionSelection]) -> Dict:
         """Analyze difficulty distribution"""
-        difficulty_count = {"easy": 0, "medium": 0, "hard": 0}
-        difficulty_points = {"easy": 0, "medium": 0, "hard": 0}
-        
-        for q in questions:
-            difficulty_count[q.difficulty] += 1
-            difficulty_points[q.difficulty] += q.points
-        
-        total_questions = len(questions)
-        total_points = sum(q.points for q in questions)
-        
-        return {
-            "count_distribution": difficulty_count,
-            "points_distribution": difficulty_points,
-            "percentage_by_count": {
-                diff: (count / total_questions * 100) if total_questions > 0 else 0
-                for diff, count in difficulty_count.items()
-            },
-            "percentage_by_points": {
-                diff: (points / total_points * 100) if total_points > 0 else 0
-                for diff, points in difficulty_points.items()
-            }
-        }
+        return paper_export.analyze_difficulty(questions)
     
     def _analyze_selection_reasons(self, questions: List[QuestionSelection]) -> Dict:
         """Analyze why questions were selected"""
-        reasons = {}
-        for q in questions:
-            reason_category = q.selection_reason.split(":")[0]
-            reasons[reason_category] = reasons.get(reason_category, 0) + 1
-        
-        return reasons
+        return paper_export.analyze_selection_reasons(questions)
+
+
+# State for generate_batch pool workers, set once per worker process by
+# _init_worker; the in-process path builds papers with self instead
+_worker: Dict[str, PaperGenerator] = {}
+
+
+def _init_worker(topic_mapper: TopicMapper) -> None:
+    _worker["generator"] = PaperGenerator(topic_mapper)
+
+
+def _generate_chunk(jobs: List[Tuple[str, Dict, str, str, set]],
+                    config: PaperConfig) -> List[Tuple[str, GeneratedPaper]]:
+    generator = _worker["generator"]
+    return [
+        (student_id, generator._build_paper(config, analysis, random.Random(rng_seed), paper_id, excluded_ids))
+        for student_id, analysis, rng_seed, paper_id, excluded_ids in jobs
+    ]
+
+
+def new_paper_id(suffix: Optional[str] = None) -> str:
+    """Timestamped paper id with a random part, unique across processes and runs"""
+    paper_id = f"PAPER_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:12]}"
+    return f"{paper_id}_{_safe_filename(suffix)}" if suffix is not None else paper_id
+
+
+def _safe_filename(text: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "_", str(text))
 
 
 # Example usage and testing
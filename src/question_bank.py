@@ -0,0 +1,228 @@
+"""
+SQLite storage for the past-questions bank.
+
+past_questions_bank.json is parsed whole by TopicMapper, and the nested
+structure stays in memory. Once every past paper is imported, that makes
+startup time and resident memory grow with the bank. This module imports
+the JSON once into an SQLite file:
+
+- topics     - topic id, position and the topic's own fields (everything
+               but its question list), read eagerly on open
+- questions  - one row per question: id, topic, position and the JSON body,
+               indexed by question id and by (topic, position)
+- meta       - schema version and the sha256 of the imported JSON, exposed
+               as QuestionBank.version
+
+Opening a bank reads only the topics table. Question bodies are parsed on
+access, through a bounded LRU cache. A QuestionBank reads as the same
+topic_id -> {"questions": [...], ...} mapping that json.load returns, so
+TopicMapper and PaperGenerator use it unchanged:
+
+    python src/question_bank.py data/past_questions_bank.json data/past_questions_bank.sqlite
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import sys
+from collections.abc import Mapping, Sequence
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+SQLITE_SUFFIXES = (".sqlite", ".sqlite3", ".db")
+BANK_KEYS = ("chemistry_questions_bank", "questions_bank", "questions")
+
+
+class QuestionBank(Mapping):
+    """Read-only question bank backed by an SQLite file."""
+
+    def __init__(self, db_path: Path, cache_size: int = 4096):
+        self.db_path = Path(db_path)
+        self.cache_size = cache_size
+        self._open()
+
+    def _open(self) -> None:
+        if not self.db_path.exists():
+            raise FileNotFoundError(f"Question bank not found: {self.db_path}")
+        self._conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+        meta = dict(self._conn.execute("SELECT key, value FROM meta"))
+        if int(meta.get("schema_version", 0)) != SCHEMA_VERSION:
+            raise ValueError(f"Unsupported question bank schema in {self.db_path}")
+        self.version: str = meta["source_sha256"]
+
+        self._topics: Dict[str, Dict] = {}
+        self._topic_sizes: Dict[str, int] = {}
+        for topic_id, fields, size in self._conn.execute(
+            "SELECT topic_id, fields, size FROM topics ORDER BY position"
+        ):
+            self._topics[topic_id] = json.loads(fields)
+            self._topic_sizes[topic_id] = size
+        self._body = lru_cache(maxsize=self.cache_size)(self._load_body)
+
+    def __getstate__(self) -> Dict:
+        # Connections don't pickle; workers reopen the file
+        return {"db_path": self.db_path, "cache_size": self.cache_size}
+
+    def __setstate__(self, state: Dict) -> None:
+        self.db_path = state["db_path"]
+        self.cache_size = state["cache_size"]
+        self._open()
+
+    def __getitem__(self, topic_id: str) -> Dict:
+        if topic_id not in self._topics:
+            raise KeyError(topic_id)
+        return {**self._topics[topic_id], "questions": _TopicQuestions(self, topic_id)}
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._topics)
+
+    def __len__(self) -> int:
+        return len(self._topics)
+
+    @property
+    def num_questions(self) -> int:
+        return sum(self._topic_sizes.values())
+
+    def get_question(self, question_id: str) -> Optional[Dict]:
+        """Question body by id, or None if the bank has no such question."""
+        row = self._conn.execute(
+            "SELECT rowid FROM questions WHERE question_id = ? ORDER BY rowid LIMIT 1", (question_id,)
+        ).fetchone()
+        return self._body(row[0]) if row else None
+
+    def question_topic(self, question_id: str) -> Optional[str]:
+        """Bank topic a question is filed under, or None."""
+        row = self._conn.execute(
+            "SELECT topic_id FROM questions WHERE question_id = ? ORDER BY rowid LIMIT 1", (question_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def question_ids(self, topic_id: Optional[str] = None) -> List[str]:
+        """Question ids in bank order, for one topic or the whole bank."""
+        if topic_id is None:
+            rows = self._conn.execute("SELECT question_id FROM questions ORDER BY rowid")
+        else:
+            rows = self._conn.execute(
+                "SELECT question_id FROM questions WHERE topic_id = ? ORDER BY position", (topic_id,)
+            )
+        return [question_id for question_id, in rows]
+
+    def _load_body(self, rowid: int) -> Dict:
+        body, = self._conn.execute("SELECT body FROM questions WHERE rowid = ?", (rowid,)).fetchone()
+        return json.loads(body)
+
+    def _topic_rowid(self, topic_id: str, position: int) -> int:
+        rowid, = self._conn.execute(
+            "SELECT rowid FROM questions WHERE topic_id = ? AND position = ?", (topic_id, position)
+        ).fetchone()
+        return rowid
+
+    def _iter_topic(self, topic_id: str) -> Iterator[Dict]:
+        # One ordered scan per topic; bodies met here don't evict the cache
+        rows = self._conn.execute(
+            "SELECT body FROM questions WHERE topic_id = ? ORDER BY position", (topic_id,)
+        )
+        for body, in rows:
+            yield json.loads(body)
+
+    @classmethod
+    def build(cls, json_path: Path, db_path: Path) -> "QuestionBank":
+        """Import a JSON question bank into a new SQLite file and open it."""
+        json_path, db_path = Path(json_path), Path(db_path)
+        raw = json_path.read_bytes()
+        data = json.loads(raw)
+        for key in BANK_KEYS:
+            if key in data:
+                data = data[key]
+                break
+
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        staging = db_path.with_name(f".tmp_{db_path.name}")
+        if staging.exists():
+            staging.unlink()
+        conn = sqlite3.connect(staging)
+        try:
+            conn.executescript(
+                """
+                CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+                CREATE TABLE topics (topic_id TEXT PRIMARY KEY, position INTEGER, fields TEXT, size INTEGER);
+                CREATE TABLE questions (question_id TEXT, topic_id TEXT, position INTEGER, body TEXT);
+                """
+            )
+            topics, questions = [], []
+            for position, (topic_id, topic_data) in enumerate(data.items()):
+                topic_questions = _topic_question_list(topic_data)
+                fields = {k: v for k, v in topic_data.items() if k != "questions"} \
+                    if isinstance(topic_data, dict) else {}
+                topics.append((topic_id, position, json.dumps(fields), len(topic_questions)))
+                questions.extend(
+                    (question.get("id") if isinstance(question, dict) else None, topic_id, i, json.dumps(question))
+                    for i, question in enumerate(topic_questions)
+                )
+            conn.executemany("INSERT INTO topics VALUES (?, ?, ?, ?)", topics)
+            conn.executemany("INSERT INTO questions VALUES (?, ?, ?, ?)", questions)
+            conn.executescript(
+                """
+                CREATE INDEX questions_by_id ON questions (question_id);
+                CREATE UNIQUE INDEX questions_by_topic ON questions (topic_id, position);
+                """
+            )
+            conn.executemany("INSERT INTO meta VALUES (?, ?)", [
+                ("schema_version", str(SCHEMA_VERSION)),
+                ("source_sha256", hashlib.sha256(raw).hexdigest()),
+            ])
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(staging, db_path)
+        logger.info(f"Imported {len(questions)} questions in {len(topics)} topics into {db_path}")
+        return cls(db_path)
+
+
+class _TopicQuestions(Sequence):
+    """A topic's question list, parsed from the bank on access."""
+
+    def __init__(self, bank: QuestionBank, topic_id: str):
+        self._bank = bank
+        self._topic_id = topic_id
+
+    def __len__(self) -> int:
+        return self._bank._topic_sizes[self._topic_id]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("question index out of range")
+        return self._bank._body(self._bank._topic_rowid(self._topic_id, index))
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self._bank._iter_topic(self._topic_id)
+
+
+def is_sqlite_bank(path) -> bool:
+    return Path(path).suffix.lower() in SQLITE_SUFFIXES
+
+
+def _topic_question_list(topic_data) -> List:
+    if isinstance(topic_data, dict):
+        return topic_data.get("questions", [])
+    if isinstance(topic_data, list):
+        return topic_data
+    return []
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) != 3:
+        print("usage: python src/question_bank.py <questions.json> <bank.sqlite>")
+        sys.exit(1)
+    QuestionBank.build(Path(sys.argv[1]), Path(sys.argv[2]))
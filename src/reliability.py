@@ -0,0 +1,231 @@
+"""
+Reliability analysis for IGCSE Assessment Tool.
+
+Implements the reliability metrics from docs/methodology.md:
+- Cronbach's alpha and alpha-if-item-deleted for every item
+- KR-20 (for 0/1 items this equals alpha)
+- Percentile bootstrap confidence intervals
+
+The bootstrap never materialises resampled response matrices. Alpha only
+needs per-item correct counts and the first two moments of the total
+score, so each batch of resamples becomes a multiplicity matrix W
+(resamples x students) and the statistics come from W @ X products.
+Batches can be spread across a process pool.
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.ingestion import ClassData
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ReliabilityReport:
+    """Reliability estimates for one response matrix."""
+    alpha: float
+    kr20: float
+    alpha_if_deleted: Dict[str, float]
+    num_students: int
+    num_items: int
+    confidence: float = 0.95
+    n_bootstrap: int = 0
+    alpha_ci: Optional[Tuple[float, float]] = None
+    alpha_if_deleted_ci: Optional[Dict[str, Tuple[float, float]]] = None
+
+    @property
+    def meets_target(self) -> bool:
+        """Methodology target for high-stakes use: alpha >= 0.80."""
+        return self.alpha >= 0.80
+
+
+def cronbach_alpha(responses: np.ndarray) -> float:
+    """Cronbach's alpha: k/(k-1) * (1 - sum(item variances) / total variance)."""
+    n, k = responses.shape
+    if k < 2 or n < 2:
+        return float("nan")
+    item_var = responses.var(axis=0, ddof=1).sum()
+    total_var = responses.sum(axis=1, dtype=np.int64).var(ddof=1)
+    return _alpha(k, item_var, total_var)
+
+
+def kr20(responses: np.ndarray) -> float:
+    """Kuder-Richardson 20: k/(k-1) * (1 - sum(p*q) / total variance), for 0/1 items."""
+    n, k = responses.shape
+    if k < 2 or n < 2:
+        return float("nan")
+    p = responses.mean(axis=0)
+    total_var = responses.sum(axis=1, dtype=np.int64).var(ddof=0)
+    return _alpha(k, (p * (1 - p)).sum(), total_var)
+
+
+def alpha_if_item_deleted(responses: np.ndarray) -> np.ndarray:
+    """
+    Alpha of the remaining k-1 items, for every item at once.
+
+    The rest-score variance comes from the item-total covariance, as in
+    diagnostics.item_statistic_arrays:
+        var(t - x_j) = var(t) - 2 cov(x_j, t) + var(x_j)
+    """
+    n, k = responses.shape
+    if k < 3 or n < 2:
+        return np.full(k, np.nan)
+    totals = responses.sum(axis=1, dtype=np.int64)
+    centered = totals - totals.mean()
+    item_var = responses.var(axis=0, ddof=1)
+    cov_xt = (centered @ responses.astype(np.float64)) / (n - 1)
+    rest_var = totals.var(ddof=1) - 2 * cov_xt + item_var
+    return _alpha(k - 1, item_var.sum() - item_var, rest_var)
+
+
+def bootstrap_alpha(
+    responses: np.ndarray,
+    n_bootstrap: int = 2000,
+    confidence: float = 0.95,
+    seed: Optional[int] = None,
+    batch_size: int = 100,
+    n_jobs: Optional[int] = 1,
+    include_items: bool = False,
+) -> Tuple[Tuple[float, float], Optional[np.ndarray]]:
+    """
+    Percentile bootstrap CI for alpha (and optionally alpha-if-deleted).
+
+    Args:
+        responses: 0/1 matrix, rows=students, cols=items
+        n_bootstrap: Number of resamples of students
+        confidence: Two-sided interval level
+        seed: Seed for reproducible resampling
+        batch_size: Resamples per W @ X product; bounds memory at
+            batch_size x students multiplicities
+        n_jobs: Worker processes; 1 runs in-process, None uses every CPU
+        include_items: Also return (items, 2) CIs for alpha-if-deleted
+
+    Returns:
+        ((low, high), item_cis or None)
+    """
+    n_students = responses.shape[0]
+    if n_students < 2:
+        raise ValueError("Bootstrap needs at least two students")
+
+    sizes = [min(batch_size, n_bootstrap - start) for start in range(0, n_bootstrap, batch_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    workers = n_jobs or os.cpu_count() or 1
+
+    if workers == 1:
+        # Local state, so the float copies are freed when this call returns
+        state = _batch_state(responses, include_items)
+        results = [_bootstrap_batch(size, s, state) for size, s in zip(sizes, seeds)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(responses, include_items)) as pool:
+            results = list(pool.map(_bootstrap_batch, sizes, seeds))
+
+    alphas = np.concatenate([r[0] for r in results])
+    tail = (1 - confidence) / 2 * 100
+    low, high = np.nanpercentile(alphas, [tail, 100 - tail])
+    item_cis = None
+    if include_items:
+        item_alphas = np.concatenate([r[1] for r in results])
+        item_cis = np.nanpercentile(item_alphas, [tail, 100 - tail], axis=0).T
+    return (float(low), float(high)), item_cis
+
+
+def reliability_report(
+    class_data: ClassData,
+    n_bootstrap: int = 2000,
+    confidence: float = 0.95,
+    seed: Optional[int] = None,
+    n_jobs: Optional[int] = 1,
+    include_item_cis: bool = False,
+) -> ReliabilityReport:
+    """Full reliability suite for a class; n_bootstrap=0 skips the CIs."""
+    responses = class_data.get_response_matrix()
+    questions: List[str] = class_data.mcq_questions
+    deleted = alpha_if_item_deleted(responses)
+
+    report = ReliabilityReport(
+        alpha=cronbach_alpha(responses),
+        kr20=kr20(responses),
+        alpha_if_deleted={q: float(a) for q, a in zip(questions, deleted)},
+        num_students=responses.shape[0],
+        num_items=responses.shape[1],
+        confidence=confidence,
+    )
+    if n_bootstrap > 0:
+        alpha_ci, item_cis = bootstrap_alpha(
+            responses, n_bootstrap, confidence, seed, n_jobs=n_jobs, include_items=include_item_cis
+        )
+        report.n_bootstrap = n_bootstrap
+        report.alpha_ci = alpha_ci
+        if item_cis is not None:
+            report.alpha_if_deleted_ci = {
+                q: (float(lo), float(hi)) for q, (lo, hi) in zip(questions, item_cis)
+            }
+    logger.info(f"Reliability: alpha={report.alpha:.3f}, KR-20={report.kr20:.3f}")
+    return report
+
+
+def _alpha(k: int, item_var_sum, total_var):
+    """Alpha from its sufficient pieces; NaN where the total has no variance."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        alpha = k / (k - 1) * (1 - np.asarray(item_var_sum) / np.asarray(total_var))
+    alpha = np.where(np.asarray(total_var) > 0, alpha, np.nan)
+    return float(alpha) if alpha.ndim == 0 else alpha
+
+
+# Per-process state for pool workers only, set once by _init_worker
+_worker: Dict[str, np.ndarray] = {}
+
+
+def _batch_state(responses: np.ndarray, include_items: bool) -> Dict[str, np.ndarray]:
+    """Float copies of the responses and totals shared by every batch."""
+    totals = responses.sum(axis=1, dtype=np.int64).astype(np.float64)
+    return {
+        # float32 sums stay exact: every partial sum of 0/1 counts is below 2**24
+        "x": responses.astype(np.float32),
+        "t": totals,
+        "t2": totals**2,
+        "xt": responses * totals[:, None] if include_items else None,
+    }
+
+
+def _init_worker(responses: np.ndarray, include_items: bool) -> None:
+    _worker.update(_batch_state(responses, include_items))
+
+
+def _bootstrap_batch(
+    size: int,
+    seed: np.random.SeedSequence,
+    state: Optional[Dict[str, np.ndarray]] = None,
+) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Alpha (and alpha-if-deleted) for `size` resamples; state defaults to the worker's."""
+    if state is None:
+        state = _worker
+    x, t, t2, xt = state["x"], state["t"], state["t2"], state["xt"]
+    n, k = x.shape
+    rng = np.random.default_rng(seed)
+
+    # Batched index matrix -> multiplicity of each student in each resample
+    idx = rng.integers(0, n, size=(size, n)) + (np.arange(size) * n)[:, None]
+    weights = np.bincount(idx.ravel(), minlength=size * n).reshape(size, n)
+
+    p = (weights.astype(np.float32) @ x).astype(np.float64) / n
+    mean_t = weights @ t / n
+    # ddof=1 variances, matching cronbach_alpha
+    scale = n / (n - 1)
+    item_var = p * (1 - p) * scale
+    total_var = (weights @ t2 / n - mean_t**2) * scale
+    alphas = _alpha(k, item_var.sum(axis=1), total_var)
+
+    item_alphas = None
+    if xt is not None and k >= 3:
+        cov_xt = ((weights @ xt) / n - p * mean_t[:, None]) * scale
+        rest_var = total_var[:, None] - 2 * cov_xt + item_var
+        item_alphas = _alpha(k - 1, item_var.sum(axis=1)[:, None] - item_var, rest_var)
+    return np.atleast_1d(alphas), item_alphas
@@ -286,13 +286,12 @@ class DiagnosticVisualizer:
 
 if __name__ == "__main__":
     # Test visualization
-    from src.ingestion import DataIngestion
+    from src.ingestion_cache import load_class_data
     from src.diagnostics import WeaknessAnalyzer
     
     # Load data and run analysis
     data_dir = Path("data")
-    ingestion = DataIngestion(data_dir)
-    class_data = ingestion.merge_all_data()
+    class_data = load_class_data(data_dir)
     
     analyzer = WeaknessAnalyzer(class_data)
     analyzer.analyze()
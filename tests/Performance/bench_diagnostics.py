@@ -0,0 +1,124 @@
+"""
+Diagnostics benchmarks - run directly, not collected by pytest.
+
+    python tests/Performance/bench_diagnostics.py
+"""
+
+import logging
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.diagnostics import EAPScorer, IncrementalItemStatistics, IRTCalibrator, WeaknessAnalyzer
+from src.ingestion import ClassData
+from src.reliability import reliability_report
+
+logging.disable(logging.INFO)
+
+
+def make_class_data(num_students: int, num_items: int, seed: int = 0) -> ClassData:
+    """Columnar ClassData with Rasch-like responses."""
+    rng = np.random.default_rng(seed)
+    theta = rng.normal(size=(num_students, 1))
+    b = rng.normal(size=num_items)
+    responses = (rng.random((num_students, num_items)) < 1 / (1 + np.exp(-(theta - b)))).astype(np.uint8)
+    ids = [f"S{i:06d}" for i in range(num_students)]
+    return ClassData.from_arrays(
+        student_ids=ids,
+        mcq_questions=[f"q{j + 1}" for j in range(num_items)],
+        responses=responses,
+        mcq_totals=responses.sum(axis=1).astype(float),
+        assignment_table=pd.DataFrame({"student_id": ids, "total": 250.0}),
+        participation_table=pd.DataFrame({"student_id": ids, "average": 3.0}),
+    )
+
+
+def timed(label: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:>40}: {time.perf_counter() - start:8.3f}s")
+    return result
+
+
+def bench_item_statistics(num_students: int = 50_000, num_items: int = 200) -> None:
+    """Time the matrix-pass item statistics at 200 items x 50,000 students."""
+    class_data = make_class_data(num_students, num_items)
+    analyzer = WeaknessAnalyzer(class_data)
+    analyzer._build_response_matrix()
+    timed(f"item statistics {num_items}x{num_students}", analyzer.calculate_item_statistics)
+
+
+def bench_student_profiles(num_students: int = 50_000, num_items: int = 200) -> None:
+    """Time profile generation for a cohort, then building every profile object."""
+    class_data = make_class_data(num_students, num_items)
+    analyzer = WeaknessAnalyzer(class_data)
+    analyzer.calculate_item_statistics()
+    profiles = timed(f"student profiles {num_students} students", analyzer.create_student_profiles)
+    timed("materialize every profile", lambda: [profiles[sid] for sid in profiles])
+
+
+def bench_irt_calibration(num_students: int = 100_000, num_items: int = 100) -> None:
+    """Time Rasch calibration at 100 items x 100,000 students."""
+    class_data = make_class_data(num_students, num_items)
+    calibrator = timed(f"Rasch calibration {num_items}x{num_students}", IRTCalibrator(class_data).fit)
+    print(f"{'':>40}  {calibrator.n_iter} EM iterations, converged={calibrator.converged}")
+
+
+def bench_eap_scoring(num_students: int = 100_000, num_items: int = 100, quiz_length: int = 15) -> None:
+    """Time batch EAP scoring and the single-student fast path."""
+    rng = np.random.default_rng(0)
+    questions = [f"q{j + 1}" for j in range(num_items)]
+    scorer = timed("build EAP tables", lambda: EAPScorer(rng.normal(size=num_items), questions))
+    responses = rng.integers(0, 2, size=(num_students, num_items), dtype=np.uint8)
+    answered = (rng.random((num_students, num_items)) < 0.5).astype(np.uint8)
+    timed(f"score {num_students} complete vectors", lambda: scorer.score_matrix(responses))
+    timed(f"score {num_students} partial vectors", lambda: scorer.score_matrix(responses, answered))
+
+    quiz = {q: int(rng.integers(0, 2)) for q in questions[:quiz_length]}
+    repeats = 10_000
+    start = time.perf_counter()
+    for _ in range(repeats):
+        scorer.score_student(quiz)
+    per_call = (time.perf_counter() - start) / repeats
+    print(f"{f'score_student ({quiz_length} answers)':>40}: {per_call * 1e6:8.1f}us")
+
+
+def bench_incremental_item_statistics(num_students: int = 50_000, num_items: int = 200) -> None:
+    """Time one submitted response vector against a full recompute."""
+    class_data = make_class_data(num_students, num_items)
+    tracker = timed(f"seed running sums {num_items}x{num_students}",
+                    lambda: IncrementalItemStatistics.from_class_data(class_data))
+    answers = dict(zip(class_data.mcq_questions, class_data.responses[0].tolist()))
+    repeats = 2_000
+    start = time.perf_counter()
+    for _ in range(repeats):
+        tracker.update(answers)
+        tracker.arrays()
+    per_call = (time.perf_counter() - start) / repeats
+    print(f"{'update + statistics per submission':>40}: {per_call * 1e6:8.1f}us")
+    timed("full recompute", lambda: WeaknessAnalyzer(class_data).calculate_item_statistics())
+
+
+def bench_reliability(num_students: int = 50_000, num_items: int = 200, n_bootstrap: int = 2000) -> None:
+    """Time the full reliability suite with bootstrap CIs, in-process and pooled."""
+    class_data = make_class_data(num_students, num_items)
+    for n_jobs in (1, None):
+        report = timed(
+            f"reliability, {n_bootstrap} resamples, n_jobs={n_jobs}",
+            lambda: reliability_report(class_data, n_bootstrap=n_bootstrap, seed=0, n_jobs=n_jobs),
+        )
+    print(f"{'':>40}  alpha={report.alpha:.3f} CI=({report.alpha_ci[0]:.3f}, {report.alpha_ci[1]:.3f})")
+
+
+if __name__ == "__main__":
+    bench_item_statistics()
+    bench_student_profiles()
+    bench_irt_calibration()
+    bench_eap_scoring()
+    bench_incremental_item_statistics()
+    bench_reliability()
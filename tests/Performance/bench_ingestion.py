@@ -0,0 +1,124 @@
+"""
+Ingestion benchmarks - run directly, not collected by pytest.
+
+    python tests/Performance/bench_ingestion.py
+"""
+
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from src.batch_ingestion import ingest_classes
+from src.ingestion import DataIngestion
+from src.ingestion_cache import ClassDataCache
+
+
+def write_class_files(data_dir: Path, num_students: int, num_questions: int = 50, seed: int = 0) -> None:
+    """Write mcq/assignments/participation CSVs for a synthetic class."""
+    rng = np.random.default_rng(seed)
+    ids = [f"S{i + 1:06d}" for i in range(num_students)]
+    responses = rng.integers(0, 2, size=(num_students, num_questions))
+
+    mcq = pd.DataFrame(responses, columns=[f"q{j + 1}" for j in range(num_questions)])
+    mcq.insert(0, "student_id", ids)
+    mcq["total_score"] = responses.sum(axis=1)
+    mcq.to_csv(data_dir / "mcq_results.csv", index=False)
+
+    assign = pd.DataFrame({
+        "student_id": ids,
+        **{f"assignment_{k + 1}": rng.uniform(60, 100, num_students) for k in range(3)},
+        "total": rng.uniform(180, 300, num_students),
+    })
+    assign.to_csv(data_dir / "assignments.csv", index=False)
+
+    part = pd.DataFrame({
+        "student_id": ids,
+        **{f"week_{w + 1}": rng.integers(1, 6, num_students) for w in range(4)},
+        "average": rng.uniform(1, 5, num_students),
+    })
+    part.to_csv(data_dir / "participation.csv", index=False)
+
+
+def bench_merge_all_data(sizes=(100, 1_000, 10_000, 100_000)) -> None:
+    """Time merge_all_data across class sizes; us/student should stay flat."""
+    print(f"{'students':>10} {'seconds':>10} {'us/student':>12}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            write_class_files(Path(tmp), n)
+            ingestion = DataIngestion(Path(tmp))
+            start = time.perf_counter()
+            class_data = ingestion.merge_all_data()
+            elapsed = time.perf_counter() - start
+        assert class_data.num_students == n
+        print(f"{n:>10} {elapsed:>10.3f} {elapsed / n * 1e6:>12.1f}")
+
+
+def bench_class_data_memory(num_students: int = 10_000) -> None:
+    """Compare memory held by row-mode and columnar ClassData."""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_class_files(Path(tmp), num_students)
+        ingestion = DataIngestion(Path(tmp))
+        for columnar in (False, True):
+            tracemalloc.start()
+            class_data = ingestion.merge_all_data(columnar=columnar)
+            held, _ = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            mode = "columnar" if columnar else "row"
+            print(f"{mode:>10} {num_students} students: {held / 2**20:8.1f} MiB held")
+            del class_data
+
+
+def bench_stream_all_data(num_students: int = 200_000, chunksize: int = 50_000) -> None:
+    """Report rows/sec and peak RSS for chunked streaming ingestion."""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_class_files(Path(tmp), num_students)
+        ingestion = DataIngestion(Path(tmp))
+        class_data = ingestion.stream_all_data(chunksize=chunksize)
+        assert class_data.num_students == num_students
+        print(f"stream_all_data(chunksize={chunksize}): {ingestion.last_stream_stats}")
+
+
+def bench_cache_load(num_students: int = 100_000) -> None:
+    """Compare CSV parsing against cold and warm binary-cache loads."""
+    with tempfile.TemporaryDirectory() as tmp:
+        write_class_files(Path(tmp), num_students)
+        cache = ClassDataCache(Path(tmp))
+        for label, load in (
+            ("csv merge", lambda: DataIngestion(Path(tmp)).merge_all_data(columnar=True)),
+            ("cache cold", lambda: cache.load(rebuild=True)),
+            ("cache warm", cache.load),
+        ):
+            start = time.perf_counter()
+            class_data = load()
+            print(f"{label:>12}: {time.perf_counter() - start:.3f}s for {class_data.num_students} students")
+
+
+def bench_ingest_classes(num_classes: int = 32, class_size: int = 5_000, worker_counts=(0, 2, 4)) -> None:
+    """Time batch ingestion of a school tree sequentially and in a process pool."""
+    with tempfile.TemporaryDirectory() as tmp:
+        for c in range(num_classes):
+            class_dir = Path(tmp) / f"class_{c:02d}"
+            class_dir.mkdir()
+            write_class_files(class_dir, class_size, seed=c)
+        for workers in worker_counts:
+            start = time.perf_counter()
+            result = ingest_classes(Path(tmp), max_workers=workers)
+            elapsed = time.perf_counter() - start
+            assert not result.errors
+            label = "sequential" if workers == 0 else f"{workers} workers"
+            print(f"{label:>12}: {elapsed:.2f}s for {result.num_students} students in {len(result.classes)} classes")
+
+
+if __name__ == "__main__":
+    bench_merge_all_data()
+    bench_class_data_memory()
+    bench_stream_all_data()
+    bench_cache_load()
+    bench_ingest_classes()
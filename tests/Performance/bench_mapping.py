@@ -0,0 +1,172 @@
+"""
+Topic mapping benchmarks - run directly, not collected by pytest.
+
+    python tests/Performance/bench_mapping.py
+"""
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.mapping import QuestionTopicMapping, TopicMapper
+
+SYLLABUS = ROOT / "data" / "syllabus_topics.json"
+BANK = ROOT / "data" / "past_questions_bank.json"
+
+
+def write_question_bank(path: Path, num_questions: int, seed: int = 0) -> None:
+    """Bank of synthetic questions assembled from sentences in the real bank."""
+    rng = random.Random(seed)
+    with open(BANK, "r", encoding="utf-8") as f:
+        bank = json.load(f)["chemistry_questions_bank"]
+    stems, options = [], []
+    for topic in bank.values():
+        for q in topic["questions"]:
+            stems.append(q["question"])
+            options.extend(q["options"].values())
+
+    topic_ids = list(bank)
+    questions = {t: {"questions": []} for t in topic_ids}
+    for i in range(num_questions):
+        questions[topic_ids[i % len(topic_ids)]]["questions"].append({
+            "id": f"SYN_{i:06d}",
+            "question": rng.choice(stems),
+            "options": {letter: rng.choice(options) for letter in "ABCD"},
+            "correct_answer": "A",
+        })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"chemistry_questions_bank": questions}, f)
+
+
+def make_mapper(num_questions: int, workdir: Path, mapper_class=TopicMapper) -> TopicMapper:
+    bank_path = workdir / f"bank_{num_questions}.json"
+    if not bank_path.exists():
+        write_question_bank(bank_path, num_questions)
+    return mapper_class(str(SYLLABUS), str(bank_path))
+
+
+def timed(label: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:>40}: {time.perf_counter() - start:8.3f}s")
+    return result
+
+
+class ScanTopicMapper(TopicMapper):
+    """TopicMapper scoring every topic with calculate_topic_confidence, as before the matcher."""
+
+    def map_question_to_topics(self, question_id, question_data):
+        question_text = question_data["question"] + " " + " ".join(question_data["options"].values())
+        if question_id in self.manual_mappings:
+            return [QuestionTopicMapping(question_id, self.manual_mappings[question_id], 1.0, "manual")]
+        topic_scores = []
+        for topic_id, topic in self.topics.items():
+            confidence = self.calculate_topic_confidence(question_text, topic)
+            if confidence > 0.0:
+                topic_scores.append((topic_id, confidence))
+        topic_scores.sort(key=lambda x: x[1], reverse=True)
+        return [QuestionTopicMapping(question_id, t, c, "auto") for t, c in topic_scores]
+
+    def map_all_questions(self):
+        mappings = []
+        for question_id, question in self._iter_questions():
+            mappings.extend(self.map_question_to_topics(question_id, question))
+        self.mappings = mappings
+
+
+def bench_map_all_questions(num_questions: int = 100_000) -> None:
+    """Compiled matcher against per-topic substring scans on a large bank."""
+    with tempfile.TemporaryDirectory() as tmp:
+        scan = make_mapper(num_questions, Path(tmp), ScanTopicMapper)
+        mapper = make_mapper(num_questions, Path(tmp))
+        before = timed(f"substring scans, {num_questions} questions", lambda: _timed_map(scan))
+        after = timed(f"compiled matcher, {num_questions} questions", lambda: _timed_map(mapper))
+        same = [m.to_dict() for m in mapper.mappings] == [m.to_dict() for m in scan.mappings]
+        print(f"{'':>40}  {before / after:.1f}x faster, identical mappings: {same}")
+        
+        pruned = make_mapper(num_questions, Path(tmp))
+        pruned.top_k, pruned.min_confidence = 3, 0.3
+        timed("top_k=3, min_confidence=0.3", lambda: _timed_map(pruned))
+        print(f"{'':>40}  {len(mapper.mappings)} -> {len(pruned.mappings)} mappings kept")
+
+
+def bench_parallel_scaling(num_questions: int = 100_000, worker_counts=(1, 2, 4, 8)) -> None:
+    """map_all_questions across 1/2/4/8 worker processes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        reference = None
+        for n_jobs in worker_counts:
+            mapper = make_mapper(num_questions, Path(tmp))
+            elapsed = timed(f"n_jobs={n_jobs}, {num_questions} questions",
+                            lambda: _timed_map(mapper, n_jobs=n_jobs))
+            mappings = [m.to_dict() for m in mapper.mappings]
+            if reference is None:
+                reference, base = mappings, elapsed
+            print(f"{'':>40}  {base / elapsed:.2f}x vs 1 worker, identical: {mappings == reference}")
+        print(f"{'':>40}  ({os.cpu_count()} CPUs available)")
+
+
+def bench_question_pool(num_questions: int = 20_000) -> None:
+    """QuestionSelector pool building: indexed best-topic lookup against a scan of every mapping."""
+    from src.paper_generator import QuestionSelector
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        mapper = make_mapper(num_questions, Path(tmp))
+        mapper.map_all_questions()
+        objects = list(mapper.mappings)
+        
+        def scan_best_topic(question_id):
+            for mapping in objects:
+                if mapping.question_id == question_id:
+                    return mapping.topic_id
+        
+        sample = [question_id for question_id, _ in mapper._iter_questions()][::num_questions // 200]
+        start = time.perf_counter()
+        for question_id in sample:
+            scan_best_topic(question_id)
+        per_scan = (time.perf_counter() - start) / len(sample)
+        print(f"{'linear scan, projected pool build':>40}: {per_scan * num_questions:8.3f}s")
+        timed(f"indexed pool build, {num_questions} questions", lambda: QuestionSelector(mapper))
+        print(f"{'':>40}  {len(mapper.mappings)} mappings in "
+              f"{sum(a.nbytes for a in (mapper.mappings.question_index, mapper.mappings.topic_index, mapper.mappings.confidence, mapper.mappings.method)) / 1e6:.1f} MB of arrays")
+
+
+def bench_class_weak_topics(num_questions: int = 2_000, num_students: int = 2_000) -> None:
+    """Class weak-topic aggregation: per-student loop against one sparse product."""
+    import numpy as np
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        mapper = make_mapper(num_questions, Path(tmp))
+        mapper.map_all_questions()
+        question_ids = [question_id for question_id, _ in mapper._iter_questions()]
+        rng = np.random.default_rng(0)
+        responses = (rng.random((num_students, num_questions)) < 0.6).astype(np.uint8)
+        
+        sample = 50
+        start = time.perf_counter()
+        for s in range(sample):
+            mapper.aggregate_weak_questions(dict(zip(question_ids, responses[s].astype(bool).tolist())))
+        per_student = (time.perf_counter() - start) / sample
+        print(f"{'per-student calls, projected':>40}: {per_student * num_students:8.3f}s")
+        mastery = timed(f"class matrix, {num_students} students",
+                        lambda: mapper.aggregate_class_weak_topics(responses, question_ids))
+        print(f"{'':>40}  mastery matrix {mastery.correct.shape}")
+
+
+def _timed_map(mapper: TopicMapper, **kwargs) -> float:
+    start = time.perf_counter()
+    mapper.map_all_questions(**kwargs)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    bench_map_all_questions()
+    bench_parallel_scaling()
+    bench_question_pool()
+    bench_class_weak_topics()
@@ -0,0 +1,157 @@
+"""
+Paper generation benchmarks - run directly, not collected by pytest.
+
+    python tests/Performance/bench_paper_generator.py
+"""
+
+import io
+import logging
+import random
+import statistics
+import sys
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bench_mapping import make_mapper, timed
+from src.exposure_store import ExposureStore
+from src.paper_export import PaperBundle
+from src.paper_generator import PaperConfig, PaperGenerator
+
+logging.disable(logging.INFO)
+
+
+def scan_lookup(questions, question_id):
+    """The per-question bank scan the exporters used before the question index."""
+    for topic_data in questions.values():
+        if isinstance(topic_data, dict) and "questions" in topic_data:
+            for q in topic_data["questions"]:
+                if q.get("id") == question_id:
+                    return q
+    return None
+
+
+def bench_export_papers(num_questions: int = 50_000, num_papers: int = 1_000) -> None:
+    """Export personalized papers from a large bank: lookups against file I/O."""
+    with tempfile.TemporaryDirectory() as tmp:
+        mapper = make_mapper(num_questions, Path(tmp))
+        mapper.map_all_questions()
+        generator = timed(f"PaperGenerator, {num_questions} questions", lambda: PaperGenerator(mapper))
+        config = PaperConfig(total_questions=20)
+        papers = timed(f"generate {num_papers} papers", lambda: [generator.generate_paper(config) for _ in range(num_papers)])
+
+        sample = papers[:5]
+        start = time.perf_counter()
+        for paper in sample:
+            for _ in range(2):  # text and answer key
+                for q in paper.questions:
+                    scan_lookup(mapper.questions, q.question_id)
+        per_paper = (time.perf_counter() - start) / len(sample)
+        print(f"{'bank scans, projected':>40}: {per_paper * num_papers:8.3f}s")
+
+        start = time.perf_counter()
+        for paper in papers:
+            for _ in range(2):
+                for q in paper.questions:
+                    generator.question_index.get(q.question_id)
+        print(f"{'indexed lookups':>40}: {time.perf_counter() - start:8.3f}s")
+
+        out = Path(tmp) / "papers"
+        timed(f"export {num_papers} papers", lambda: [generator.export_paper(p, str(out)) for p in papers])
+        timed(f"export {num_papers} papers, jsonl only",
+              lambda: [generator.export_paper(p, str(out), formats=["jsonl"]) for p in papers])
+        for label, compression in [("deflated", zipfile.ZIP_DEFLATED), ("stored", zipfile.ZIP_STORED)]:
+            def export_bundle():
+                with PaperBundle(Path(tmp) / f"papers_{label}.zip", compression) as bundle:
+                    for p in papers:
+                        generator.export_paper(p, writer=bundle)
+            timed(f"export {num_papers} papers, {label} bundle", export_bundle)
+
+
+def bench_batch_generation(num_questions: int = 50_000, num_students: int = 1_000) -> None:
+    """Cohort papers/sec, serial against the process pool."""
+    with tempfile.TemporaryDirectory() as tmp:
+        mapper = make_mapper(num_questions, Path(tmp))
+        mapper.map_all_questions()
+        generator = PaperGenerator(mapper)
+        topics = list(mapper.topics)
+        analyses = {
+            f"S{i:05d}": {"weak_topics": {topics[i % len(topics)]: {"success_rate": 0.3},
+                                          topics[(i * 7) % len(topics)]: {"success_rate": 0.4}}}
+            for i in range(num_students)
+        }
+        config = PaperConfig(total_questions=20, paper_type="weak_focus")
+        for n_jobs in (1, None):
+            result = generator.generate_batch(analyses, config, str(Path(tmp) / f"batch_{n_jobs}"), n_jobs=n_jobs)
+            print(f"{f'generate_batch, n_jobs={n_jobs}':>40}: {result.elapsed_seconds:8.3f}s "
+                  f"{result.papers_per_second:8.1f} papers/sec")
+
+        # Exposure tracking: two rounds, the second avoiding the first round's questions
+        generator.exposure_store = ExposureStore(Path(tmp) / "exposures.sqlite")
+        for round_number in (1, 2):
+            result = generator.generate_batch(analyses, config, str(Path(tmp) / f"tracked_{round_number}"))
+            print(f"{f'with exposure store, round {round_number}':>40}: {result.elapsed_seconds:8.3f}s "
+                  f"{result.papers_per_second:8.1f} papers/sec")
+        generator.exposure_store.close()
+
+
+def bench_assembler(num_questions: int = 50_000, num_papers: int = 200) -> None:
+    """Constraint-solved 50-question papers: time per paper and mark-total misses.
+
+    With 3/5/7 marks a 50-question paper always totals an even number, so
+    the targets are even.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        mapper = make_mapper(num_questions, Path(tmp))
+        mapper.map_all_questions()
+        generator = PaperGenerator(mapper)
+        topics = list(mapper.topics)
+        rng = random.Random(0)
+        times, misses = [], 0
+        for i in range(num_papers):
+            config = PaperConfig(total_questions=50, total_points=rng.randrange(160, 340, 2), paper_type="assembled")
+            weak = {"weak_topics": {topics[i % len(topics)]: {"success_rate": 0.3}}}
+            _, report = generator.assembler.assemble(config, weak, rng)
+            times.append(report.elapsed_ms)
+            misses += report.points_deviation != 0
+        print(f"{'assemble, 50 questions':>40}: {statistics.median(times):8.2f}ms median "
+              f"{max(times):8.2f}ms max (max includes GC pauses)")
+        print(f"{'papers missing the mark total':>40}: {misses} of {num_papers}")
+
+
+def bench_html_rendering(num_questions: int = 50_000, num_papers: int = 1_000) -> None:
+    """Printable HTML for a cohort: cold fragment cache, warm cache, and into a bundle."""
+    with tempfile.TemporaryDirectory() as tmp:
+        mapper = make_mapper(num_questions, Path(tmp))
+        mapper.map_all_questions()
+        generator = PaperGenerator(mapper)
+        config = PaperConfig(total_questions=50, total_points=250, paper_type="assembled")
+        papers = [generator.generate_paper(config) for _ in range(num_papers)]
+        renderer = generator.renderers["html"]
+
+        def render_all():
+            for paper in papers:
+                renderer.render(paper, io.StringIO())
+
+        timed(f"render {num_papers} papers, cold cache", render_all)
+        timed(f"render {num_papers} papers, warm cache", render_all)
+        print(f"{'cached fragments':>40}: {renderer.cache_info().currsize:8d}")
+
+        def export_bundle():
+            with PaperBundle(Path(tmp) / "html.zip") as bundle:
+                for paper in papers:
+                    generator.export_paper(paper, formats=["html"], writer=bundle)
+
+        timed(f"export {num_papers} html papers, bundle", export_bundle)
+
+
+if __name__ == "__main__":
+    bench_assembler()
+    bench_export_papers()
+    bench_batch_generation()
+    bench_html_rendering()
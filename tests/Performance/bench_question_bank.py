@@ -0,0 +1,60 @@
+"""
+Question bank storage benchmarks - run directly, not collected by pytest.
+
+    python tests/Performance/bench_question_bank.py
+"""
+
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bench_mapping import write_question_bank
+from src.question_bank import QuestionBank
+
+
+def measure(label: str, fn):
+    """Time fn and report the memory it leaves allocated."""
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:>40}: {elapsed:8.3f}s {retained / 1e6:8.1f} MB retained")
+    return result
+
+
+def bench_open_bank(sizes=(10_000, 100_000, 300_000)) -> None:
+    """Startup cost of the JSON bank against opening the SQLite bank, by bank size."""
+    with tempfile.TemporaryDirectory() as tmp:
+        for num_questions in sizes:
+            json_path = Path(tmp) / f"bank_{num_questions}.json"
+            db_path = Path(tmp) / f"bank_{num_questions}.sqlite"
+            write_question_bank(json_path, num_questions)
+            QuestionBank.build(json_path, db_path)
+
+            def load_json():
+                with open(json_path, "r", encoding="utf-8") as f:
+                    return json.load(f)
+
+            measure(f"json.load, {num_questions} questions", load_json)
+            bank = measure(f"open SQLite, {num_questions} questions", lambda: QuestionBank(db_path))
+            question_id = f"SYN_{num_questions // 2:06d}"
+            repeats = 1_000
+            start = time.perf_counter()
+            for _ in range(repeats):
+                bank._body.cache_clear()
+                bank.get_question(question_id)
+            per_call = (time.perf_counter() - start) / repeats
+            print(f"{'uncached get_question':>40}: {per_call * 1e6:8.1f}us")
+
+
+if __name__ == "__main__":
+    bench_open_bank()
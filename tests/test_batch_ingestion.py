@@ -0,0 +1,74 @@
+# igcse-assessment-tool/tests/test_batch_ingestion.py
+
+import pandas as pd
+import pytest
+
+from src.batch_ingestion import combine_class_data, discover_class_dirs, ingest_classes
+from src.ingestion import DataIngestion
+
+
+def write_class(class_dir, ids, questions=("q1", "q2"), bad_week=False):
+    class_dir.mkdir(parents=True)
+    mcq = pd.DataFrame({"student_id": ids, **{q: [1] * len(ids) for q in questions}})
+    mcq["total_score"] = len(questions)
+    mcq.to_csv(class_dir / "mcq_results.csv", index=False)
+    pd.DataFrame({"student_id": ids, "total": [250.0] * len(ids)}).to_csv(
+        class_dir / "assignments.csv", index=False
+    )
+    pd.DataFrame({
+        "student_id": ids,
+        "week_1": [9 if bad_week else 3] * len(ids),
+        "average": [3.0] * len(ids),
+    }).to_csv(class_dir / "participation.csv", index=False)
+
+
+@pytest.fixture
+def school(tmp_path):
+    write_class(tmp_path / "year10" / "10A", ["A1", "A2"])
+    write_class(tmp_path / "year10" / "10B", ["B1"], questions=("q1", "q3"))
+    write_class(tmp_path / "year11" / "11A", ["C1"], bad_week=True)
+    return tmp_path
+
+
+class TestBatchIngestion:
+    def test_discover(self, school):
+        names = [d.relative_to(school).as_posix() for d in discover_class_dirs(school)]
+        assert names == ["year10/10A", "year10/10B", "year11/11A"]
+
+    @pytest.mark.parametrize("max_workers", [0, 2])
+    def test_errors_do_not_abort_batch(self, school, max_workers):
+        result = ingest_classes(school, max_workers=max_workers, max_in_flight=1)
+        assert list(result.classes) == ["year10/10A", "year10/10B"]
+        assert list(result.errors) == ["year11/11A"]
+        assert "1-5" in result.errors["year11/11A"]
+        assert result.num_students == 3
+        assert "1 failed" in result.summary()
+
+    def test_combined(self, school):
+        result = ingest_classes(school, max_workers=0, chunksize=1)
+        school_data = result.combined()
+        assert school_data.student_ids == ["A1", "A2", "B1"]
+        assert school_data.mcq_questions == ["q1", "q2", "q3"]
+        assert school_data.get_response_matrix().tolist() == [[1, 1, 0], [1, 1, 0], [1, 0, 1]]
+        assert school_data.students["B1"].assignment_total == 250.0
+
+    def test_combined_rejects_duplicate_ids(self, tmp_path):
+        write_class(tmp_path / "a", ["S1"])
+        write_class(tmp_path / "b", ["S1"])
+        result = ingest_classes(tmp_path, max_workers=0)
+        with pytest.raises(ValueError, match="S1"):
+            combine_class_data(result.classes)
+
+    def test_cached_build_streams_with_chunksize(self, school, monkeypatch):
+        calls = []
+        stream = DataIngestion.stream_all_data
+
+        def counting_stream(self, chunksize=50_000):
+            calls.append(chunksize)
+            return stream(self, chunksize=chunksize)
+
+        monkeypatch.setattr(DataIngestion, "stream_all_data", counting_stream)
+        result = ingest_classes(school, max_workers=0, chunksize=1, use_cache=True)
+        assert list(result.classes) == ["year10/10A", "year10/10B"]
+        assert calls == [1, 1, 1]
+        assert (school / "year10" / "10A" / ".ingestion_cache" / "manifest.json").exists()
@@ -13,10 +13,16 @@ import sys
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from scipy import stats
+
 from src.diagnostics import (
     WeaknessAnalyzer, 
     ItemStatistics, 
-    StudentWeaknessProfile
+    StudentWeaknessProfile,
+    IRTCalibrator,
+    EAPScorer,
+    IncrementalItemStatistics,
+    item_statistic_arrays
 )
 from src.ingestion import DataIngestion, ClassData, StudentRecord
 
@@ -203,6 +209,23 @@ class TestWeaknessAnalyzer:
         assert q5_stats.num_correct == 0
         assert q5_stats.num_attempts == 5
     
+    def test_discrimination_matches_scipy(self):
+        """Vectorized discrimination equals per-item pointbiserialr on the rest score."""
+        rng = np.random.default_rng(0)
+        responses = (rng.random((200, 12)) < rng.random(12)).astype(np.uint8)
+        responses[:, 0] = 1  # no variance -> 0.0
+        
+        num_correct, p_values, discrimination = item_statistic_arrays(responses, block_rows=64)
+        totals = responses.sum(axis=1)
+        
+        assert discrimination[0] == 0.0
+        for j in range(1, 12):
+            x = responses[:, j]
+            expected, _ = stats.pointbiserialr(x, totals - x)
+            assert discrimination[j] == pytest.approx(expected, abs=1e-10)
+            assert num_correct[j] == x.sum()
+            assert p_values[j] == pytest.approx(x.mean())
+    
     def test_create_student_profiles(self):
         """Test student profile creation."""
         class_data = self.create_sample_class_data()
@@ -223,6 +246,29 @@ class TestWeaknessAnalyzer:
         assert s005_profile.overall_mcq_percentage == 0.0
         assert len(s005_profile.weak_questions) == 5  # All questions
     
+    def test_profiles_built_lazily(self, monkeypatch):
+        """Profiles are computed for the class but only built on access."""
+        class_data = self.create_sample_class_data()
+        analyzer = WeaknessAnalyzer(class_data)
+        profiles = analyzer.create_student_profiles()
+        
+        builds = []
+        build = type(profiles)._build
+        monkeypatch.setattr(type(profiles), "_build", lambda self, i: builds.append(i) or build(self, i))
+        
+        assert list(profiles) == ["S001", "S002", "S003", "S004", "S005"]
+        assert len(profiles) == 5
+        assert builds == []
+        
+        s002 = profiles["S002"]
+        assert builds == [1]
+        assert profiles["S002"] is s002
+        assert builds == [1]
+        # Missed q3, q4, q5 ordered easiest (highest p-value) first
+        assert s002.weak_questions == ["q3", "q4", "q5"]
+        assert s002.performance_by_difficulty == {"Easy": 100.0, "Medium": 50.0, "Hard": 0.0}
+        assert s002.suggested_focus_areas == []
+    
     def test_identify_weak_items(self):
         """Test weak item identification."""
         class_data = self.create_sample_class_data()
@@ -248,6 +294,32 @@ class TestWeaknessAnalyzer:
         assert len(analyzer.student_profiles) == 5
         assert analyzer._response_matrix is not None
     
+    def test_columnar_class_data(self):
+        """Columnar class data gives the same analysis as row mode."""
+        row_data = self.create_sample_class_data()
+        ids = list(row_data.students)
+        columnar = ClassData.from_arrays(
+            student_ids=ids,
+            mcq_questions=row_data.mcq_questions,
+            responses=row_data.get_response_matrix(),
+            mcq_totals=np.array([row_data.students[s].mcq_total for s in ids]),
+            assignment_table=pd.DataFrame({"total": [80.0] * len(ids)}),
+            participation_table=pd.DataFrame({"average": [4.0] * len(ids)}),
+        )
+        
+        row_analyzer = WeaknessAnalyzer(row_data)
+        row_analyzer.analyze()
+        col_analyzer = WeaknessAnalyzer(columnar)
+        col_analyzer.analyze()
+        
+        assert col_analyzer.item_stats == row_analyzer.item_stats
+        assert col_analyzer.student_profiles == row_analyzer.student_profiles
+        # The analyzer reads the class matrix without copying it
+        assert np.shares_memory(
+            col_analyzer._response_matrix[columnar.mcq_questions].to_numpy(),
+            columnar.responses
+        )
+    
     def test_class_summary(self):
         """Test class summary generation."""
         class_data = self.create_sample_class_data()
@@ -262,11 +334,182 @@ class TestWeaknessAnalyzer:
         assert "avg_score" in summary
         assert "hardest_questions" in summary
         assert "easiest_questions" in summary
+        assert summary["kr20"] == pytest.approx(summary["cronbach_alpha"])
+        assert "alpha_ci" not in summary
         
         # Check ordering
         assert summary["hardest_questions"][0] == "q5"  # 0% correct
         assert summary["easiest_questions"][0] == "q1"  # 80% correct
 
 
+class TestIncrementalItemStatistics:
+    """Test running item statistics."""
+    
+    def test_one_at_a_time_equals_full_recompute(self):
+        """Per-response updates give bit-identical statistics."""
+        rng = np.random.default_rng(1)
+        responses = (rng.random((300, 15)) < rng.random(15)).astype(np.uint8)
+        responses[:, 3] = 1  # no variance
+        questions = [f"q{j + 1}" for j in range(15)]
+        
+        tracker = IncrementalItemStatistics(questions)
+        for row in responses:
+            tracker.update(dict(zip(questions, row.tolist())))
+        
+        expected = item_statistic_arrays(responses)
+        for got, want in zip(tracker.arrays(), expected):
+            np.testing.assert_array_equal(got, want)
+        assert tracker.num_students == 300
+        assert tracker.score_histogram.sum() == 300
+        
+        # block seeding agrees with single updates
+        seeded = IncrementalItemStatistics(questions)
+        seeded.add_responses(responses[:100])
+        for row in responses[100:]:
+            seeded.update(dict(zip(questions, row.tolist())))
+        np.testing.assert_array_equal(seeded.arrays()[2], expected[2])
+    
+    def test_new_questions_and_partial_answers(self):
+        """Unseen questions are appended; unanswered questions count as 0."""
+        tracker = IncrementalItemStatistics()
+        tracker.update({"q1": 1, "q2": 0})
+        tracker.update({"q2": 1, "q3": 1})
+        tracker.update({"q1": 0, "q3": 1})
+        
+        full = np.array([[1, 0, 0], [0, 1, 1], [0, 0, 1]], dtype=np.uint8)
+        for got, want in zip(tracker.arrays(), item_statistic_arrays(full)):
+            np.testing.assert_array_equal(got, want)
+        
+        stats_by_q = tracker.item_statistics()
+        assert list(stats_by_q) == ["q1", "q2", "q3"]
+        assert stats_by_q["q3"].num_correct == 2
+        assert stats_by_q["q3"].num_attempts == 3
+    
+    def test_from_class_data_and_invalid_answers(self):
+        class_data, _ = simulate_rasch_class(200, np.linspace(-1, 1, 8))
+        tracker = IncrementalItemStatistics.from_class_data(class_data)
+        analyzer = WeaknessAnalyzer(class_data)
+        analyzer.calculate_item_statistics()
+        assert tracker.item_statistics() == analyzer.item_stats
+        
+        with pytest.raises(ValueError):
+            tracker.update({"q1": 2})
+
+
+def simulate_rasch_class(num_students: int, difficulties: np.ndarray, seed: int = 0):
+    """Columnar ClassData with responses drawn from a Rasch model."""
+    rng = np.random.default_rng(seed)
+    theta = rng.normal(size=num_students)
+    prob = 1 / (1 + np.exp(-(theta[:, None] - difficulties[None, :])))
+    responses = (rng.random(prob.shape) < prob).astype(np.uint8)
+    ids = [f"S{i:05d}" for i in range(num_students)]
+    class_data = ClassData.from_arrays(
+        student_ids=ids,
+        mcq_questions=[f"q{j + 1}" for j in range(len(difficulties))],
+        responses=responses,
+        mcq_totals=responses.sum(axis=1).astype(float),
+        assignment_table=pd.DataFrame({"total": np.zeros(num_students)}),
+        participation_table=pd.DataFrame({"average": np.zeros(num_students)}),
+    )
+    return class_data, theta
+
+
+class TestIRTCalibrator:
+    """Test Rasch calibration."""
+    
+    def test_recovers_parameters(self):
+        """Simulated difficulties and abilities are recovered."""
+        true_b = np.linspace(-2, 2, 20)
+        class_data, true_theta = simulate_rasch_class(5000, true_b)
+        
+        calibrator = IRTCalibrator(class_data).fit()
+        
+        assert calibrator.converged
+        assert np.abs(calibrator.difficulties - true_b).max() < 0.15
+        assert np.corrcoef(calibrator.theta, true_theta)[0, 1] > 0.8
+        assert (calibrator.theta_se > 0).all()
+        assert (calibrator.difficulty_se > 0).all()
+        # Harder items get higher difficulty
+        assert calibrator.get_item_difficulty("q20") > calibrator.get_item_difficulty("q1")
+    
+    def test_abilities_follow_raw_score(self):
+        """Rasch abilities are monotone in raw score."""
+        class_data = TestWeaknessAnalyzer().create_sample_class_data()
+        calibrator = IRTCalibrator(class_data).fit()
+        
+        s004 = calibrator.get_ability("S004")  # 4 correct
+        s005 = calibrator.get_ability("S005")  # 0 correct
+        assert s004.student_id == "S004"
+        assert s004.theta > calibrator.get_ability("S001").theta > s005.theta
+        # q5 was answered correctly by nobody
+        assert calibrator.get_item_difficulty("q5") == max(calibrator.difficulties)
+    
+    def test_requires_fit(self):
+        """Reading parameters before fit() raises."""
+        calibrator = IRTCalibrator(TestWeaknessAnalyzer().create_sample_class_data())
+        with pytest.raises(RuntimeError):
+            calibrator.get_ability("S001")
+    
+    def test_export_parameters(self, tmp_path):
+        """Parameters export to CSV."""
+        calibrator = IRTCalibrator(TestWeaknessAnalyzer().create_sample_class_data()).fit()
+        calibrator.export_parameters(tmp_path / "items.csv", tmp_path / "abilities.csv")
+        
+        assert len(pd.read_csv(tmp_path / "items.csv")) == 5
+        assert list(pd.read_csv(tmp_path / "abilities.csv")["Student"]) == ["S001", "S002", "S003", "S004", "S005"]
+
+
+class TestEAPScorer:
+    """Test EAP ability scoring against a fixed item set."""
+    
+    def setup_method(self):
+        self.questions = [f"q{j + 1}" for j in range(8)]
+        self.scorer = EAPScorer(np.linspace(-1.5, 1.5, 8), self.questions)
+    
+    def test_matches_direct_integration(self):
+        """Batch scores equal a direct quadrature of the Rasch posterior."""
+        rng = np.random.default_rng(1)
+        responses = rng.integers(0, 2, size=(30, 8))
+        answered = (rng.random((30, 8)) < 0.6).astype(int)
+        theta, se = self.scorer.score_matrix(responses, answered)
+        
+        nodes = np.linspace(-6, 6, 2001)
+        prior = np.exp(-nodes**2 / 2)
+        prob = 1 / (1 + np.exp(-(nodes[None, :] - self.scorer.difficulties[:, None])))
+        for i in range(30):
+            seen = answered[i] == 1
+            x = responses[i][seen][:, None]
+            likelihood = np.prod(np.where(x == 1, prob[seen], 1 - prob[seen]), axis=0)
+            posterior = likelihood * prior / np.sum(likelihood * prior)
+            mean = posterior @ nodes
+            assert theta[i] == pytest.approx(mean, abs=1e-3)
+            assert se[i] == pytest.approx(np.sqrt(posterior @ (nodes - mean)**2), abs=1e-3)
+    
+    def test_student_fast_path_matches_batch(self):
+        """score_student agrees with score_matrix for full and partial quizzes."""
+        responses = np.array([[1, 1, 0, 1, 0, 0, 1, 0], [1, 0, 1, 0, 0, 0, 0, 0]])
+        answered = np.array([[1] * 8, [1, 1, 1, 0, 0, 1, 0, 0]])
+        theta, se = self.scorer.score_matrix(responses, answered)
+        
+        for i in range(2):
+            answers = {q: int(responses[i, j]) for j, q in enumerate(self.questions) if answered[i, j]}
+            answers["not_calibrated"] = 1  # ignored
+            assert self.scorer.score_student(answers) == pytest.approx((theta[i], se[i]))
+        
+        # No calibrated answers -> prior N(0, 1)
+        assert self.scorer.score_student({}) == pytest.approx((0.0, 1.0))
+    
+    def test_calibrator_round_trip(self, tmp_path):
+        """A scorer loaded from exported parameters reproduces calibrated abilities."""
+        class_data = TestWeaknessAnalyzer().create_sample_class_data()
+        calibrator = IRTCalibrator(class_data).fit()
+        calibrator.export_parameters(tmp_path / "items.csv", tmp_path / "abilities.csv")
+        
+        scorer = EAPScorer.from_csv(tmp_path / "items.csv")
+        theta, _ = scorer.score_matrix(class_data.get_response_matrix())
+        # CSV difficulties are rounded to 3 places
+        assert theta == pytest.approx(calibrator.theta, abs=1e-2)
+
+
 if __name__ == "__main__":
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,47 @@
+# igcse-assessment-tool/tests/test_exposure_store.py
+
+import sqlite3
+
+import pytest
+
+from src.exposure_store import ExposureStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ExposureStore(tmp_path / "exposures.sqlite")
+    yield store
+    store.close()
+
+
+class TestExposureStore:
+    def test_record_and_seen(self, store):
+        assert store.seen("S1") == set()
+        store.record_many([
+            ("S1", "P1", ["Q1", "Q2"]),
+            ("S2", "P2", ["Q2"]),
+        ])
+        assert store.seen("S1") == {"Q1", "Q2"}
+        assert store.students_exposed("Q2") == ["S1", "S2"]
+        assert store.has_paper("P1") and not store.has_paper("P3")
+
+        # Cached sets stay in step with writes; repeats keep their first paper
+        store.record("S1", "P3", ["Q2", "Q3"])
+        assert store.seen("S1") == {"Q1", "Q2", "Q3"}
+        paper_id, = store._conn.execute(
+            "SELECT paper_id FROM exposures WHERE student_id = 'S1' AND question_id = 'Q2'"
+        ).fetchone()
+        assert paper_id == "P1"
+
+    def test_persists_across_opens(self, store):
+        store.record("S1", "P1", ["Q1"])
+        reopened = ExposureStore(store.db_path)
+        assert reopened.seen("S1") == {"Q1"}
+        reopened.close()
+
+    def test_duplicate_paper_id_records_nothing(self, store):
+        store.record("S1", "P1", ["Q1"])
+        with pytest.raises(sqlite3.IntegrityError):
+            store.record_many([("S2", "P2", ["Q2"]), ("S2", "P1", ["Q3"])])
+        assert store.seen("S2") == set()
+        assert not store.has_paper("P2")
@@ -1,6 +1,7 @@
 # igcse-assessment-tool/tests/test_ingestion.py
 
 import pytest
+import numpy as np
 import pandas as pd
 from pathlib import Path
 import tempfile
@@ -10,6 +11,7 @@ from src.ingestion import (
     DataIngestion,
     StudentRecord,
     ClassData,
+    ClassDataBuilder,
     generate_sample_data,
 )
 
@@ -52,6 +54,40 @@ class TestClassData:
         assert cd.num_students == 0
         assert cd.num_questions == 0
 
+    def test_columnar(self):
+        cd = ClassData.from_arrays(
+            student_ids=["S1", "S2"],
+            mcq_questions=["q1", "q2"],
+            responses=np.array([[1, 0], [1, 1]]),
+            mcq_totals=np.array([1.0, 2.0]),
+            assignment_table=pd.DataFrame({"student_id": ["S1", "S2"], "total": [200.0, 250.0]}),
+            participation_table=pd.DataFrame({"student_id": ["S1", "S2"], "average": [3.0, 4.5]}),
+        )
+        assert cd.is_columnar
+        assert cd.num_students == 2
+        assert cd.get_response_matrix().dtype == np.uint8
+        assert cd.get_response_matrix() is cd.responses
+        rec = cd.students["S2"]
+        assert isinstance(rec, StudentRecord)
+        assert rec.student_id == "S2"
+        assert dict(rec.mcq_responses) == {"q1": 1, "q2": 1}
+        assert rec.mcq_total == 2.0
+        assert rec.assignment_total == 250.0
+        assert rec.participation == {"student_id": "S2", "average": 4.5}
+        assert not hasattr(rec, "__dict__")
+        with pytest.raises(ValueError):
+            ClassData.from_arrays(
+                ["S1"], ["q1"], np.array([[2]]), np.array([2.0]),
+                pd.DataFrame({"total": [0.0]}), pd.DataFrame({"average": [0.0]}),
+            )
+
+    def test_row_mode_response_matrix(self):
+        cd = ClassData()
+        cd.mcq_questions = ["q1", "q2"]
+        cd.students["S1"] = StudentRecord("S1", {"q1": 1}, 1.0, {}, 0.0, {}, 0.0)
+        assert not cd.is_columnar
+        assert cd.get_response_matrix().tolist() == [[1, 0]]
+
 class TestDataIngestion:
     def setup_method(self):
         self.tmp = tempfile.mkdtemp()
@@ -74,6 +110,113 @@ class TestDataIngestion:
         with pytest.raises(ValueError):
             di.load_participation()
 
+    def _write_class(self, ids, assign_ids=None, part_ids=None):
+        assign_ids = ids if assign_ids is None else assign_ids
+        part_ids = ids if part_ids is None else part_ids
+        pd.DataFrame({
+            "student_id": ids,
+            "q1": [1, 0, 1][:len(ids)],
+            "q2": [0, 0, 1][:len(ids)],
+            "total_score": [1, 0, 2][:len(ids)],
+        }).to_csv(self.path / "mcq_results.csv", index=False)
+        pd.DataFrame({
+            "student_id": assign_ids,
+            "assignment_1": [70.0, 80.0, 90.0][:len(assign_ids)],
+            "total": [210.0, 240.0, 270.0][:len(assign_ids)],
+        }).to_csv(self.path / "assignments.csv", index=False)
+        pd.DataFrame({
+            "student_id": part_ids,
+            "week_1": [3, 4, 5][:len(part_ids)],
+            "average": [3.0, 4.0, 5.0][:len(part_ids)],
+        }).to_csv(self.path / "participation.csv", index=False)
+
+    def test_merge_all_data(self):
+        # assignment/participation rows deliberately out of mcq order
+        self._write_class(["S1", "S2", "S3"], assign_ids=["S3", "S1", "S2"], part_ids=["S2", "S3", "S1"])
+        cd = DataIngestion(self.path).merge_all_data()
+        assert list(cd.students) == ["S1", "S2", "S3"]
+        assert cd.mcq_questions == ["q1", "q2"]
+        s3 = cd.students["S3"]
+        assert s3.mcq_responses == {"q1": 1, "q2": 1}
+        assert s3.mcq_total == 2.0
+        assert s3.assignments == {"student_id": "S3", "assignment_1": 70.0, "total": 210.0}
+        assert s3.assignment_total == 210.0
+        assert s3.participation == {"student_id": "S3", "week_1": 4, "average": 4.0}
+        assert s3.participation_avg == 4.0
+
+    def test_merge_columnar_matches_rows(self):
+        self._write_class(["S1", "S2", "S3"], assign_ids=["S3", "S1", "S2"])
+        di = DataIngestion(self.path)
+        rows = di.merge_all_data()
+        cols = di.merge_all_data(columnar=True)
+        assert list(cols.students) == list(rows.students)
+        for sid, rec in rows.students.items():
+            view = cols.students[sid]
+            assert dict(view.mcq_responses) == rec.mcq_responses
+            assert view.mcq_total == rec.mcq_total
+            assert view.assignments == rec.assignments
+            assert view.participation_avg == rec.participation_avg
+        assert (cols.get_response_matrix() == rows.get_response_matrix()).all()
+
+    def test_stream_matches_merge(self):
+        self._write_class(["S1", "S2", "S3"], assign_ids=["S3", "S1", "S2"], part_ids=["S2", "S3", "S1"])
+        di = DataIngestion(self.path)
+        merged = di.merge_all_data(columnar=True)
+        streamed = di.stream_all_data(chunksize=2)
+        assert streamed.student_ids == merged.student_ids
+        assert (streamed.responses == merged.responses).all()
+        for sid in merged.student_ids:
+            assert streamed.students[sid].participation == merged.students[sid].participation
+            assert streamed.students[sid].assignment_total == merged.students[sid].assignment_total
+        stats = di.last_stream_stats
+        assert stats.rows == 3
+        assert stats.rows_per_sec > 0
+
+    def test_builder_drops_unneeded_rows_per_chunk(self):
+        builder = ClassDataBuilder()
+        builder.add_mcq_chunk(pd.DataFrame({"student_id": ["S1", "S2"], "q1": [1, 0], "total_score": [1, 0]}))
+        builder.add_assignment_chunk(pd.DataFrame({"student_id": ["S1", "S9", "S1"], "total": [1.0, 2.0, 3.0]}))
+        builder.add_assignment_chunk(pd.DataFrame({"student_id": ["S2", "S1"], "total": [4.0, 5.0]}))
+        builder.add_participation_chunk(pd.DataFrame({"student_id": ["S2", "S1"], "average": [2.0, 3.0]}))
+        assert builder.buffered_rows == 4
+        cd = builder.build()
+        assert cd.students["S1"].assignment_total == 1.0
+        assert cd.students["S2"].assignment_total == 4.0
+
+    def test_stream_validates_each_chunk(self):
+        pd.DataFrame({"student_id": ["S1", "S2", "S3"], "q1": [1, 0, 3], "total_score": [1, 0, 3]}).to_csv(
+            self.path / "mcq_results.csv", index=False
+        )
+        chunks = DataIngestion(self.path).iter_mcq_chunks(chunksize=2)
+        first = next(chunks)
+        assert first["q1"].dtype == np.int8
+        with pytest.raises(ValueError, match="rows 2-2"):
+            next(chunks)
+
+    def test_stream_rejects_values_that_wrap_in_int8(self):
+        """257 would parse as 1 in int8; both paths must reject it"""
+        self._write_class(["S1", "S2"])
+        mcq = pd.read_csv(self.path / "mcq_results.csv")
+        mcq.loc[1, "q1"] = 257
+        mcq.to_csv(self.path / "mcq_results.csv", index=False)
+        di = DataIngestion(self.path)
+        with pytest.raises(ValueError, match="non-binary"):
+            di.merge_all_data()
+        with pytest.raises(ValueError, match="non-binary"):
+            di.stream_all_data()
+
+        self._write_class(["S1", "S2"])
+        part = pd.read_csv(self.path / "participation.csv")
+        part.loc[0, "week_1"] = 259
+        part.to_csv(self.path / "participation.csv", index=False)
+        with pytest.raises(ValueError, match="1-5"):
+            DataIngestion(self.path).stream_all_data()
+
+    def test_merge_missing_student(self):
+        self._write_class(["S1", "S2"], assign_ids=["S1", "S9"])
+        with pytest.raises(ValueError, match="S2"):
+            DataIngestion(self.path).merge_all_data()
+
 class TestGenerateSampleData:
     def test_creates_files(self, tmp_path):
         generate_sample_data(tmp_path, num_students=2, num_questions=2)
@@ -0,0 +1,118 @@
+# igcse-assessment-tool/tests/test_ingestion_cache.py
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.ingestion import DataIngestion
+from src.ingestion_cache import ClassDataCache, load_class_data
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    pd.DataFrame({
+        "student_id": ["S1", "S2"],
+        "q1": [1, 0],
+        "q2": [1, 1],
+        "total_score": [2, 1],
+    }).to_csv(tmp_path / "mcq_results.csv", index=False)
+    pd.DataFrame({
+        "student_id": ["S2", "S1"],
+        "assignment_1": [65.5, 90.0],
+        "total": [200.0, 270.0],
+    }).to_csv(tmp_path / "assignments.csv", index=False)
+    pd.DataFrame({
+        "student_id": ["S1", "S2"],
+        "week_1": [4, 2],
+        "average": [4.0, 2.0],
+    }).to_csv(tmp_path / "participation.csv", index=False)
+    return tmp_path
+
+
+class TestClassDataCache:
+    def test_cold_then_warm_load(self, data_dir):
+        cache = ClassDataCache(data_dir)
+        assert not cache.is_fresh()
+        cold = cache.load()
+        assert cache.is_fresh()
+        warm = cache.load()
+
+        expected = DataIngestion(data_dir).merge_all_data()
+        for cd in (cold, warm):
+            assert list(cd.students) == ["S1", "S2"]
+            for sid, rec in expected.students.items():
+                view = cd.students[sid]
+                assert dict(view.mcq_responses) == rec.mcq_responses
+                assert view.mcq_total == rec.mcq_total
+                assert view.assignments == rec.assignments
+                assert view.participation == rec.participation
+
+        # warm responses are a read-only view of the cached file
+        assert not warm.responses.flags.writeable
+
+    def test_rebuilds_when_source_changes(self, data_dir):
+        load_class_data(data_dir)
+        mcq = pd.read_csv(data_dir / "mcq_results.csv")
+        mcq.loc[0, "q2"] = 0
+        mcq.loc[0, "total_score"] = 1
+        mcq.to_csv(data_dir / "mcq_results.csv", index=False)
+
+        assert not ClassDataCache(data_dir).is_fresh()
+        cd = load_class_data(data_dir)
+        assert cd.students["S1"].mcq_responses["q2"] == 0
+
+    def test_touch_keeps_cache(self, data_dir):
+        cache = ClassDataCache(data_dir)
+        cache.load()
+        path = data_dir / "participation.csv"
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        assert cache.is_fresh()
+
+    def test_custom_cache_dir(self, data_dir, tmp_path_factory):
+        cache_dir = tmp_path_factory.mktemp("cache") / "class_a"
+        cd = load_class_data(data_dir, cache_dir=cache_dir)
+        assert (cache_dir / "responses.npy").exists()
+        assert np.array_equal(np.load(cache_dir / "responses.npy"), cd.responses)
+
+    def test_rejects_row_mode(self, data_dir):
+        with pytest.raises(ValueError):
+            ClassDataCache(data_dir).write(DataIngestion(data_dir).merge_all_data())
+
+    def test_warm_load_matches_cold_with_numeric_ids_and_gaps(self, tmp_path):
+        pd.DataFrame({"student_id": [101, 102], "q1": [1, 0], "total_score": [1, 0]}).to_csv(
+            tmp_path / "mcq_results.csv", index=False
+        )
+        pd.DataFrame({
+            "student_id": [102, 101],
+            "comment": ["late", None],
+            "assignment_1": [65.5, None],
+            "total": [200.0, 270.0],
+        }).to_csv(tmp_path / "assignments.csv", index=False)
+        pd.DataFrame({"student_id": [101, 102], "week_1": [4, 2], "average": [4.0, 2.0]}).to_csv(
+            tmp_path / "participation.csv", index=False
+        )
+        cache = ClassDataCache(tmp_path)
+        cold = cache.load()
+        warm = cache.load()
+
+        assert warm.student_ids == cold.student_ids == [101, 102]
+        pd.testing.assert_frame_equal(warm.assignment_table, cold.assignment_table)
+        pd.testing.assert_frame_equal(warm.participation_table, cold.participation_table)
+        assert pd.isna(warm.students[101].assignments["comment"])
+
+    def test_source_changed_during_build_is_not_cached_as_fresh(self, data_dir, monkeypatch):
+        merge = DataIngestion.merge_all_data
+
+        def merge_then_edit(self, columnar=False):
+            cd = merge(self, columnar=columnar)
+            with open(data_dir / "participation.csv", "a", encoding="utf-8") as f:
+                f.write("S3,5,5.0\n")
+            return cd
+
+        monkeypatch.setattr(DataIngestion, "merge_all_data", merge_then_edit)
+        cache = ClassDataCache(data_dir)
+        cache.load()
+        assert not cache.is_fresh()
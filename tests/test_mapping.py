@@ -5,11 +5,14 @@ import os
 from pathlib import Path
 import sys
 
+import numpy as np
+
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.resolve()))
 
 # Import from mapping module in src directory
-from src.mapping import TopicMapper, Topic, QuestionTopicMapping
+from src.mapping import TopicMapper, Topic, QuestionTopicMapping, KeywordMatcher, MappingStore
+from src import mapping as mapping_module
 
 
 class TestTopicMapping(unittest.TestCase):
@@ -170,6 +173,146 @@ class TestTopicMapping(unittest.TestCase):
         self.assertEqual(mappings[0].method, "manual")
         self.assertEqual(mappings[0].confidence, 1.0)
         self.assertEqual(mappings[0].topic_id, "1.1_solids_liquids_gases")
+    
+    def test_map_all_questions_matches_per_question_mapping(self):
+        """Batched map_all_questions keeps order, sorting and manual overrides"""
+        mapper = TopicMapper(self.syllabus_path, self.questions_path, self.manual_path)
+        mapper.map_all_questions(batch_size=1)
+        batched = [m.to_dict() for m in mapper.mappings]
+        
+        expected = []
+        for question_id, question in mapper._iter_questions():
+            expected.extend(m.to_dict() for m in mapper.map_question_to_topics(question_id, question))
+        
+        self.assertEqual(batched, expected)
+        self.assertEqual(batched[0]["method"], "manual")
+        self.assertTrue(any(m["question_id"] == "TEST_002" for m in batched))
+    
+    def test_parallel_map_all_questions_is_deterministic(self):
+        """A process pool gives the same mappings, in the same order, as one process"""
+        serial = TopicMapper(self.syllabus_path, self.questions_path, self.manual_path, top_k=2)
+        serial.map_all_questions()
+        pooled = TopicMapper(self.syllabus_path, self.questions_path, self.manual_path, top_k=2)
+        pooled.map_all_questions(batch_size=1, n_jobs=2)
+        
+        self.assertEqual([m.to_dict() for m in pooled.mappings], [m.to_dict() for m in serial.mappings])
+        # Worker state only ever lives in the pool's processes
+        self.assertEqual(mapping_module._worker, {})
+    
+    def test_duplicate_question_ids_map_first_occurrence(self):
+        """A repeated id is mapped once, from the same question QuestionIndex returns"""
+        self.test_questions["chemistry_questions_bank"]["2.4_ionic_bonding"]["questions"].append({
+            "id": "TEST_002",
+            "question": "Which arrangement of solid particles is correct?",
+            "options": {"A": "Liquid", "B": "Gas"},
+            "correct_answer": "A"
+        })
+        with open(self.questions_path, 'w') as f:
+            json.dump(self.test_questions, f)
+        mapper = TopicMapper(self.syllabus_path, self.questions_path)
+        mapper.map_all_questions()
+        
+        first = mapper.question_index.get("TEST_002")
+        expected = mapper.map_question_to_topics("TEST_002", first)
+        self.assertEqual([m.to_dict() for m in mapper.mappings.for_question("TEST_002")],
+                         [m.to_dict() for m in expected])
+        self.assertEqual(mapper.mappings.best_topic("TEST_002"), "2.4_ionic_bonding")
+        self.assertEqual(sum(m.question_id == "TEST_002" for m in mapper.mappings), len(expected))
+    
+    def test_class_weak_topics_match_per_student_aggregation(self):
+        """One sparse product gives each student's aggregate_weak_questions stats"""
+        mapper = TopicMapper(self.syllabus_path, self.questions_path)
+        mapper.map_all_questions()
+        question_ids = ["TEST_002", "TEST_001", "NOT_IN_BANK"]
+        responses = np.array([[1, 1, 1], [0, 1, 0], [1, 0, 0], [0, 0, 1]], dtype=np.uint8)
+        
+        mastery = mapper.aggregate_class_weak_topics(responses, question_ids, ["A", "B", "C", "D"])
+        
+        self.assertEqual(mastery.correct.shape, (4, len(mapper.topics)))
+        self.assertEqual(mastery.topic_ids, list(mapper.topics))
+        for s, student_id in enumerate(["A", "B", "C", "D"]):
+            results = {q: bool(responses[s, j]) for j, q in enumerate(question_ids)}
+            self.assertEqual(mastery.for_student(student_id), mapper.aggregate_weak_questions(results))
+            for t, topic_id in enumerate(mastery.topic_ids):
+                expected = mapper.aggregate_weak_questions(results)[topic_id]["success_rate"]
+                self.assertEqual(mastery.success_rate[s, t], expected)
+        
+        matrix = mapper.topic_confidence_matrix(question_ids)
+        self.assertEqual(matrix.shape, (3, len(mapper.topics)))
+        self.assertEqual(matrix[2].nnz, 0)
+        self.assertTrue((matrix.data > 0.3).all())
+    
+    def test_top_k_pruning(self):
+        """Pruned mappers keep only the best automatic mappings per question"""
+        full = TopicMapper(self.syllabus_path, self.questions_path, self.manual_path)
+        full.map_all_questions()
+        pruned = TopicMapper(self.syllabus_path, self.questions_path, self.manual_path,
+                             top_k=1, min_confidence=0.2)
+        pruned.map_all_questions()
+        
+        expected = []
+        for question_id, _ in full._iter_questions():
+            kept = [m for m in full.mappings if m.question_id == question_id and m.confidence >= 0.2]
+            expected.extend(m.to_dict() for m in kept[:1])
+        self.assertEqual([m.to_dict() for m in pruned.mappings], expected)
+        
+        for question_id, question in pruned._iter_questions():
+            single = pruned.map_question_to_topics(question_id, question)
+            self.assertLessEqual(len(single), 1)
+
+
+class TestMappingStore(unittest.TestCase):
+    """Test cases for the indexed mapping store"""
+    
+    def setUp(self):
+        self.mappings = [
+            QuestionTopicMapping("Q1", "ions", 0.8, "auto"),
+            QuestionTopicMapping("Q1", "atoms", 0.25, "auto"),
+            QuestionTopicMapping("Q2", "atoms", 1.0, "manual"),
+            QuestionTopicMapping("Q3", "atoms", 0.5, "auto"),
+            QuestionTopicMapping("Q3", "ions", 0.45, "auto"),
+        ]
+        self.store = MappingStore.from_mappings(self.mappings)
+    
+    def test_sequence_interface(self):
+        """The store reads like the list it was built from"""
+        expected = [m.to_dict() for m in self.mappings]
+        self.assertEqual(len(self.store), 5)
+        self.assertEqual([m.to_dict() for m in self.store], expected)
+        self.assertEqual([m.to_dict() for m in self.store[1:3]], expected[1:3])
+        self.assertEqual(self.store[-1].to_dict(), expected[-1])
+        with self.assertRaises(IndexError):
+            self.store[5]
+    
+    def test_lookups(self):
+        """Lookups by question and by topic, and best-topic lookup"""
+        self.assertEqual([m.topic_id for m in self.store.for_question("Q3")], ["atoms", "ions"])
+        self.assertEqual([m.question_id for m in self.store.for_topic("atoms")], ["Q1", "Q2", "Q3"])
+        self.assertEqual(self.store.best_topic("Q1"), "ions")
+        self.assertEqual(self.store.best_topic("Q2"), "atoms")
+        self.assertIsNone(self.store.best_topic("missing"))
+        self.assertEqual(self.store.for_question("missing"), [])
+    
+    def test_aggregate_weak_questions_matches_object_walk(self):
+        """Array aggregation gives the same stats as walking mapping objects"""
+        mapper = TopicMapper.__new__(TopicMapper)
+        mapper.topics = {
+            "ions": Topic("ions", "Ions", "medium", ["ion"]),
+            "atoms": Topic("atoms", "Atoms", "easy", ["atom"]),
+            "unused": Topic("unused", "Unused", "hard", ["zzz"]),
+        }
+        mapper.mappings = self.mappings
+        results = {"Q1": True, "Q2": False}
+        
+        stats = mapper.aggregate_weak_questions(results)
+        
+        self.assertEqual(stats["atoms"]["total_questions"], 2)  # Q1's 0.25 is below 0.3
+        self.assertEqual(stats["atoms"]["wrong_questions"], ["Q2", "Q3"])
+        self.assertEqual(stats["ions"]["correct_answers"], 1)
+        self.assertEqual(stats["ions"]["confidence_sum"], 0.8 + 0.45)
+        self.assertEqual(stats["ions"]["success_rate"], 0.5)
+        self.assertEqual(stats["unused"]["total_questions"], 0)
+        self.assertEqual(stats["unused"]["avg_confidence"], 0.0)
 
 
 class TestQuestionTopicMapping(unittest.TestCase):
@@ -199,6 +342,74 @@ class TestQuestionTopicMapping(unittest.TestCase):
         self.assertEqual(mapping_dict, expected)
 
 
+class TestKeywordMatcher(unittest.TestCase):
+    """Test cases for the compiled keyword matcher"""
+    
+    def setUp(self):
+        self.topics = {
+            "ions": Topic("ions", "Ions and Ionic Bonds", "medium", ["ion", "ionic", "ionic bond", "Charge", "ion"]),
+            "atoms": Topic("atoms", "Atomic Structure", "easy", ["atomic number", "mass number", "proton", "non-metal"]),
+            "untagged": Topic("untagged", "Electrolysis of Solutions", "hard", []),
+            "empty": Topic("empty", "Misc", "easy", ["", "zzz"]),
+        }
+        self.texts = [
+            "Which IONIC compound conducts?",
+            "The atomic\tnumber of a non-metal",
+            "Electrolysis of aqueous solutions, with ions",
+            "atomic  number is not a phrase match here",
+            "nothing relevant",
+            "bondionic charges",
+            "",
+        ]
+    
+    def test_matches_calculate_topic_confidence(self):
+        """Matcher scores equal the per-topic substring scan exactly"""
+        mapper = TopicMapper.__new__(TopicMapper)
+        matcher = KeywordMatcher(self.topics)
+        
+        for i, text in enumerate(self.texts):
+            expected = [
+                (topic_id, mapper.calculate_topic_confidence(text, topic))
+                for topic_id, topic in self.topics.items()
+            ]
+            expected = [(t, c) for t, c in expected if c > 0.0]
+            self.assertEqual(matcher.topic_confidences(text), expected, text)
+        
+        # Batched scoring gives the same numbers grouped by text
+        rows, cols, values = matcher.score_texts(self.texts, sort=False)
+        for i, text in enumerate(self.texts):
+            batch = [(matcher.topic_ids[c], v) for r, c, v in zip(rows, cols, values) if r == i]
+            self.assertEqual(batch, matcher.topic_confidences(text))
+    
+    def test_top_k_and_min_confidence_pruning(self):
+        """Pruned scores are the head of each text's sorted, unpruned scores"""
+        matcher = KeywordMatcher(self.topics)
+        full = matcher.score_texts(self.texts)
+        for top_k, min_confidence in ((1, 0.0), (2, 0.15), (None, 0.5)):
+            rows, cols, values = matcher.score_texts(self.texts, top_k=top_k, min_confidence=min_confidence)
+            for i in range(len(self.texts)):
+                expected = [(c, v) for r, c, v in zip(*full) if r == i and v >= min_confidence][:top_k]
+                got = [(c, v) for r, c, v in zip(rows, cols, values) if r == i]
+                self.assertEqual(got, expected)
+        
+        # Unsorted pruning keeps the same topics, in topic order
+        rows, cols, _ = matcher.score_texts(self.texts, sort=False, top_k=1)
+        sorted_rows, sorted_cols, _ = matcher.score_texts(self.texts, top_k=1)
+        self.assertEqual(sorted(zip(rows, cols)), sorted(zip(sorted_rows, sorted_cols)))
+    
+    def test_chunk_cache_eviction_keeps_batch_hits(self):
+        """Evicting the chunk cache mid-stream does not drop chunks seen earlier"""
+        topics = {"acids": Topic("acids", "Acids", "easy", ["acid"])}
+        capped = KeywordMatcher(topics)
+        capped.MAX_CACHED_CHUNKS = 3
+        fresh = KeywordMatcher(topics)
+        
+        capped.topic_confidences("acid x")
+        self.assertEqual(capped.topic_confidences("acid y z w"), fresh.topic_confidences("acid y z w"))
+        self.assertTrue(capped.topic_confidences("acid y z w"))
+
+
+
 class TestTopic(unittest.TestCase):
     """Test cases for Topic class"""
     
@@ -0,0 +1,123 @@
+# igcse-assessment-tool/tests/test_mapping_cache.py
+
+import json
+
+import pytest
+
+from src.mapping import TopicMapper
+from src.mapping_cache import MappingCache, map_all_questions_cached
+
+
+SYLLABUS = {
+    "chemistry_topics": {
+        "1.1_states": {"title": "States of Matter", "keywords": ["solid", "liquid", "gas", "particle"]},
+        "2.4_ionic": {"title": "Ions and Ionic Bonds", "keywords": ["ion", "ionic", "electron", "charge"]},
+    }
+}
+
+
+def question(qid, text):
+    return {"id": qid, "question": text, "options": {"A": "a solid", "B": "an ion"}, "correct_answer": "A"}
+
+
+@pytest.fixture
+def bank_dir(tmp_path):
+    bank = {
+        "chemistry_questions_bank": {
+            "1.1_states": {"questions": [question("Q1", "Particles in a gas"), question("Q2", "Melting a solid")]},
+            "2.4_ionic": {"questions": [question("Q3", "Electron transfer forms ions"), question("Q4", "Charge")]},
+        }
+    }
+    (tmp_path / "syllabus.json").write_text(json.dumps(SYLLABUS))
+    (tmp_path / "questions.json").write_text(json.dumps(bank))
+    (tmp_path / "manual.json").write_text(json.dumps({"manual_topic_mappings": {"Q4": "2.4_ionic"}}))
+    return tmp_path
+
+
+def make_mapper(bank_dir, **kwargs):
+    return TopicMapper(str(bank_dir / "syllabus.json"), str(bank_dir / "questions.json"),
+                       str(bank_dir / "manual.json"), **kwargs)
+
+
+def mapping_dicts(mapper):
+    return [m.to_dict() for m in mapper.mappings]
+
+
+def edit_bank(bank_dir, edit):
+    path = bank_dir / "questions.json"
+    bank = json.loads(path.read_text())
+    edit(bank["chemistry_questions_bank"])
+    path.write_text(json.dumps(bank))
+
+
+class TestMappingCache:
+    def test_cold_then_warm(self, bank_dir):
+        expected = make_mapper(bank_dir)
+        expected.map_all_questions()
+        cache = MappingCache(bank_dir / "mappings.json")
+
+        cold = make_mapper(bank_dir)
+        assert cache.map_all_questions(cold) == 4
+        warm = make_mapper(bank_dir)
+        assert cache.map_all_questions(warm) == 0
+
+        assert mapping_dicts(cold) == mapping_dicts(expected)
+        assert mapping_dicts(warm) == mapping_dicts(expected)
+
+    def test_remaps_only_new_and_edited_questions(self, bank_dir):
+        cache = MappingCache(bank_dir / "mappings.json")
+        cache.map_all_questions(make_mapper(bank_dir))
+
+        def edit(bank):
+            bank["1.1_states"]["questions"][1]["options"]["B"] = "an ionic charge"
+            bank["2.4_ionic"]["questions"].append(question("Q5", "Liquid particles"))
+            del bank["1.1_states"]["questions"][0]
+        edit_bank(bank_dir, edit)
+
+        mapper = make_mapper(bank_dir)
+        assert cache.map_all_questions(mapper) == 2  # Q2 edited, Q5 new
+        expected = make_mapper(bank_dir)
+        expected.map_all_questions()
+        assert mapping_dicts(mapper) == mapping_dicts(expected)
+
+        # Deleted questions are dropped from the file
+        stored = json.loads((bank_dir / "mappings.json").read_text())
+        assert sorted(stored["questions"]) == ["Q2", "Q3", "Q4", "Q5"]
+
+    def test_config_changes_remap_everything(self, bank_dir):
+        path = bank_dir / "mappings.json"
+        map_all_questions_cached(make_mapper(bank_dir), path)
+
+        assert map_all_questions_cached(make_mapper(bank_dir, top_k=1), path) == 4
+
+        (bank_dir / "manual.json").write_text(json.dumps({"manual_topic_mappings": {}}))
+        mapper = make_mapper(bank_dir, top_k=1)
+        assert map_all_questions_cached(mapper, path) == 4
+        assert all(m.method == "auto" for m in mapper.mappings)
+
+        mapper.topics["1.1_states"].keywords.append("melting")
+        assert map_all_questions_cached(mapper, path) == 4
+        assert map_all_questions_cached(mapper, path, rebuild=True) == 4
+
+    def test_corrupt_file_is_rebuilt(self, bank_dir):
+        path = bank_dir / "mappings.json"
+        path.write_text("{not json")
+        assert map_all_questions_cached(make_mapper(bank_dir), path) == 4
+        assert json.loads(path.read_text())["version"] == 1
+
+    def test_duplicate_ids_are_mapped_once(self, bank_dir):
+        def edit(bank):
+            bank["2.4_ionic"]["questions"].append(question("Q1", "Electron charge"))
+        edit_bank(bank_dir, edit)
+
+        cache = MappingCache(bank_dir / "mappings.json")
+        cold = make_mapper(bank_dir)
+        assert cache.map_all_questions(cold) == 4
+        warm = make_mapper(bank_dir)
+        assert cache.map_all_questions(warm) == 0
+
+        # Q1 keeps the mappings of its first occurrence, once
+        q1 = [m for m in mapping_dicts(cold) if m["question_id"] == "Q1"]
+        assert q1 and len({m["topic_id"] for m in q1}) == len(q1)
+        assert q1[0]["topic_id"] == "1.1_states"
+        assert mapping_dicts(warm) == mapping_dicts(cold)
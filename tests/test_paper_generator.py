@@ -5,6 +5,8 @@ Tests paper generation, question selection, and export functionality
 
 import unittest
 import json
+import random
+import zipfile
 import tempfile
 import os
 import sys
@@ -13,7 +15,10 @@ from pathlib import Path
 # Simple path setup
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from paper_generator import PaperGenerator, PaperConfig, QuestionSelector, QuestionSelection
+from paper_generator import PaperGenerator, PaperConfig, QuestionSelector, QuestionSelection, new_paper_id
+import paper_generator
+from exposure_store import ExposureStore
+from paper_export import PaperRenderer
 from mapping import TopicMapper, Topic
 
 
@@ -178,6 +183,21 @@ class TestPaperGenerator(unittest.TestCase):
             self.assertIn("difficulty", qdata)
             self.assertIn("weight", qdata)
     
+    def test_question_pool_reads_bodies_on_demand(self):
+        """Building the pool does not fetch question bodies from the bank"""
+        index = self.mapper.question_index
+        fetched = []
+        get = index.get
+        index.get = lambda question_id: fetched.append(question_id) or get(question_id)
+        try:
+            selector = QuestionSelector(self.mapper)
+            self.assertEqual(fetched, [])
+            qid = next(iter(selector.available_questions))
+            self.assertIs(selector.available_questions[qid]["question_data"], get(qid))
+            self.assertEqual(fetched, [qid])
+        finally:
+            del index.get
+    
     def test_balanced_question_selection(self):
         """Test balanced question selection"""
         selector = QuestionSelector(self.mapper)
@@ -192,6 +212,33 @@ class TestPaperGenerator(unittest.TestCase):
             self.assertIn(selection.difficulty, ["easy", "medium", "hard"])
             self.assertGreater(selection.points, 0)
     
+    def test_selector_buckets(self):
+        """Buckets partition the pool and sampling skips excluded ids"""
+        selector = QuestionSelector(self.mapper)
+        pool = selector.available_questions
+        self.assertEqual(selector.bucket(), list(pool))
+        for qdata in pool.values():
+            topic_id, difficulty = qdata["topic_id"], qdata["difficulty"]
+            self.assertEqual(selector.bucket(topic_id=topic_id),
+                             [qid for qid, q in pool.items() if q["topic_id"] == topic_id])
+            self.assertEqual(selector.bucket(difficulty=difficulty),
+                             [qid for qid, q in pool.items() if q["difficulty"] == difficulty])
+            self.assertEqual(selector.bucket(topic_id, difficulty),
+                             [qid for qid, q in pool.items() if (q["topic_id"], q["difficulty"]) == (topic_id, difficulty)])
+        buckets = selector.buckets()
+        self.assertEqual(sorted(qid for qids in buckets.values() for qid in qids), sorted(pool))
+        self.assertEqual(selector.bucket(topic_id="missing"), [])
+        self.assertEqual([selector.points_for(d) for d in ("easy", "medium", "hard")], [3, 5, 7])
+        
+        bucket = [f"Q{i}" for i in range(100)]
+        excluded = set(bucket[::2])
+        self.assertEqual(sorted(selector.sample(bucket, 50, random.Random(0), excluded)), sorted(set(bucket) - excluded))
+        
+        excluded = {"SLG_001", "ION_001"}
+        selections = selector.select_balanced(2, excluded, random.Random(0))
+        self.assertTrue(selections)
+        self.assertFalse({s.question_id for s in selections} & excluded)
+    
     def test_weak_topics_selection(self):
         """Test weak topic focused selection"""
         selector = QuestionSelector(self.mapper)
@@ -336,6 +383,248 @@ class TestPaperGenerator(unittest.TestCase):
         # Clean up
         import shutil
         shutil.rmtree(output_dir)
+    
+    def test_export_formats_and_custom_renderer(self):
+        """jsonl holds the whole paper on one line; added renderers are used by name"""
+        class IdRenderer(PaperRenderer):
+            name = "ids"
+            suffix = "_ids.txt"
+            
+            def render(self, paper, out):
+                out.write(",".join(q.question_id for q in paper.questions))
+        
+        self.generator.renderers["ids"] = IdRenderer()
+        paper = self.generator.generate_paper(PaperConfig(total_questions=2))
+        output_dir = os.path.join(self.temp_dir, "formats")
+        files = self.generator.export_paper(paper, output_dir, formats=["jsonl", "ids"])
+        
+        self.assertEqual(list(files), ["jsonl", "ids"])
+        with open(files["jsonl"]) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["paper_id"], paper.paper_id)
+        with open(files["ids"]) as f:
+            self.assertEqual(f.read(), ",".join(q.question_id for q in paper.questions))
+        
+        class NoRender(PaperRenderer):
+            name = "broken"
+        
+        with self.assertRaises(TypeError):
+            NoRender()
+    
+    def test_html_export_caches_fragments(self):
+        """Printable HTML is built from per-question fragments cached by question content"""
+        renderer = self.generator.renderers["html"]
+        config = PaperConfig(total_questions=3, paper_type="comprehensive")
+        paper = self.generator.generate_paper(config)
+        output_dir = os.path.join(self.temp_dir, "html")
+        
+        html_file = self.generator.export_paper(paper, output_dir, formats=["html"])["html"]
+        with open(html_file, encoding="utf-8") as f:
+            page = f.read()
+        self.assertIn(paper.title, page)
+        self.assertIn('class="answers"', page)
+        for q in paper.questions:
+            self.assertIn(f'id="{q.question_id}"', page)
+        misses = renderer.cache_info().misses
+        self.assertEqual(misses, len(paper.questions))
+        
+        self.generator.export_paper(paper, output_dir, formats=["html"])
+        self.assertEqual(renderer.cache_info().misses, misses)
+        
+        # A replaced bank only rebuilds the fragments whose question changed
+        questions = json.loads(json.dumps(self.mapper.questions))
+        first = paper.questions[0].question_id
+        for topic_data in questions.values():
+            for question in topic_data["questions"]:
+                if question["id"] == first:
+                    question["question"] = "Which is <b>bold</b>?"
+        self.mapper.questions = questions
+        self.generator.export_paper(paper, output_dir, formats=["html"])
+        with open(html_file, encoding="utf-8") as f:
+            self.assertIn("Which is &lt;b&gt;bold&lt;/b&gt;?", f.read())
+        self.assertEqual(renderer.cache_info().misses, misses + 1)
+        
+        # So does an edit made in place
+        self.generator.question_index.get(first)["options"]["A"] = "Edited option"
+        self.generator.export_paper(paper, output_dir, formats=["html"])
+        with open(html_file, encoding="utf-8") as f:
+            self.assertIn("Edited option", f.read())
+        self.assertEqual(renderer.cache_info().misses, misses + 2)
+    
+    def test_batch_bundle(self):
+        """A bundled batch writes one archive holding every output"""
+        analyses = {f"S{i}": {} for i in range(3)}
+        output_dir = os.path.join(self.temp_dir, "bundle")
+        result = self.generator.generate_batch(analyses, PaperConfig(total_questions=2), output_dir,
+                                               bundle="batch.zip")
+        
+        self.assertEqual(os.listdir(output_dir), ["batch.zip"])
+        with zipfile.ZipFile(os.path.join(output_dir, "batch.zip")) as archive:
+            names = set(archive.namelist())
+            for files in result.files.values():
+                self.assertEqual(set(files), {"json", "text", "answer_key", "analysis"})
+                member = os.path.basename(files["json"])
+                self.assertIn(member, names)
+                self.assertEqual(json.loads(archive.read(member))["paper_id"] + ".json", member)
+        self.assertEqual(len(names), 12)
+    
+    def test_failed_bundle_leaves_no_archive(self):
+        """A renderer failing partway through a bundled batch leaves no archive behind"""
+        class FailingRenderer(PaperRenderer):
+            name = "failing"
+            suffix = ".txt"
+            
+            def render(self, paper, out):
+                out.write(paper.paper_id)
+                if paper.paper_id.endswith("_S2"):
+                    raise OSError("disk full")
+        
+        self.generator.renderers["failing"] = FailingRenderer()
+        analyses = {f"S{i}": {} for i in range(4)}
+        output_dir = os.path.join(self.temp_dir, "bundle")
+        with self.assertRaises(OSError):
+            self.generator.generate_batch(analyses, PaperConfig(total_questions=1), output_dir,
+                                          formats=["failing"], max_writers=1, bundle="batch.zip")
+        self.assertEqual(os.listdir(output_dir), [])
+    
+    def test_shared_question_index(self):
+        """Exporters and selectors share one question index, rebuilt only for a new bank"""
+        index = self.mapper.question_index
+        self.assertIs(self.generator.question_index, index)
+        self.assertIs(self.mapper.question_index, index)
+        
+        for question_id, question in self.mapper._iter_questions():
+            self.assertIs(index.get(question_id), question)
+            self.assertIn(question_id, index)
+        self.assertIsNone(index.get("NOT_A_QUESTION"))
+        self.assertEqual(sorted(index.question_ids()), sorted(self.generator.question_selector.available_questions))
+        
+        self.mapper.questions = dict(self.mapper.questions)
+        self.assertIsNot(self.generator.question_index, index)
+    
+    def test_seeded_rng_reproducible(self):
+        """The same seeded rng selects the same questions"""
+        config = PaperConfig(total_questions=3, paper_type="balanced")
+        first = self.generator.generate_paper(config, rng=random.Random(7), paper_id="P1")
+        second = self.generator.generate_paper(config, rng=random.Random(7), paper_id="P2")
+        self.assertEqual([q.question_id for q in first.questions], [q.question_id for q in second.questions])
+        self.assertEqual(first.paper_id, "P1")
+    
+    def test_generate_batch(self):
+        """Every student gets their own files; papers depend on the seed, not the workers"""
+        weak_analysis = {"weak_topics": {"2.4_ionic_bonding": {"success_rate": 0.3}}}
+        analyses = {f"student/{i}": weak_analysis for i in range(6)}
+        config = PaperConfig(total_questions=3, paper_type="weak_focus")
+        
+        def selections(result):
+            papers = {}
+            for student_id, files in result.files.items():
+                with open(files["json"]) as f:
+                    papers[student_id] = [q["question_id"] for q in json.load(f)["questions"]]
+            return papers
+        
+        output_dir = os.path.join(self.temp_dir, "batch")
+        serial = self.generator.generate_batch(analyses, config, output_dir, seed=3, max_writers=2)
+        pooled = self.generator.generate_batch(analyses, config, os.path.join(self.temp_dir, "pooled"),
+                                               seed=3, n_jobs=2, chunk_size=2)
+        
+        self.assertEqual(serial.num_papers, 6)
+        self.assertEqual(list(serial.files), list(analyses))
+        json_files = {files["json"] for files in serial.files.values()}
+        self.assertEqual(len(json_files), 6)
+        self.assertTrue(all(Path(path).parent == Path(output_dir) for path in json_files))
+        self.assertEqual(selections(serial), selections(pooled))
+        self.assertEqual(paper_generator._worker, {})
+        self.assertGreater(serial.papers_per_second, 0)
+    
+    def test_assembled_paper_meets_targets(self):
+        """Assembly hits an exact reachable mark total and reports deviations"""
+        config = PaperConfig(total_questions=3, total_points=15, paper_type="assembled")
+        paper = self.generator.generate_paper(config, rng=random.Random(1))
+        report = paper.metadata["assembly_report"]
+        
+        self.assertEqual(paper.total_points, 15)
+        self.assertEqual(report["points_deviation"], 0)
+        self.assertEqual(report["difficulty_counts"], {"easy": 1, "medium": 1, "hard": 1})
+        self.assertEqual(report["topics_covered"], 3)
+        self.assertEqual(len({q.question_id for q in paper.questions}), 3)
+        
+        # Unreachable total: as close as the bank allows
+        config = PaperConfig(total_questions=3, total_points=100, paper_type="assembled")
+        report = self.generator.generate_paper(config).metadata["assembly_report"]
+        self.assertEqual(report["points"], 17)
+        self.assertEqual(report["points_deviation"], -83)
+    
+    def test_assembler_weak_topics_and_exclusions(self):
+        """Distribution breaks mark-total ties; weak topics and exclusions are honoured"""
+        config = PaperConfig(total_questions=2, total_points=10)
+        weak_analysis = {"weak_topics": {"1.1_solids_liquids_gases": {"success_rate": 0.2}}}
+        selections, report = self.generator.assembler.assemble(
+            config, weak_analysis, random.Random(0), excluded_ids={"SLG_001"}
+        )
+        
+        self.assertEqual(report.points, 10)
+        self.assertEqual(report.difficulty_counts, {"easy": 1, "medium": 0, "hard": 1})
+        self.assertEqual([s.question_id for s in selections], ["SLG_002", "OX_001"])
+        self.assertEqual(report.weak_topic_questions, 1)
+        self.assertTrue(selections[0].selection_reason.startswith("Weak topic focus"))
+    
+    def test_exposure_tracking(self):
+        """Students are not given questions they have seen until the pool runs out"""
+        store = ExposureStore(Path(self.temp_dir) / "exposures.sqlite")
+        generator = PaperGenerator(self.mapper, exposure_store=store)
+        config = PaperConfig(total_questions=2, paper_type="comprehensive")
+        
+        first = generator.generate_paper(config, rng=random.Random(0), student_id="S1")
+        second = generator.generate_paper(config, rng=random.Random(0), student_id="S1")
+        first_ids = {q.question_id for q in first.questions}
+        self.assertFalse(first_ids & {q.question_id for q in second.questions})
+        self.assertEqual(store.seen("S1"), first_ids | {q.question_id for q in second.questions})
+        self.assertTrue(store.has_paper(first.paper_id))
+        
+        # Another student, and papers without a student, are unaffected
+        generator.generate_paper(config, student_id="S2")
+        generator.generate_paper(config)
+        self.assertEqual(len(store.seen("S2")), 2)
+        
+        analyses = {"S1": {}, "S3": {}}
+        balanced = PaperConfig(total_questions=1, paper_type="balanced")
+        result = generator.generate_batch(analyses, balanced, os.path.join(self.temp_dir, "batch"))
+        self.assertEqual(len(store.seen("S3")), 1)
+        self.assertEqual(len(store.seen("S1")), 5)
+        self.assertEqual(result.num_papers, 2)
+        store.close()
+    
+    def test_failed_export_is_not_recorded(self):
+        """A student whose paper fails to export is not marked as having seen it"""
+        store = ExposureStore(Path(self.temp_dir) / "exposures.sqlite")
+        generator = PaperGenerator(self.mapper, exposure_store=store)
+        
+        class FailingRenderer(PaperRenderer):
+            name = "failing"
+            suffix = ".txt"
+            
+            def render(self, paper, out):
+                if paper.paper_id.endswith("_S2"):
+                    raise OSError("disk full")
+                out.write(paper.paper_id)
+        
+        generator.renderers["failing"] = FailingRenderer()
+        analyses = {f"S{i}": {} for i in range(4)}
+        with self.assertRaises(OSError):
+            generator.generate_batch(analyses, PaperConfig(total_questions=1, paper_type="balanced"),
+                                     os.path.join(self.temp_dir, "failing"), formats=["failing"], max_writers=1)
+        self.assertEqual(store.seen("S2"), set())
+        for student_id in ("S0", "S1", "S3"):
+            self.assertEqual(len(store.seen(student_id)), 1)
+        store.close()
+    
+    def test_paper_ids_unique(self):
+        """Paper ids do not collide within the same second"""
+        ids = {new_paper_id() for _ in range(1000)}
+        self.assertEqual(len(ids), 1000)
+        self.assertTrue(new_paper_id("student/1").endswith("_student_1"))
 
 
 class TestPaperConfiguration(unittest.TestCase):
@@ -0,0 +1,72 @@
+# igcse-assessment-tool/tests/test_question_bank.py
+
+import json
+import pickle
+from pathlib import Path
+
+import pytest
+
+from src.mapping import TopicMapper
+from src.question_bank import QuestionBank
+
+DATA = Path(__file__).parent.parent / "data"
+
+
+@pytest.fixture
+def bank_path(tmp_path):
+    return QuestionBank.build(DATA / "past_questions_bank.json", tmp_path / "bank.sqlite").db_path
+
+
+@pytest.fixture
+def json_bank():
+    with open(DATA / "past_questions_bank.json", "r", encoding="utf-8") as f:
+        return json.load(f)["chemistry_questions_bank"]
+
+
+class TestQuestionBank:
+    def test_reads_like_the_json_bank(self, bank_path, json_bank):
+        bank = QuestionBank(bank_path)
+        assert list(bank) == list(json_bank)
+        for topic_id, topic_data in json_bank.items():
+            view = bank[topic_id]
+            assert {k: v for k, v in view.items() if k != "questions"} == \
+                {k: v for k, v in topic_data.items() if k != "questions"}
+            assert list(view["questions"]) == topic_data["questions"]
+            assert len(view["questions"]) == len(topic_data["questions"])
+            assert view["questions"][-1] == topic_data["questions"][-1]
+        assert bank.num_questions == sum(len(t["questions"]) for t in json_bank.values())
+
+    def test_lookup_by_id(self, bank_path, json_bank):
+        bank = QuestionBank(bank_path)
+        topic_id, topic_data = next(iter(json_bank.items()))
+        question = topic_data["questions"][0]
+        assert bank.get_question(question["id"]) == question
+        assert bank.question_topic(question["id"]) == topic_id
+        assert bank.get_question("NOT_A_QUESTION") is None
+        assert bank.question_ids(topic_id) == [q["id"] for q in topic_data["questions"]]
+        assert len(bank.question_ids()) == bank.num_questions
+
+    def test_opening_reads_no_question_bodies(self, bank_path):
+        bank = QuestionBank(bank_path)
+        assert bank._body.cache_info().currsize == 0
+        bank.get_question(bank.question_ids()[0])
+        bank.get_question(bank.question_ids()[0])
+        assert bank._body.cache_info().hits == 1
+
+    def test_version_and_pickling(self, bank_path, tmp_path):
+        bank = QuestionBank(bank_path)
+        assert len(bank.version) == 64
+        copy = pickle.loads(pickle.dumps(bank))
+        assert list(copy) == list(bank) and copy.version == bank.version
+        with pytest.raises(FileNotFoundError):
+            QuestionBank(tmp_path / "missing.sqlite")
+
+    def test_topic_mapper_on_sqlite_bank(self, bank_path):
+        from_json = TopicMapper(str(DATA / "syllabus_topics.json"), str(DATA / "past_questions_bank.json"),
+                                str(DATA / "manual_mappings.json"))
+        from_sqlite = TopicMapper(str(DATA / "syllabus_topics.json"), str(bank_path),
+                                  str(DATA / "manual_mappings.json"))
+        assert isinstance(from_sqlite.questions, QuestionBank)
+        from_json.map_all_questions()
+        from_sqlite.map_all_questions()
+        assert [m.to_dict() for m in from_sqlite.mappings] == [m.to_dict() for m in from_json.mappings]
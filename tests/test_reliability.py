@@ -0,0 +1,133 @@
+"""
+Test suite for reliability module.
+Tests Cronbach's alpha, KR-20, alpha-if-item-deleted and bootstrap CIs.
+"""
+
+import pytest
+import pandas as pd
+import numpy as np
+from pathlib import Path
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.reliability import (
+    ReliabilityReport,
+    cronbach_alpha,
+    kr20,
+    alpha_if_item_deleted,
+    bootstrap_alpha,
+    reliability_report,
+    _batch_state,
+    _bootstrap_batch,
+    _worker,
+)
+from src.ingestion import ClassData
+
+
+def simulate_responses(num_students: int, num_items: int, seed: int = 0) -> np.ndarray:
+    """0/1 responses from a Rasch model, so items are positively correlated."""
+    rng = np.random.default_rng(seed)
+    theta = rng.normal(size=num_students)
+    b = np.linspace(-1.5, 1.5, num_items)
+    prob = 1 / (1 + np.exp(-(theta[:, None] - b[None, :])))
+    return (rng.random(prob.shape) < prob).astype(np.uint8)
+
+
+def reference_alpha(x: np.ndarray) -> float:
+    df = pd.DataFrame(x)
+    k = df.shape[1]
+    return k / (k - 1) * (1 - df.var().sum() / df.sum(axis=1).var())
+
+
+class TestPointEstimates:
+    """Test alpha, KR-20 and alpha-if-item-deleted."""
+
+    def test_alpha_matches_reference(self):
+        x = simulate_responses(500, 15)
+        assert cronbach_alpha(x) == pytest.approx(reference_alpha(x), abs=1e-12)
+        assert 0.5 < cronbach_alpha(x) < 1
+
+    def test_kr20_equals_alpha_for_binary_items(self):
+        x = simulate_responses(300, 10, seed=1)
+        assert kr20(x) == pytest.approx(cronbach_alpha(x), abs=1e-12)
+
+    def test_alpha_if_item_deleted(self):
+        x = simulate_responses(400, 12, seed=2)
+        expected = [reference_alpha(np.delete(x, j, axis=1)) for j in range(x.shape[1])]
+        np.testing.assert_allclose(alpha_if_item_deleted(x), expected, atol=1e-12)
+
+    def test_degenerate_inputs(self):
+        """No total-score variance or too few items gives NaN, not an error."""
+        assert np.isnan(cronbach_alpha(np.ones((10, 5), dtype=np.uint8)))
+        assert np.isnan(cronbach_alpha(np.ones((10, 1), dtype=np.uint8)))
+        assert np.isnan(alpha_if_item_deleted(np.zeros((10, 2), dtype=np.uint8))).all()
+
+
+class TestBootstrap:
+    """Test vectorized bootstrap CIs."""
+
+    def test_batch_matches_explicit_resamples(self):
+        """W @ X statistics equal alpha of the materialised resamples."""
+        x = simulate_responses(200, 8, seed=3)
+        seed = np.random.SeedSequence(7)
+        alphas, item_alphas = _bootstrap_batch(5, seed, _batch_state(x, include_items=True))
+
+        rng = np.random.default_rng(seed)
+        idx = rng.integers(0, 200, size=(5, 200))
+        for b in range(5):
+            resample = x[idx[b]]
+            assert alphas[b] == pytest.approx(cronbach_alpha(resample), abs=1e-9)
+            np.testing.assert_allclose(item_alphas[b], alpha_if_item_deleted(resample), atol=1e-9)
+
+    def test_ci_contains_estimate_and_is_reproducible(self):
+        x = simulate_responses(1000, 20, seed=4)
+        ci, item_cis = bootstrap_alpha(x, n_bootstrap=500, seed=11)
+        assert ci[0] < cronbach_alpha(x) < ci[1]
+        assert item_cis is None
+        assert bootstrap_alpha(x, n_bootstrap=500, seed=11)[0] == ci
+        # the in-process path leaves no response copies behind
+        assert not _worker
+
+    def test_process_pool_matches_in_process(self):
+        x = simulate_responses(300, 10, seed=5)
+        serial = bootstrap_alpha(x, n_bootstrap=200, seed=3, batch_size=50, include_items=True)
+        pooled = bootstrap_alpha(x, n_bootstrap=200, seed=3, batch_size=50, n_jobs=2, include_items=True)
+        assert serial[0] == pooled[0]
+        np.testing.assert_array_equal(serial[1], pooled[1])
+
+    def test_needs_two_students(self):
+        with pytest.raises(ValueError):
+            bootstrap_alpha(np.ones((1, 5), dtype=np.uint8))
+
+
+class TestReliabilityReport:
+    """Test the full report on ClassData."""
+
+    def test_report(self):
+        x = simulate_responses(600, 10, seed=6)
+        questions = [f"q{j + 1}" for j in range(10)]
+        class_data = ClassData.from_arrays(
+            student_ids=[f"S{i:04d}" for i in range(600)],
+            mcq_questions=questions,
+            responses=x,
+            mcq_totals=x.sum(axis=1).astype(float),
+            assignment_table=pd.DataFrame({"total": np.zeros(600)}),
+            participation_table=pd.DataFrame({"average": np.zeros(600)}),
+        )
+        report = reliability_report(class_data, n_bootstrap=300, seed=0, include_item_cis=True)
+
+        assert isinstance(report, ReliabilityReport)
+        assert report.alpha == pytest.approx(cronbach_alpha(x))
+        assert report.num_students == 600 and report.num_items == 10
+        assert list(report.alpha_if_deleted) == questions
+        assert report.alpha_ci[0] < report.alpha < report.alpha_ci[1]
+        assert set(report.alpha_if_deleted_ci) == set(questions)
+
+        no_ci = reliability_report(class_data, n_bootstrap=0)
+        assert no_ci.alpha_ci is None and no_ci.n_bootstrap == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__, "-v"])